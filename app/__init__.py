@@ -1,3 +1,5 @@
+import os
+
 from flask import Flask
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
@@ -13,6 +15,7 @@ migrate = Migrate(app, db)
 bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 
+from app.models.readings import DailyReading
 from app.models.users import User
 
 
@@ -22,9 +25,28 @@ def init_app():
         # Include our Routes
         from app.routes.api import api_bp
         from app.routes.auth import auth_bp
+        from app.routes.metrics import metrics_bp
 
         # Register Blueprints
         app.register_blueprint(auth_bp)
         app.register_blueprint(api_bp)
+        app.register_blueprint(metrics_bp)
+
+        # Record request, query and weatherfile metrics
+        from app.metrics import init_metrics
+
+        init_metrics(app, db.engine)
+
+        # Register CLI commands
+        from app.commands import weather_cli
+
+        app.cli.add_command(weather_cli)
+
+        # Build the weatherfile index before the first request
+        from app.contants import WEATHER_FILES_PATH
+        from weatherman.index import WeatherFileIndex
+
+        if os.path.isdir(WEATHER_FILES_PATH):
+            WeatherFileIndex.for_dir(WEATHER_FILES_PATH).refresh()
 
         return app
@@ -0,0 +1,16 @@
+import click
+from flask.cli import AppGroup
+
+from app.contants import WEATHER_FILES_PATH
+from app.weather_store import import_weatherfiles
+
+weather_cli = AppGroup('weather', help='Manage stored weather readings.')
+
+
+@weather_cli.command('import')
+@click.argument('path', default=WEATHER_FILES_PATH)
+def import_command(path):
+    """Import the weatherfiles in PATH into the daily_reading table."""
+
+    imported = import_weatherfiles(path)
+    click.echo(f'imported {imported} daily readings')
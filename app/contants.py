@@ -1 +1,8 @@
-WEATHER_FILES_PATH = '/Users/ahmedali/volta/weather-flask/weatherman/weatherfiles'
+import os
+
+WEATHER_FILES_PATH = os.environ.get(
+    'WEATHER_FILES_PATH', '/Users/ahmedali/volta/weather-flask/weatherman/weatherfiles')
+# Backends writing to disk are only used once these are set explicitly
+WEATHER_CACHE_PATH = os.environ.get('WEATHER_CACHE_PATH')
+WEATHER_SQLITE_PATH = os.environ.get('WEATHER_SQLITE_PATH')
+WEATHER_LOADER_WORKERS = 12
@@ -0,0 +1,128 @@
+"""Prometheus Metrics
+
+Counters and histograms of the application, exposed in the Prometheus text format at /metrics.
+Weatherman reports weatherfile reads, cache lookups and stage latencies through its events, which
+are subscribed to here, so the weatherman package itself does not depend on prometheus_client.
+Stage latencies are only reported while WEATHERMAN_TIMINGS is on.
+
+When PROMETHEUS_MULTIPROC_DIR is set before the application is imported, every worker process
+writes its metrics to files in that directory and /metrics aggregates the files of all workers,
+so any gunicorn worker can answer a scrape. The directory has to be emptied before the server
+starts, and gunicorn.conf.py removes the files of workers which exit.
+
+"""
+
+import os
+import time
+from typing import Optional
+
+from flask import Flask, Response, g, request
+from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter,
+                               Histogram, generate_latest, multiprocess)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from weatherman import events
+from weatherman.timing import BUCKETS
+
+HTTP_REQUESTS = Counter(
+    'weather_http_requests_total', 'HTTP requests handled.',
+    ('blueprint', 'endpoint', 'method', 'status'))
+HTTP_REQUEST_SECONDS = Histogram(
+    'weather_http_request_duration_seconds', 'Time spent handling HTTP requests.',
+    ('blueprint', 'endpoint', 'method'), buckets=BUCKETS)
+BCRYPT_SECONDS = Histogram(
+    'weather_bcrypt_duration_seconds', 'Time spent hashing and verifying passwords.',
+    ('operation',), buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, float('inf')))
+DB_QUERIES = Counter(
+    'weather_db_queries_total', 'SQL statements executed on the database.', ('statement',))
+WEATHERFILE_BYTES = Counter(
+    'weather_weatherfile_read_bytes_total', 'Bytes of weatherfiles read.')
+WEATHERFILES_READ = Counter(
+    'weather_weatherfiles_read_total', 'Weatherfiles read and parsed.')
+CACHE_LOOKUPS = Counter(
+    'weather_cache_lookups_total', 'Cache lookups, by cache and result.', ('cache', 'result'))
+STAGE_SECONDS = Histogram(
+    'weather_stage_duration_seconds', 'Time spent in report stages.', ('stage',),
+    buckets=BUCKETS)
+
+STATEMENTS = ('select', 'insert', 'update', 'delete')
+
+
+def _weatherfile_read(file_path: str, n_bytes: int) -> None:
+    WEATHERFILES_READ.inc()
+    WEATHERFILE_BYTES.inc(n_bytes)
+
+
+def _cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def _stage_timed(name: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(name).observe(seconds)
+
+
+def _query_executed(conn, cursor, statement: str, parameters, context, executemany) -> None:
+    words = statement.split(None, 1)
+    keyword = words[0].lower() if words else ''
+    DB_QUERIES.labels(keyword if keyword in STATEMENTS else 'other').inc()
+
+
+def _start_request() -> None:
+    g.metrics_start = time.perf_counter()
+
+
+def _finish_request(response: Response) -> Response:
+    start = g.pop('metrics_start', None)
+    blueprint = request.blueprint or ''
+    endpoint = request.endpoint or 'unmatched'
+
+    HTTP_REQUESTS.labels(blueprint, endpoint, request.method, str(response.status_code)).inc()
+    if start is not None:
+        HTTP_REQUEST_SECONDS.labels(blueprint, endpoint, request.method).observe(
+            time.perf_counter() - start)
+    return response
+
+
+def init_metrics(app: Flask, engine: Engine) -> None:
+    """Records metrics of the requests of an application and of the queries of its database.
+
+        Args:
+            app (Flask): The application.
+            engine (Engine): The SQLAlchemy engine of the application database.
+    """
+
+    events.subscribe(events.WEATHERFILE_READ, _weatherfile_read)
+    events.subscribe(events.CACHE_LOOKUP, _cache_lookup)
+    events.subscribe(events.STAGE_TIMED, _stage_timed)
+    event.listen(engine, 'before_cursor_execute', _query_executed)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """Returns the registry to expose, aggregating every worker process in multiprocess mode."""
+
+    if 'PROMETHEUS_MULTIPROC_DIR' not in os.environ:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_response(registry: Optional[CollectorRegistry] = None) -> Response:
+    """Returns the metrics of a registry in the Prometheus text format.
+
+        Args:
+            registry (CollectorRegistry, optional): The registry. Defaults to None, which
+                exposes metrics_registry().
+
+        Returns:
+            Response: The metrics.
+    """
+
+    if registry is None:
+        registry = metrics_registry()
+    return Response(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,62 @@
+from app import db
+
+HEADER_COLUMNS = {
+    'Max TemperatureC': 'max_temperature_c',
+    'Mean TemperatureC': 'mean_temperature_c',
+    'Min TemperatureC': 'min_temperature_c',
+    'Dew PointC': 'dew_point_c',
+    'MeanDew PointC': 'mean_dew_point_c',
+    'Min DewpointC': 'min_dew_point_c',
+    'Max Humidity': 'max_humidity',
+    'Mean Humidity': 'mean_humidity',
+    'Min Humidity': 'min_humidity',
+    'Max Sea Level PressurehPa': 'max_sea_level_pressure_hpa',
+    'Mean Sea Level PressurehPa': 'mean_sea_level_pressure_hpa',
+    'Min Sea Level PressurehPa': 'min_sea_level_pressure_hpa',
+    'Max VisibilityKm': 'max_visibility_km',
+    'Mean VisibilityKm': 'mean_visibility_km',
+    'Min VisibilitykM': 'min_visibility_km',
+    'Max Wind SpeedKm/h': 'max_wind_speed_kmh',
+    'Mean Wind SpeedKm/h': 'mean_wind_speed_kmh',
+    'Max Gust SpeedKm/h': 'max_gust_speed_kmh',
+    'Precipitationmm': 'precipitation_mm',
+    'CloudCover': 'cloud_cover',
+    'Events': 'events',
+    'WindDirDegrees': 'wind_dir_degrees',
+}
+
+
+class DailyReading(db.Model):
+    __table_args__ = (
+        db.Index('ix_daily_reading_station_date', 'station', 'date', unique=True),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    station = db.Column(db.String(64), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    max_temperature_c = db.Column(db.Float)
+    mean_temperature_c = db.Column(db.Float)
+    min_temperature_c = db.Column(db.Float)
+    dew_point_c = db.Column(db.Float)
+    mean_dew_point_c = db.Column(db.Float)
+    min_dew_point_c = db.Column(db.Float)
+    max_humidity = db.Column(db.Float)
+    mean_humidity = db.Column(db.Float)
+    min_humidity = db.Column(db.Float)
+    max_sea_level_pressure_hpa = db.Column(db.Float)
+    mean_sea_level_pressure_hpa = db.Column(db.Float)
+    min_sea_level_pressure_hpa = db.Column(db.Float)
+    max_visibility_km = db.Column(db.Float)
+    mean_visibility_km = db.Column(db.Float)
+    min_visibility_km = db.Column(db.Float)
+    max_wind_speed_kmh = db.Column(db.Float)
+    mean_wind_speed_kmh = db.Column(db.Float)
+    max_gust_speed_kmh = db.Column(db.Float)
+    precipitation_mm = db.Column(db.Float)
+    cloud_cover = db.Column(db.Float)
+    events = db.Column(db.String(64))
+    wind_dir_degrees = db.Column(db.Float)
+    generation = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<DailyReading {self.station} {self.date}>'
@@ -1,40 +1,314 @@
-from flask import Blueprint, jsonify, request
+import contextlib
+import hashlib
+import json
+from datetime import date, datetime, timezone
+from typing import Callable, Iterable, Iterator, Optional
+
+from flask import (Blueprint, Response, current_app, g, jsonify, request,
+                   stream_with_context)
 from flask_jwt_extended import jwt_required
 
 from app.contants import WEATHER_FILES_PATH
 from app.exceptions import WeatherException
-from weatherman.runner import process_args, compute_monthly_average, generate_average_report
+from app.weather_store import get_backend, get_report_cache, get_single_flight
+from weatherman.helper import parse_iso_date, parse_report_date
+from weatherman.ranges import query_range
+from weatherman.runner import process_args, compute_fused_month
+from weatherman import timing
+from weatherman.timing import stage
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 
+@api_bp.record_once
+def _configure_timings(state):
+    timing.set_enabled(state.app.config['WEATHERMAN_TIMINGS'])
+
+
+@api_bp.before_request
+def _start_timings():
+    if timing.is_enabled():
+        g.timings_stack = contextlib.ExitStack()
+        g.stage_timings = g.timings_stack.enter_context(timing.collect())
+
+
+@api_bp.after_request
+def _send_timings(response):
+    timings = g.get('stage_timings')
+    if timings:
+        response.headers['Server-Timing'] = timing.server_timing(timings)
+    return response
+
+
+@api_bp.teardown_request
+def _stop_timings(error=None):
+    stack = g.pop('timings_stack', None)
+    if stack is not None:
+        stack.close()
+
+
+def _report_validators(dates: list[str], strategy: dict[str, str],
+                       yearly: bool = False) -> tuple[str, Optional[datetime]]:
+    """Returns the ETag and Last-Modified time of the reports for some dates.
+
+    Both are derived from the fingerprints of the stored readings, so no weatherfile is read.
+
+        Args:
+            dates (list): Dates of the reports.
+            strategy (dict): Names of the calc and report strategies of the reports.
+            yearly (bool, optional): Whether the dates are years. Defaults to False.
+
+        Returns:
+            tuple: Strong ETag of the reports, and when their readings last changed or None if
+                the backend does not track it.
+    """
+
+    backend = get_backend()
+    fingerprints, modified = [], []
+    for report_date in dates:
+        year, month = (int(report_date), None) if yearly else parse_report_date(report_date)
+        fingerprints.append((report_date, backend.fingerprint(year, month)))
+        modified.append(backend.last_modified(year, month))
+
+    names = tuple(strategy.values())
+    etag = hashlib.sha1(repr((yearly, names, fingerprints)).encode()).hexdigest()
+
+    last_modified = None
+    if modified and None not in modified:
+        last_modified = datetime.fromtimestamp(max(modified), timezone.utc)
+
+    return etag, last_modified
+
+
+def _not_modified(etag: str, last_modified: Optional[datetime]) -> bool:
+    """Returns whether the conditional headers of the request match the reports.
+
+    If-Modified-Since is only evaluated when the request has no If-None-Match header.
+    """
+
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+
+    return False
+
+
+def _conditional_report(dates: list[str], strategy: dict[str, str],
+                        yearly: bool = False,
+                        build: Optional[Callable[[], list]] = None) -> Response:
+    """Returns the reports for some dates, or an empty 304 response if the client has them.
+
+        Args:
+            dates (list): Dates of the reports.
+            strategy (dict): Names of the calc and report strategies of the reports.
+            yearly (bool, optional): Whether the dates are years. Defaults to False.
+            build (callable, optional): Function returning the reports. Defaults to None,
+                which generates them with process_args().
+
+        Returns:
+            Response: The reports with their ETag and Last-Modified headers.
+    """
+
+    try:
+        with stage('validate'):
+            etag, last_modified = _report_validators(dates, strategy, yearly)
+    except Exception as e:
+        raise WeatherException
+
+    if _not_modified(etag, last_modified):
+        response = Response(status=304)
+    else:
+        try:
+            if build is not None:
+                reports = build()
+            else:
+                reports = process_args(dates, 1, WEATHER_FILES_PATH, strategy, yearly=yearly,
+                                       backend=get_backend(), report_cache=get_report_cache(),
+                                       single_flight=get_single_flight(), quiet=True)
+        except Exception as e:
+            raise WeatherException
+        with stage('serialize'):
+            response = jsonify(reports)
+
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
+
+
 @api_bp.route('/weatherman/yearly_report', methods=['GET'])
 @jwt_required()
 def weatherman_yearly_report():
     strategy = {
-        'calc_strategy': None,
-        'report_strategy': None
+        'calc_strategy': 'compute',
+        'report_strategy': 'generate_report'
     }
     dates = request.args.getlist('year')
-    try:
-        reports = process_args(dates, 1, WEATHER_FILES_PATH, strategy, yearly=True)
-    except Exception as e:
-        raise WeatherException
-
-    return jsonify(reports), 200
+    return _conditional_report(dates, strategy, yearly=True)
 
 
 @api_bp.route('/weatherman/monthly_report', methods=['GET'])
 @jwt_required()
 def weatherman_monthly_report():
     strategy = {
-        'calc_strategy': compute_monthly_average,
-        'report_strategy': generate_average_report
+        'calc_strategy': 'compute_monthly_average',
+        'report_strategy': 'generate_average_report'
     }
     dates = request.args.getlist('date')
+    return _conditional_report(dates, strategy)
+
+
+@api_bp.route('/weatherman/month_metrics', methods=['GET'])
+@jwt_required()
+def weatherman_month_metrics():
+    strategy = {
+        'extremes': 'compute',
+        'averages': 'compute_monthly_average',
+        'daily': 'compute_min_max'
+    }
+    dates = request.args.getlist('date')
+
+    def build():
+        metrics = []
+        for report_date in dates:
+            computations = compute_fused_month(WEATHER_FILES_PATH, report_date,
+                                               strategy.values(), get_backend())
+            metrics.append({'date': report_date, **{
+                key: computations[name] for key, name in strategy.items()}})
+        return metrics
+
+    return _conditional_report(dates, strategy, build=build)
+
+
+def _month_range(start: str, end: str) -> list[str]:
+    """Returns the dates of every month from start to end, both included.
+
+        Args:
+            start (str): Date of the first month, e.g. 2004/8.
+            end (str): Date of the last month.
+
+        Returns:
+            list: Dates of the months.
+
+        Raises:
+            ValueError: If a date is invalid, or the range ends before it starts.
+    """
+
+    start_year, start_month = parse_report_date(start)
+    end_year, end_month = parse_report_date(end)
+    first, last = start_year * 12 + start_month - 1, end_year * 12 + end_month - 1
+    if last < first:
+        raise ValueError(f'range ends on {end} before it starts on {start}')
+
+    return [f'{index // 12}/{index % 12 + 1}' for index in range(first, last + 1)]
+
+
+def _json_array(items: Iterable) -> Iterator[str]:
+    """Yields a JSON array in chunks, one item at a time."""
+
+    yield '['
+    for position, item in enumerate(items):
+        yield (',' if position else '') + json.dumps(item)
+    yield ']'
+
+
+@api_bp.route('/weatherman/daily_minmax', methods=['GET'])
+@jwt_required()
+def weatherman_daily_minmax():
+    strategy = {
+        'calc_strategy': 'compute_min_max',
+        'report_strategy': 'generate_daily_report'
+    }
+    try:
+        dates = request.args.getlist('date')
+        for report_date in dates:
+            parse_report_date(report_date)
+        if 'start' in request.args or 'end' in request.args:
+            dates += _month_range(request.args['start'], request.args['end'])
+    except Exception as e:
+        raise WeatherException
+
+    backend, report_cache, single_flight = get_backend(), get_report_cache(), get_single_flight()
+
+    def compute_month(report_date):
+        return process_args([report_date], 1, WEATHER_FILES_PATH, strategy, backend=backend,
+                            report_cache=report_cache, single_flight=single_flight,
+                            quiet=True)[0]
+
+    # The first month with readings is computed before the response starts, so a request which
+    # fails outright still gets an error status. Months without readings are left out.
+    months = iter(dates)
+    first = None
     try:
-        reports = process_args(dates, 1, WEATHER_FILES_PATH, strategy)
+        for report_date in months:
+            try:
+                first = compute_month(report_date)
+            except FileNotFoundError:
+                continue
+            break
     except Exception as e:
         raise WeatherException
 
-    return jsonify(reports), 200
+    # The other months are computed while the response is sent, so the series is never held in
+    # memory. The status is sent by then, so a failure ends the series with an error record.
+    def series():
+        if first is not None:
+            yield first
+        for report_date in months:
+            try:
+                yield compute_month(report_date)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                current_app.logger.exception('daily_minmax failed on %s', report_date)
+                yield {'date': report_date, 'error': str(e) or type(e).__name__}
+                return
+
+    ndjson = request.args.get('format') == 'ndjson' or request.accept_mimetypes.best_match(
+        ['application/json', 'application/x-ndjson']) == 'application/x-ndjson'
+    if ndjson:
+        body = (json.dumps(month) + '\n' for month in series())
+        return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
+    return Response(stream_with_context(_json_array(series())), mimetype='application/json')
+
+
+@api_bp.route('/weatherman/range_report', methods=['GET'])
+@jwt_required()
+def weatherman_range_report():
+    try:
+        start = date(*parse_iso_date(request.args['start']))
+        end = date(*parse_iso_date(request.args['end']))
+        columns = query_range(get_backend(), start, end, request.args.getlist('column'),
+                              request.args.get('station'),
+                              current_app.config['WEATHERMAN_RANGE_MAX_AGE'], get_single_flight())
+    except Exception as e:
+        raise WeatherException
+
+    return jsonify({
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'columns': columns,
+    }), 200
+
+
+@api_bp.route('/weatherman/report_cache', methods=['GET'])
+@jwt_required()
+def weatherman_report_cache():
+    return jsonify(get_report_cache().stats()), 200
+
+
+@api_bp.route('/weatherman/single_flight', methods=['GET'])
+@jwt_required()
+def weatherman_single_flight():
+    return jsonify(get_single_flight().stats()), 200
+
+
+@api_bp.route('/weatherman/timings', methods=['GET'])
+@jwt_required()
+def weatherman_timings():
+    return jsonify({
+        'enabled': timing.is_enabled(),
+        'stages': timing.histograms(),
+    }), 200
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify
 from app import db, bcrypt
+from app.metrics import BCRYPT_SECONDS
 from app.models.users import User
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 
@@ -19,7 +20,8 @@ def register():
     if User.query.filter_by(username=username).first():
         return jsonify(message='Username already exists'), 400
 
-    hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+    with BCRYPT_SECONDS.labels('hash').time():
+        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
 
     new_user = User(email=email, username=username, password=hashed_password)
     db.session.add(new_user)
@@ -39,7 +41,13 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if user and bcrypt.check_password_hash(user.password, password):
+    if user:
+        with BCRYPT_SECONDS.labels('verify').time():
+            valid = bcrypt.check_password_hash(user.password, password)
+    else:
+        valid = False
+
+    if valid:
         access_token = create_access_token(identity=username)
         return jsonify(access_token=access_token), 200
     return jsonify(message='invalid credentials'), 401
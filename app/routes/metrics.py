@@ -0,0 +1,10 @@
+from flask import Blueprint
+
+from app.metrics import metrics_response
+
+metrics_bp = Blueprint('metrics', __name__)
+
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    return metrics_response()
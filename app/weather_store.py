@@ -0,0 +1,329 @@
+import threading
+from array import array
+from datetime import date
+from math import nan
+from typing import Iterable, Optional
+
+import sqlalchemy as sa
+
+from app import app, db
+from app.contants import (WEATHER_CACHE_PATH, WEATHER_FILES_PATH, WEATHER_LOADER_WORKERS,
+                          WEATHER_SQLITE_PATH)
+from app.models.readings import HEADER_COLUMNS, DailyReading
+from config.env_vars import EnvVariableNotSet
+from weatherman.backends import Backend, create_backend
+from weatherman.frames import MONTH_NAMES, MonthFrame
+from weatherman.helper import STR_HEADERS, iter_csv, parse_iso_date
+from weatherman.index import WeatherFileIndex
+from weatherman.loader import MonthLoader
+from weatherman.report_cache import ReportCache
+from weatherman.single_flight import SingleFlight
+from weatherman.timing import stage
+
+_extensions_lock = threading.Lock()
+
+
+def import_weatherfiles(files_dir: str) -> int:
+    """Imports every weatherfile in a directory into the daily_reading table.
+
+    Readings already stored for an imported station and month are replaced, so a directory can
+    be imported again after its files change. Every import stamps its readings with a new
+    generation, which fingerprints are taken from.
+
+        Args:
+            files_dir (str): The directory pointing to weatherfiles.
+
+        Returns:
+            int: Number of daily readings imported.
+    """
+
+    imported = 0
+    generation = db.session.scalar(sa.select(sa.func.max(DailyReading.generation))) or 0
+
+    for (station, year, month), file_name in WeatherFileIndex(files_dir).items():
+        rows = []
+        for daily_data in iter_csv(file_name):
+            row = {'station': station, 'date': date(*parse_iso_date(daily_data['PKT'])),
+                   'generation': generation + 1}
+            for header, column in HEADER_COLUMNS.items():
+                value = daily_data.get(header)
+                if value in ('', None):
+                    row[column] = None
+                elif header in STR_HEADERS:
+                    row[column] = value
+                else:
+                    row[column] = float(value)
+            rows.append(row)
+
+        start, end = _month_bounds(year, month)
+        db.session.execute(sa.delete(DailyReading).where(DailyReading.station == station,
+                                                         DailyReading.date >= start,
+                                                         DailyReading.date < end))
+        if rows:
+            db.session.execute(sa.insert(DailyReading), rows)
+        imported += len(rows)
+
+    db.session.commit()
+
+    return imported
+
+
+def _month_bounds(year: int, month: int) -> tuple[date, date]:
+    """Returns the first day of a month and the first day of the next month."""
+
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+class SQLAlchemyBackend(Backend):
+    """A Class to load readings from the daily_reading table of the app database.
+
+    Every month or year query is answered by a single range query on the (station, date) index.
+    When no station is given, the first station by name with readings in the period is used.
+    """
+
+    aggregates = ('compute', 'compute_monthly_average')
+
+    @staticmethod
+    def _in_period(year: Optional[int], month: Optional[int], station: Optional[str]) -> list:
+        """Returns the conditions selecting readings of a station in a month, a year or ever."""
+
+        period = []
+        if year is not None:
+            if month is not None:
+                start, end = _month_bounds(year, month)
+            else:
+                start, end = date(year, 1, 1), date(year + 1, 1, 1)
+            period = [DailyReading.date >= start, DailyReading.date < end]
+
+        if station is None:
+            station = (sa.select(sa.func.min(DailyReading.station))
+                       .where(*period)
+                       .scalar_subquery())
+
+        return [DailyReading.station == station, *period]
+
+    def _load_frames(self, year: Optional[int], month: Optional[int],
+                     columns: Optional[Iterable[str]],
+                     station: Optional[str]) -> list[MonthFrame]:
+        """Loads the readings of a period with one range query, one frame per month."""
+
+        headers = [header for header in HEADER_COLUMNS if columns is None or header in columns]
+        query = (sa.select(DailyReading.date,
+                           *[getattr(DailyReading, HEADER_COLUMNS[header]) for header in headers])
+                 .where(*self._in_period(year, month, station))
+                 .order_by(DailyReading.date))
+
+        with app.app_context(), stage('query'):
+            rows = db.session.execute(query).all()
+
+        frames = []
+        for row in rows:
+            reading_date = row[0]
+            if not frames or (frames[-1].year, frames[-1].month) != (reading_date.year,
+                                                                     reading_date.month):
+                frames.append(MonthFrame(
+                    reading_date.year, reading_date.month, array('B'),
+                    {header: [] if header in STR_HEADERS else array('d') for header in headers}))
+            frame = frames[-1]
+            frame.days.append(reading_date.day)
+            for header, value in zip(headers, row[1:]):
+                if value is None and header not in STR_HEADERS:
+                    value = nan
+                frame.columns[header].append(value)
+
+        if not frames:
+            period = '/'.join(str(part) for part in (year, month) if part is not None)
+            raise FileNotFoundError(f'no readings found for {period or "any date"}')
+
+        return frames
+
+    def load_month(self, year: int, month: int, columns: Optional[Iterable[str]] = None,
+                   station: Optional[str] = None) -> MonthFrame:
+        return self._load_frames(year, month, columns, station)[0]
+
+    def load_year(self, year: int, columns: Optional[Iterable[str]] = None,
+                  station: Optional[str] = None) -> list[MonthFrame]:
+        return self._load_frames(year, None, columns, station)
+
+    def load_history(self, columns: Optional[Iterable[str]] = None,
+                     station: Optional[str] = None) -> list[MonthFrame]:
+        return self._load_frames(None, None, columns, station)
+
+    def fingerprint(self, year: Optional[int] = None, month: Optional[int] = None,
+                    station: Optional[str] = None) -> tuple:
+        """Returns the number of readings of the period and their latest import generation.
+
+        Every import stamps its readings with a new generation, so the fingerprint changes
+        whenever readings are imported again, even when the database reuses the ids of the
+        rows they replace, as SQLite does.
+        """
+
+        with app.app_context():
+            return tuple(db.session.execute(
+                sa.select(sa.func.count(DailyReading.id), sa.func.max(DailyReading.generation))
+                .where(*self._in_period(year, month, station))
+            ).one())
+
+    def generation(self) -> tuple:
+        """Returns the number of stored readings and their latest import generation."""
+
+        with app.app_context():
+            return tuple(db.session.execute(
+                sa.select(sa.func.count(DailyReading.id), sa.func.max(DailyReading.generation))
+            ).one())
+
+    def aggregate(self, strategy: str, year: int, month: Optional[int] = None,
+                  station: Optional[str] = None) -> Optional[dict]:
+        """Computes Calculator.compute() and compute_monthly_average() in SQL.
+
+        Extremes are compared on the stored values and ties go to the earliest date, so
+        results match the Calculator for whole number readings, which is what weatherfiles
+        hold.
+        """
+
+        conditions = self._in_period(year, month, station)
+        with app.app_context():
+            if strategy == 'compute':
+                return self._extremes(conditions)
+            if strategy == 'compute_monthly_average':
+                return self._averages(conditions)
+
+        return None
+
+    @staticmethod
+    def _extreme(conditions: list, column, descending: bool) -> tuple[int, str]:
+        """Returns the truncated extreme of a column and its earliest date."""
+
+        order = column.desc() if descending else column.asc()
+        row = db.session.execute(
+            sa.select(column, DailyReading.date)
+            .where(*conditions, column.is_not(None))
+            .order_by(order, DailyReading.date)
+            .limit(1)
+        ).first()
+
+        if row is None:
+            raise FileNotFoundError('no readings found for the period')
+
+        return int(row[0]), f'{row[1].day} {MONTH_NAMES[row[1].month]}'
+
+    def _extremes(self, conditions: list) -> dict[str, int]:
+        """Computes max temperature, min temperature and max humidity in SQL."""
+
+        max_temp, max_date = self._extreme(conditions, DailyReading.max_temperature_c, True)
+        min_temp, min_date = self._extreme(conditions, DailyReading.min_temperature_c, False)
+        max_humidity, humidity_date = self._extreme(conditions, DailyReading.max_humidity, True)
+
+        return {
+            'max_temp': max_temp,
+            'max_date': max_date,
+            'min_temp': min_temp,
+            'min_date': min_date,
+            'max_humidity': max_humidity,
+            'humidity_date': humidity_date,
+        }
+
+    @staticmethod
+    def _averages(conditions: list) -> dict[str, int]:
+        """Computes averages for max temperature, min temperature and mean humidity in SQL."""
+
+        columns = (DailyReading.max_temperature_c, DailyReading.min_temperature_c,
+                   DailyReading.mean_humidity)
+        row = db.session.execute(
+            sa.select(*[aggregate(column) for column in columns
+                        for aggregate in (sa.func.sum, sa.func.count)])
+            .where(*conditions)
+        ).one()
+
+        if not row[1] or not row[3] or not row[5]:
+            raise FileNotFoundError('no readings found for the period')
+
+        return {
+            'max_temp_avg': round(row[0] / row[1]),
+            'min_temp_avg': round(row[2] / row[3]),
+            'mean_humidity_avg': round(row[4] / row[5]),
+        }
+
+
+def get_backend() -> Backend:
+    """Returns the storage backend selected by the WEATHERMAN_BACKEND setting.
+
+    The backend is created on first use and kept in the app extensions, so its caches and
+    connections are shared by every request. Besides the weatherman backends, 'sql' selects the
+    daily_reading table of the app database. The columnar and sqlite backends write to disk, so
+    they are only created once WEATHER_CACHE_PATH or WEATHER_SQLITE_PATH tells them where. The
+    files and columnar backends get a MonthLoader of WEATHER_LOADER_WORKERS threads.
+
+        Returns:
+            Backend: The configured backend.
+
+        Raises:
+            EnvVariableNotSet: If the path a writing backend writes to is not set.
+    """
+
+    backend = app.extensions.get('weatherman_backend')
+    if backend is not None:
+        return backend
+
+    with _extensions_lock:
+        backend = app.extensions.get('weatherman_backend')
+        if backend is None:
+            name = app.config['WEATHERMAN_BACKEND']
+            if name == 'columnar' and WEATHER_CACHE_PATH is None:
+                raise EnvVariableNotSet('WEATHER_CACHE_PATH')
+            if name == 'sqlite' and WEATHER_SQLITE_PATH is None:
+                raise EnvVariableNotSet('WEATHER_SQLITE_PATH')
+
+            if name == 'sql':
+                backend = SQLAlchemyBackend()
+            else:
+                loader = None
+                if name in ('files', 'columnar'):
+                    loader = MonthLoader(WEATHER_LOADER_WORKERS)
+                backend = create_backend(name, WEATHER_FILES_PATH, WEATHER_CACHE_PATH,
+                                         WEATHER_SQLITE_PATH, loader)
+            app.extensions['weatherman_backend'] = backend
+
+    return backend
+
+
+def get_report_cache() -> ReportCache:
+    """Returns the report cache shared by every request, sized by the app config.
+
+        Returns:
+            ReportCache: The report cache.
+    """
+
+    report_cache = app.extensions.get('weatherman_report_cache')
+    if report_cache is not None:
+        return report_cache
+
+    with _extensions_lock:
+        report_cache = app.extensions.get('weatherman_report_cache')
+        if report_cache is None:
+            report_cache = ReportCache(app.config['WEATHERMAN_REPORT_CACHE_SIZE'],
+                                       app.config['WEATHERMAN_REPORT_CACHE_TTL'])
+            app.extensions['weatherman_report_cache'] = report_cache
+
+    return report_cache
+
+
+def get_single_flight() -> SingleFlight:
+    """Returns the single flight concurrent requests for the same report are coalesced in.
+
+        Returns:
+            SingleFlight: The single flight shared by every request.
+    """
+
+    single_flight = app.extensions.get('weatherman_single_flight')
+    if single_flight is not None:
+        return single_flight
+
+    with _extensions_lock:
+        single_flight = app.extensions.get('weatherman_single_flight')
+        if single_flight is None:
+            single_flight = app.extensions['weatherman_single_flight'] = SingleFlight()
+
+    return single_flight
@@ -0,0 +1,335 @@
+"""Hot Path Benchmarks
+
+This module times the hot paths of weatherman on synthetic datasets of several sizes: reading
+weatherfiles with read_csv(), loading months and years with DataReader, every calc strategy on
+every engine, every report strategy, and every report strategy end to end through
+process_args(), which answers from monthly summaries where it can, like the app does. Each
+benchmark records its throughput, from the best of several runs, and the peak memory allocated
+during a separate traced run.
+
+Results are compared with a baseline file, and the run fails if a benchmark lost more
+throughput, or gained more peak memory, than the threshold allows. Timed runs of the
+benchmarks of a dataset are interleaved, so a slow spell of a shared machine slows down one
+run of many benchmarks instead of every run of one. Throughput still depends on the machine,
+so the baseline is not under version control: save one with --save on every machine before
+comparing, and again after a deliberate trade-off.
+
+Usage:
+    python -m benchmarks.hot_paths
+    python -m benchmarks.hot_paths --sizes small medium --save
+
+Attributes:
+    SIZES (dict): Number of years of readings in the dataset of every size.
+    BASELINE_PATH (str): Path of the baseline file of this machine.
+    THRESHOLD (float): Default share of throughput or peak memory a benchmark may regress by.
+    MEMORY_SLACK_KIB (int): Growth of peak memory in KiB which never counts as a regression,
+        so benchmarks allocating next to nothing are not failed by a few stray objects.
+    MIN_RUN_SECONDS (float): Shortest time a timed run of a benchmark lasts.
+    REPORT_INPUTS (dict): Name of the calc strategy whose computations every report strategy
+        is generated from, and which process_args() runs it with.
+    YEARLY_STRATEGIES (tuple): Names of the strategies which run on the readings of a year.
+
+"""
+
+import argparse
+import functools
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Iterable, Iterator, Optional
+
+from weatherman.backends import TextFileBackend
+from weatherman.helper import read_csv
+from weatherman.index import WeatherFileIndex
+from weatherman.runner import (CALC_STRATEGIES, ENGINES, REPORT_STRATEGIES, Calculator,
+                               DataReader, ReportGenerator, process_args)
+from weatherman.synth import generate
+
+SIZES = {'small': 1, 'medium': 10, 'large': 40}
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+THRESHOLD = 0.3
+MEMORY_SLACK_KIB = 64
+MIN_RUN_SECONDS = 0.05
+
+REPORT_INPUTS = {
+    'generate_report': 'compute',
+    'generate_average_report': 'compute_monthly_average',
+    'generate_multiple_bar_report': 'compute_min_max',
+    'generate_single_bar_report': 'compute_min_max',
+    'generate_daily_report': 'compute_min_max',
+}
+
+YEARLY_STRATEGIES = ('compute', 'generate_report')
+
+STATION = 'Bench'
+FIRST_YEAR = 1950
+
+
+def _calibrate(func: Callable[[], object]) -> int:
+    """Returns how often a benchmark is called per timed run to last MIN_RUN_SECONDS."""
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= MIN_RUN_SECONDS:
+            return number
+        number *= 2
+
+
+def _time(func: Callable[[], object], number: int) -> float:
+    """Returns the seconds one call of a benchmark took, over a run of number calls."""
+
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return (time.perf_counter() - start) / number
+
+
+def _peak(func: Callable[[], object]) -> float:
+    """Returns the peak memory in KiB allocated during one traced call of a benchmark."""
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(cases: list[tuple[str, int, Callable[[], object]]],
+            repeat: int) -> dict[str, dict[str, float]]:
+    """Times benchmarks and traces their peak memory.
+
+    Every round times one run of every benchmark, and the fastest run of each benchmark is
+    kept. A run calls its benchmark as often as it takes to last MIN_RUN_SECONDS.
+
+        Args:
+            cases (list): Tuples of name of a benchmark, number of items, e.g. rows, one call
+                goes through and the benchmark.
+            repeat (int): Number of rounds.
+
+        Returns:
+            dict: Dictionary mapping the name of every benchmark to its items per second and
+                its peak memory in KiB.
+    """
+
+    numbers = [_calibrate(func) for _, _, func in cases]
+    best = [float('inf')] * len(cases)
+    for _ in range(repeat):
+        for position, ((_, _, func), number) in enumerate(zip(cases, numbers)):
+            best[position] = min(best[position], _time(func, number))
+
+    return {name: {'throughput': round(items / seconds), 'peak_kib': round(_peak(func), 1)}
+            for (name, items, func), seconds in zip(cases, best)}
+
+
+def _engines() -> tuple[str, ...]:
+    """Returns the engines calc strategies can run on in this environment."""
+
+    if importlib.util.find_spec('numpy') is None:
+        return tuple(engine for engine in ENGINES if engine != 'numpy')
+    return ENGINES
+
+
+def _calc(readings: Iterable, name: str, engine: str) -> Callable[[], list]:
+    """Returns a benchmark computing a calc strategy on every month or year of readings."""
+
+    readings = list(readings)
+    return lambda: [Calculator(month, name, engine).compute() for month in readings]
+
+
+def _report(results: dict[str, dict], name: str) -> Callable[[], list]:
+    """Returns a benchmark generating and rendering a report strategy for every date."""
+
+    def run() -> list:
+        reports = []
+        for date, computed in results.items():
+            generator = ReportGenerator(computed, date, name)
+            reports.append((generator.generate_report(), generator.render()))
+        return reports
+
+    return run
+
+
+def _cases(files_dir: str, years: list[int]) -> Iterator[tuple[str, int, Callable[[], object]]]:
+    """Generates the benchmarks of a dataset.
+
+        Args:
+            files_dir (str): The directory holding the weatherfiles of the dataset.
+            years (list): Years of the dataset.
+
+        Yields:
+            tuple: Name of the benchmark, number of items one run goes through and the
+                benchmark.
+    """
+
+    months = [f'{year}/{month}' for year in years for month in range(1, 13)]
+    year_dates = [str(year) for year in years]
+    index = WeatherFileIndex(files_dir)
+    paths = [path for year in years for path in index.get_year(year, STATION)]
+
+    monthly = {date: DataReader(files_dir, date, station=STATION).get_monthly_readings()
+               for date in months}
+    yearly = {date: DataReader(files_dir, date, station=STATION).get_yearly_readings()
+              for date in year_dates}
+    n_rows = sum(len(readings.days) for readings in monthly.values())
+
+    yield 'read_csv', n_rows, lambda: [read_csv(path) for path in paths]
+    yield 'DataReader.get_monthly_readings', n_rows, lambda: [
+        DataReader(files_dir, date, station=STATION).get_monthly_readings() for date in months]
+    yield 'DataReader.get_yearly_readings', n_rows, lambda: [
+        DataReader(files_dir, date, station=STATION).get_yearly_readings()
+        for date in year_dates]
+
+    computations = {}
+    for name in CALC_STRATEGIES.names():
+        readings = yearly if name in YEARLY_STRATEGIES else monthly
+        computations[name] = {date: Calculator(month, name, 'python').compute()
+                              for date, month in readings.items()}
+        for engine in _engines():
+            yield f'calc.{name}[{engine}]', n_rows, _calc(readings.values(), name, engine)
+
+    for name in REPORT_STRATEGIES.names():
+        if name not in REPORT_INPUTS:
+            raise ValueError(f'report strategy {name!r} has no calc strategy in REPORT_INPUTS')
+        results = computations[REPORT_INPUTS[name]]
+        yield f'report.{name}', len(results), _report(results, name)
+
+    # One backend for every run, so its summaries stay warm as they do in a server
+    backend = TextFileBackend(files_dir)
+    for name in REPORT_STRATEGIES.names():
+        strategies = {'calc_strategy': REPORT_INPUTS[name], 'report_strategy': name}
+        yearly = REPORT_INPUTS[name] in YEARLY_STRATEGIES
+        dates = year_dates if yearly else months
+        yield f'process_args.{name}', len(dates), functools.partial(
+            process_args, dates, 1, files_dir, strategies, yearly, backend=backend, quiet=True)
+
+
+def run_suite(sizes: Iterable[str], repeat: int = 5, seed: int = 0,
+              log: Optional[Callable[[str], object]] = None) -> dict[str, dict[str, float]]:
+    """Runs every benchmark on a synthetic dataset of every size.
+
+        Args:
+            sizes (iterable): Names of the sizes, from SIZES.
+            repeat (int, optional): Number of timed rounds of the benchmarks. Defaults to 5.
+            seed (int, optional): Seed of the synthetic datasets. Defaults to 0.
+            log (callable, optional): Function called with a line for every finished
+                benchmark. Defaults to None.
+
+        Returns:
+            dict: Dictionary mapping benchmark names, prefixed with their size, to the results
+                of measure().
+    """
+
+    results = {}
+    for size in sizes:
+        years = list(range(FIRST_YEAR, FIRST_YEAR + SIZES[size]))
+        with tempfile.TemporaryDirectory() as files_dir:
+            generate(files_dir, [STATION], years, missing=0.02, seed=seed)
+            measured = measure(list(_cases(files_dir, years)), repeat)
+
+        for name, result in measured.items():
+            results[f'{size}/{name}'] = result
+            if log is not None:
+                log(f'{size}/{name}: {result["throughput"]:,.0f}/s, '
+                    f'{result["peak_kib"]:,.0f} KiB peak')
+
+    return results
+
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]],
+            threshold: float = THRESHOLD) -> list[str]:
+    """Returns the regressions of benchmark results against a baseline.
+
+    Benchmarks missing from either side, such as those of an engine which is not installed,
+    are not compared.
+
+        Args:
+            results (dict): Benchmark results, as run_suite() returns them.
+            baseline (dict): Benchmark results of the baseline.
+            threshold (float, optional): Share of throughput or peak memory a benchmark may
+                regress by. Defaults to THRESHOLD.
+
+        Returns:
+            list: Description of every regression, empty if there is none.
+    """
+
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+
+        if result['throughput'] < base['throughput'] * (1 - threshold):
+            regressions.append(f'{name}: throughput fell '
+                               f'{1 - result["throughput"] / base["throughput"]:.0%}, '
+                               f'now {result["throughput"]:,.0f}/s, '
+                               f'was {base["throughput"]:,.0f}/s')
+        if result['peak_kib'] > max(base['peak_kib'] * (1 + threshold),
+                                    base['peak_kib'] + MEMORY_SLACK_KIB):
+            regressions.append(f'{name}: peak memory grew '
+                               f'{result["peak_kib"] / base["peak_kib"] - 1:.0%}, '
+                               f'now {result["peak_kib"]:,.0f} KiB, '
+                               f'was {base["peak_kib"]:,.0f} KiB')
+
+    return regressions
+
+
+def main() -> None:
+    """Main function.
+
+    Runs the benchmarks, then saves them as the baseline or compares them with it. Exits with
+    status 1 if a benchmark regressed.
+    """
+    parser = argparse.ArgumentParser(description='benchmark the hot paths of weatherman')
+    parser.add_argument('--sizes', help='dataset sizes to run', nargs='+', choices=SIZES,
+                        default=list(SIZES))
+    parser.add_argument('--repeat', help='timed runs of every benchmark', type=int, default=5)
+    parser.add_argument('--baseline', help='baseline file', default=BASELINE_PATH)
+    parser.add_argument('--threshold', help='share a benchmark may regress by', type=float,
+                        default=THRESHOLD)
+    parser.add_argument('--save', help='save the results as the baseline',
+                        action='store_true')
+
+    args = parser.parse_args()
+
+    results = run_suite(args.sizes, args.repeat, log=print)
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as baseline_file:
+                baseline = json.load(baseline_file)['results']
+        baseline.update(results)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump({'python': platform.python_version(), 'results': baseline},
+                      baseline_file, indent=2, sort_keys=True)
+            baseline_file.write('\n')
+        print(f'saved {len(results)} benchmarks to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        sys.exit(f'no baseline at {args.baseline}, save one with --save')
+
+    with open(args.baseline) as baseline_file:
+        regressions = compare(results, json.load(baseline_file)['results'], args.threshold)
+
+    if regressions:
+        print(f'{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}:')
+        for regression in regressions:
+            print(f'  {regression}')
+        sys.exit(1)
+
+    print(f'no benchmark regressed by more than {args.threshold:.0%}')
+
+
+if __name__ == '__main__':
+    main()
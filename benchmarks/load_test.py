@@ -0,0 +1,444 @@
+"""HTTP Load Test
+
+This module measures how many report requests per second one server process can answer, and how
+latency degrades as concurrency grows. It starts the app in a separate process on a local port,
+with SQLite standing in for Postgres and a synthetic dataset standing in for the weatherfiles,
+registers and logs in a user through /auth to obtain a JWT, then drives the report endpoints
+from concurrent clients for a fixed time and reports throughput and p50/p95/p99 latency.
+
+The server answers one request at a time unless --threaded is given, like a synchronous
+gunicorn worker. Only the standard library is used on the client side, so the client costs as
+little as possible of the CPU it shares with the server.
+
+Usage:
+    python -m benchmarks.load_test --concurrency 8 --duration 30
+    python -m benchmarks.load_test --mix yearly_report=1 monthly_report=4 --threaded
+    python -m benchmarks.load_test --url http://127.0.0.1:5000 --data weatherfiles
+
+Attributes:
+    ENDPOINTS (dict): Path and date parameter of every endpoint the load test can drive.
+    PERCENTILES (tuple): Latency percentiles reported for every endpoint.
+
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlencode, urlsplit
+
+from weatherman.index import parse_file_name
+from weatherman.synth import generate, station_names
+
+ENDPOINTS = {
+    'yearly_report': ('/api/weatherman/yearly_report', 'year'),
+    'monthly_report': ('/api/weatherman/monthly_report', 'date'),
+}
+
+PERCENTILES = (50, 95, 99)
+
+USER = {'email': 'load@example.com', 'username': 'load', 'password': 'load-test-password'}
+
+
+def parse_mix(entries: list[str]) -> dict[str, float]:
+    """Parses a request mix such as ['yearly_report=1', 'monthly_report=3'].
+
+        Args:
+            entries (list): Entries of an endpoint name from ENDPOINTS and its weight.
+
+        Returns:
+            dict: Dictionary mapping endpoint names to their weights.
+
+        Raises:
+            ValueError: If an endpoint is unknown or a weight is not a positive number.
+    """
+
+    mix = {}
+    for entry in entries:
+        name, _, weight = entry.partition('=')
+        if name not in ENDPOINTS:
+            raise ValueError(f'unknown endpoint {name!r}, expected one of {tuple(ENDPOINTS)}')
+        mix[name] = float(weight or 1)
+        if mix[name] <= 0:
+            raise ValueError(f'weight of {name!r} must be positive, got {weight}')
+
+    return mix
+
+
+def percentile(latencies: list[float], percent: float) -> float:
+    """Returns a percentile of sorted latencies, by the nearest rank method.
+
+        Args:
+            latencies (list): The latencies, sorted in ascending order.
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The latency of the percentile, or NaN without latencies.
+    """
+
+    if not latencies:
+        return float('nan')
+    rank = max(math.ceil(percent * len(latencies) / 100), 1)
+    return latencies[rank - 1]
+
+
+def dataset_dates(files_dir: str) -> dict[str, list[str]]:
+    """Returns the dates of the weatherfiles in a directory, by the parameter they fill.
+
+        Args:
+            files_dir (str): The directory pointing to weatherfiles.
+
+        Returns:
+            dict: Dictionary mapping 'year' to the years and 'date' to the months, e.g.
+                2004/8, of the weatherfiles.
+    """
+
+    months = set()
+    for file_name in os.listdir(files_dir):
+        parsed = parse_file_name(file_name)
+        if parsed is not None:
+            months.add(parsed[1:])
+
+    return {'year': sorted({str(year) for year, _ in months}),
+            'date': [f'{year}/{month}' for year, month in sorted(months)]}
+
+
+def _request(connection: http.client.HTTPConnection, method: str, path: str,
+             body: Optional[dict] = None,
+             headers: Optional[dict] = None) -> tuple[int, bytes]:
+    """Sends a request and returns its status and body, reconnecting a dropped connection."""
+
+    headers = dict(headers or {})
+    payload = None
+    if body is not None:
+        payload = json.dumps(body)
+        headers['Content-Type'] = 'application/json'
+
+    for attempt in range(2):
+        try:
+            connection.request(method, path, payload, headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (ConnectionError, http.client.HTTPException):
+            connection.close()
+            if attempt:
+                raise
+
+
+def login(url: str) -> str:
+    """Registers the load test user if needed, logs it in and returns its access token.
+
+        Args:
+            url (str): Base URL of the server.
+
+        Returns:
+            str: The JWT access token.
+
+        Raises:
+            RuntimeError: If the user cannot log in.
+    """
+
+    connection = _connect(url)
+    try:
+        _request(connection, 'POST', '/auth/register', USER)
+        status, body = _request(connection, 'POST', '/auth/login', USER)
+    finally:
+        connection.close()
+
+    if status != 200:
+        raise RuntimeError(f'login failed with status {status}: {body[:200]!r}')
+    return json.loads(body)['access_token']
+
+
+def _connect(url: str) -> http.client.HTTPConnection:
+    """Returns a connection to the server at a base URL."""
+
+    parts = urlsplit(url)
+    return http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+
+
+def _client(url: str, token: str, mix: dict[str, float], dates: dict[str, list[str]],
+            start: float, deadline: float, seed: int) -> dict[str, dict]:
+    """Sends requests until the deadline, recording the latencies of those sent after start.
+
+        Returns:
+            dict: Dictionary mapping endpoint names to their latencies in seconds and their
+                number of errors.
+    """
+
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    headers = {'Authorization': f'Bearer {token}'}
+    recorded = {name: {'latencies': [], 'errors': 0} for name in names}
+
+    connection = _connect(url)
+    try:
+        while True:
+            name = rng.choices(names, weights)[0]
+            path, parameter = ENDPOINTS[name]
+            query = urlencode({parameter: rng.choice(dates[parameter])})
+
+            sent = time.perf_counter()
+            if sent >= deadline:
+                break
+            try:
+                status, _ = _request(connection, 'GET', f'{path}?{query}', headers=headers)
+            except (OSError, http.client.HTTPException):
+                status = None
+            elapsed = time.perf_counter() - sent
+
+            if sent < start:
+                continue
+            if status in (200, 304):
+                recorded[name]['latencies'].append(elapsed)
+            else:
+                recorded[name]['errors'] += 1
+    finally:
+        connection.close()
+
+    return recorded
+
+
+def run_load(url: str, mix: dict[str, float], dates: dict[str, list[str]],
+             concurrency: int = 4, duration: float = 10.0, warmup: float = 1.0,
+             seed: int = 0) -> dict:
+    """Drives the report endpoints of a server from concurrent clients.
+
+        Args:
+            url (str): Base URL of the server.
+            mix (dict): Dictionary mapping endpoint names to the weight they are requested with.
+            dates (dict): Dates requests pick from, as dataset_dates() returns them.
+            concurrency (int, optional): Number of clients sending requests at the same time.
+                Defaults to 4.
+            duration (float, optional): Seconds requests are recorded for. Defaults to 10.
+            warmup (float, optional): Seconds requests are sent for before recording starts.
+                Defaults to 1.
+            seed (int, optional): Seed of the requested endpoints and dates. Defaults to 0.
+
+        Returns:
+            dict: The concurrency and duration, and for every endpoint and for all of them
+                together the number of requests and errors, the requests per second and the
+                latency percentiles in milliseconds.
+    """
+
+    token = login(url)
+    start = time.perf_counter() + warmup
+    deadline = start + duration
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        futures = [executor.submit(_client, url, token, mix, dates, start, deadline, seed + n)
+                   for n in range(concurrency)]
+        recorded = [future.result() for future in futures]
+
+    results = {'concurrency': concurrency, 'duration': duration, 'endpoints': {}}
+    for name in [*mix, 'total']:
+        names = mix if name == 'total' else [name]
+        latencies = sorted(latency for client in recorded for endpoint in names
+                           for latency in client[endpoint]['latencies'])
+        errors = sum(client[endpoint]['errors'] for client in recorded for endpoint in names)
+        results['endpoints'][name] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': len(latencies) / duration,
+            **{f'p{percent}_ms': percentile(latencies, percent) * 1000
+               for percent in PERCENTILES},
+        }
+
+    return results
+
+
+def _wait_for_port(host: str, port: int, server: subprocess.Popen,
+                   timeout: float = 30.0) -> None:
+    """Waits until a server accepts connections, failing early if its process exits."""
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f'server exited with status {server.returncode}')
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+
+    raise RuntimeError(f'server did not listen on {host}:{port} within {timeout}s')
+
+
+def _free_port() -> int:
+    """Returns a local port nothing listens on."""
+
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def start_server(files_dir: str, work_dir: str, threaded: bool = False,
+                 backend: str = 'columnar',
+                 report_cache_size: Optional[int] = None) -> tuple[subprocess.Popen, str]:
+    """Starts the app in a separate process, backed by SQLite and a weatherfiles directory.
+
+        Args:
+            files_dir (str): The directory pointing to weatherfiles.
+            work_dir (str): Directory for the database and the parsed weatherfiles cache.
+            threaded (bool, optional): Whether the server answers requests concurrently.
+                Defaults to False.
+            backend (str, optional): The WEATHERMAN_BACKEND of the app. Defaults to
+                'columnar'.
+            report_cache_size (int, optional): The WEATHERMAN_REPORT_CACHE_SIZE of the app.
+                Defaults to None, which keeps the size of the environment or the app default.
+
+        Returns:
+            tuple: The server process and its base URL.
+    """
+
+    port = _free_port()
+    cache_dir = os.path.join(work_dir, 'cache')
+    os.makedirs(cache_dir, exist_ok=True)
+    env = {
+        **os.environ,
+        'SECRET_KEY': os.urandom(32).hex(),
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{os.path.join(work_dir, "load_test.db")}',
+        'WEATHER_FILES_PATH': files_dir,
+        'WEATHER_CACHE_PATH': cache_dir,
+        'WEATHER_SQLITE_PATH': os.path.join(work_dir, 'weather.db'),
+        'WEATHERMAN_BACKEND': backend,
+    }
+    if report_cache_size is not None:
+        env['WEATHERMAN_REPORT_CACHE_SIZE'] = str(report_cache_size)
+    command = [sys.executable, '-m', 'benchmarks.load_test', '--serve', str(port)]
+    if threaded:
+        command.append('--threaded')
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(command, cwd=root, env=env)
+    try:
+        _wait_for_port('127.0.0.1', port, server)
+    except RuntimeError:
+        server.kill()
+        server.wait()
+        raise
+
+    return server, f'http://127.0.0.1:{port}'
+
+
+def serve(port: int, threaded: bool = False) -> None:
+    """Serves the app on a local port until the process is stopped.
+
+        Args:
+            port (int): The port.
+            threaded (bool, optional): Whether requests are answered concurrently. Defaults
+                to False.
+    """
+
+    # The app reads its settings from the environment when it is imported
+    from werkzeug.serving import make_server
+
+    from app import db, init_app
+
+    app = init_app()
+    with app.app_context():
+        db.create_all()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    make_server('127.0.0.1', port, app, threaded=threaded).serve_forever()
+
+
+def format_results(results: dict) -> str:
+    """Returns load test results as a table."""
+
+    lines = [f'{results["concurrency"]} clients for {results["duration"]:g}s',
+             f'{"endpoint":<16}{"requests":>10}{"errors":>8}{"req/s":>10}'
+             + ''.join(f'{f"p{percent} ms":>10}' for percent in PERCENTILES)]
+    for name, endpoint in results['endpoints'].items():
+        lines.append(f'{name:<16}{endpoint["requests"]:>10}{endpoint["errors"]:>8}'
+                     f'{endpoint["throughput"]:>10.1f}'
+                     + ''.join(f'{endpoint[f"p{percent}_ms"]:>10.2f}'
+                               for percent in PERCENTILES))
+
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    """Main function.
+
+    Starts a local server unless --url is given, runs the load test against it and prints the
+    results. A running server needs --data, the weatherfiles it reads, so requests are sent for
+    dates it can report.
+    """
+    parser = argparse.ArgumentParser(description='load test the report endpoints')
+    parser.add_argument('--url', help='base URL of a running server, instead of starting one')
+    parser.add_argument('--data', help='weatherfiles directory, instead of a synthetic one; '
+                        'with --url, the directory the server reads, as request dates come '
+                        'from it')
+    parser.add_argument('--stations', help='stations of the synthetic dataset', type=int,
+                        default=1)
+    parser.add_argument('--years', help='years of the synthetic dataset', type=int,
+                        default=10)
+    parser.add_argument('--mix', help='endpoints and their weights, e.g. monthly_report=3',
+                        nargs='+', default=['yearly_report=1', 'monthly_report=1'])
+    parser.add_argument('--concurrency', help='number of concurrent clients', type=int,
+                        default=4)
+    parser.add_argument('--duration', help='seconds requests are recorded for', type=float,
+                        default=10.0)
+    parser.add_argument('--warmup', help='seconds requests are sent before recording',
+                        type=float, default=1.0)
+    parser.add_argument('--threaded', help='let the server answer requests concurrently',
+                        action='store_true')
+    parser.add_argument('--backend', help='storage backend of the started server',
+                        default='columnar')
+    parser.add_argument('--report-cache-size', help='reports the started server keeps cached, '
+                        '1 to generate nearly every report', type=int)
+    parser.add_argument('--seed', help='seed of the requests and the dataset', type=int,
+                        default=0)
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--serve', help=argparse.SUPPRESS, type=int)
+
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        serve(args.serve, args.threaded)
+        return
+
+    if args.url is not None and args.data is None:
+        parser.error('--url requires --data, as requests are sent for the dates of its '
+                     'weatherfiles')
+
+    mix = parse_mix(args.mix)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        files_dir = args.data
+        if files_dir is None:
+            files_dir = os.path.join(work_dir, 'weatherfiles')
+            generate(files_dir, station_names(args.stations), range(2000, 2000 + args.years),
+                     missing=0.02, seed=args.seed)
+
+        server, url = None, args.url
+        if url is None:
+            server, url = start_server(os.path.abspath(files_dir), work_dir, args.threaded,
+                                       args.backend, args.report_cache_size)
+        try:
+            results = run_load(url, mix, dataset_dates(files_dir), args.concurrency,
+                               args.duration, args.warmup, args.seed)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    print(format_results(results))
+    if args.json:
+        with open(args.json, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
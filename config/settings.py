@@ -1,3 +1,5 @@
+import os
+
 from dotenv import load_dotenv, find_dotenv
 
 from config.env_vars import required_env_var
@@ -9,3 +11,8 @@ class Config:
     SECRET_KEY = required_env_var('SECRET_KEY')
     SQLALCHEMY_DATABASE_URI = required_env_var('SQLALCHEMY_DATABASE_URI')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    WEATHERMAN_BACKEND = os.environ.get('WEATHERMAN_BACKEND', 'files')
+    WEATHERMAN_REPORT_CACHE_SIZE = int(os.environ.get('WEATHERMAN_REPORT_CACHE_SIZE', 256))
+    WEATHERMAN_REPORT_CACHE_TTL = float(os.environ.get('WEATHERMAN_REPORT_CACHE_TTL', 3600))
+    WEATHERMAN_RANGE_MAX_AGE = float(os.environ.get('WEATHERMAN_RANGE_MAX_AGE', 1))
+    WEATHERMAN_TIMINGS = os.environ.get('WEATHERMAN_TIMINGS', 'false').lower() in ('1', 'true')
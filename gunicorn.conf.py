@@ -0,0 +1,6 @@
+from prometheus_client import multiprocess
+
+
+def child_exit(server, worker):
+    # Drop the live metrics of exited workers, see app/metrics.py
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from benchmarks import hot_paths, load_test
+from benchmarks.hot_paths import compare, run_suite
+from benchmarks.load_test import (dataset_dates, parse_mix, percentile, run_load,
+                                  start_server)
+from weatherman.runner import CALC_STRATEGIES, REPORT_STRATEGIES
+from weatherman.synth import generate
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_suite(self):
+        with mock.patch.object(hot_paths, 'MIN_RUN_SECONDS', 0):
+            results = run_suite(['small'], repeat=1)
+
+        self.assertIn('small/read_csv', results)
+        self.assertIn('small/DataReader.get_yearly_readings', results)
+        for name in CALC_STRATEGIES.names():
+            self.assertIn(f'small/calc.{name}[python]', results)
+        for name in REPORT_STRATEGIES.names():
+            self.assertIn(f'small/report.{name}', results)
+            self.assertIn(f'small/process_args.{name}', results)
+        self.assertTrue(all(result['throughput'] > 0 and result['peak_kib'] >= 0
+                            for result in results.values()))
+
+    def test_compare(self):
+        baseline = {
+            'small/read_csv': {'throughput': 1000, 'peak_kib': 1000},
+            'small/calc.compute[numpy]': {'throughput': 1000, 'peak_kib': 10},
+        }
+        results = {
+            'small/read_csv': {'throughput': 800, 'peak_kib': 1200},
+            'small/report.generate_report': {'throughput': 1, 'peak_kib': 1},
+        }
+        self.assertEqual(compare(results, baseline, 0.25), [])
+
+        results['small/read_csv'] = {'throughput': 700, 'peak_kib': 1300}
+        regressions = compare(results, baseline, 0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith('small/read_csv: throughput fell 30%'))
+
+        results = {'small/calc.compute[numpy]': {'throughput': 1000, 'peak_kib': 60}}
+        self.assertEqual(compare(results, baseline, 0.25), [])
+
+
+class TestLoadTest(unittest.TestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix(['yearly_report=1', 'monthly_report=2.5']),
+                         {'yearly_report': 1.0, 'monthly_report': 2.5})
+        self.assertEqual(parse_mix(['monthly_report']), {'monthly_report': 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix(['range_report=1'])
+        with self.assertRaises(ValueError):
+            parse_mix(['yearly_report=0'])
+
+    def test_percentile(self):
+        latencies = [float(n) for n in range(1, 101)]
+        self.assertEqual([percentile(latencies, percent) for percent in (50, 95, 99, 100)],
+                         [50.0, 95.0, 99.0, 100.0])
+        self.assertEqual(percentile([3.0], 99), 3.0)
+        self.assertNotEqual(percentile([], 50), percentile([], 50))
+
+    def test_run_load(self):
+        with tempfile.TemporaryDirectory() as work_dir:
+            files_dir = os.path.join(work_dir, 'weatherfiles')
+            generate(files_dir, ['Murree'], [2004])
+            dates = dataset_dates(files_dir)
+            self.assertEqual(dates['year'], ['2004'])
+            self.assertEqual(len(dates['date']), 12)
+
+            server, url = start_server(files_dir, work_dir)
+            try:
+                results = run_load(url, parse_mix(['yearly_report', 'monthly_report']), dates,
+                                   concurrency=2, duration=0.5, warmup=0)
+            finally:
+                server.terminate()
+                server.wait()
+
+        total = results['endpoints']['total']
+        self.assertGreater(total['requests'], 0)
+        self.assertEqual(total['errors'], 0)
+        self.assertEqual(total['requests'], results['endpoints']['yearly_report']['requests']
+                         + results['endpoints']['monthly_report']['requests'])
+        self.assertLessEqual(total['p50_ms'], total['p99_ms'])
+
+    def test_url_requires_data(self):
+        argv = ['load_test', '--url', 'http://127.0.0.1:5000']
+        with mock.patch.object(load_test, 'generate') as generate_dataset:
+            with mock.patch('sys.argv', argv), mock.patch('sys.stderr'):
+                with self.assertRaises(SystemExit):
+                    load_test.main()
+        generate_dataset.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
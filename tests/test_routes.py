@@ -1,5 +1,17 @@
+import json
+import os
+import tempfile
 import unittest
-from app import app
+from unittest import mock
+
+from flask_jwt_extended import create_access_token
+from prometheus_client import REGISTRY, generate_latest
+
+from app import app, db, init_app
+from app.metrics import metrics_registry
+from tests.test_weatherman import WeatherFilesTestCase, write_weatherfile
+from weatherman import timing
+from weatherman.backends import TextFileBackend
 
 
 class TestRoutes(unittest.TestCase):
@@ -20,5 +32,218 @@ class TestRoutes(unittest.TestCase):
         pass
 
 
+class TestConditionalReports(WeatherFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        if 'api' not in app.blueprints:
+            init_app()
+        with app.app_context():
+            token = create_access_token(identity='tester')
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.client = app.test_client()
+
+        backend = TextFileBackend(self.files_dir)
+        patcher = mock.patch('app.routes.api.get_backend', return_value=backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url, **headers):
+        return self.client.get(url, headers={**self.headers, **headers})
+
+    def test_if_none_match(self):
+        self.addCleanup(timing.set_enabled, timing.is_enabled())
+        timing.set_enabled(True)
+        response = self.get('/api/weatherman/monthly_report?date=2004/8')
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIsNotNone(response.last_modified)
+        self.assertIn('validate;dur=', response.headers['Server-Timing'])
+
+        with mock.patch('app.routes.api.process_args') as process_args:
+            response = self.get('/api/weatherman/monthly_report?date=2004/8', If_None_Match=etag)
+            process_args.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['ETag'], etag)
+        self.assertEqual(response.get_data(), b'')
+
+        other = self.get('/api/weatherman/monthly_report?date=2004/2')
+        self.assertNotEqual(other.headers['ETag'], etag)
+        yearly = self.get('/api/weatherman/yearly_report?year=2004')
+        self.assertNotEqual(yearly.headers['ETag'], etag)
+
+    def test_if_modified_since(self):
+        response = self.get('/api/weatherman/yearly_report?year=2004')
+        last_modified = response.headers['Last-Modified']
+
+        with mock.patch('app.routes.api.process_args') as process_args:
+            response = self.get('/api/weatherman/yearly_report?year=2004',
+                                If_Modified_Since=last_modified)
+            process_args.assert_not_called()
+        self.assertEqual(response.status_code, 304)
+
+        response = self.get('/api/weatherman/yearly_report?year=2004',
+                            If_Modified_Since='Thu, 01 Jan 1970 00:00:00 GMT')
+        self.assertEqual(response.status_code, 200)
+
+    def test_month_metrics(self):
+        response = self.get('/api/weatherman/month_metrics?date=2004/8')
+        self.assertEqual(response.status_code, 200)
+        metrics = response.get_json()[0]
+        self.assertEqual(metrics['date'], '2004/8')
+        self.assertEqual(metrics['extremes']['max_date'], '6 August')
+        self.assertEqual(metrics['averages'], {'max_temp_avg': 31, 'min_temp_avg': -2,
+                                               'mean_humidity_avg': 44})
+        self.assertEqual(metrics['daily']['1'], {'max_temp': 29, 'min_temp': -2})
+
+        response = self.get('/api/weatherman/month_metrics?date=2004/8',
+                            If_None_Match=response.headers['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_daily_minmax(self):
+        response = self.get('/api/weatherman/daily_minmax?date=2004/8&date=2004/2')
+        self.assertTrue(response.is_streamed)
+        series = response.get_json()
+        self.assertEqual([month['date'] for month in series], ['2004/8', '2004/2'])
+        self.assertEqual(series[0]['days'][0], {'day': 1, 'max_temp': 29, 'min_temp': -2})
+        self.assertNotIn(3, [day['day'] for day in series[0]['days']])
+
+    def test_daily_minmax_streams_ndjson(self):
+        response = self.get('/api/weatherman/daily_minmax?start=2003/11&end=2004/3',
+                            Accept='application/x-ndjson')
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual([json.loads(line)['date'] for line in lines],
+                         ['2004/1', '2004/2', '2004/3'])
+
+        response = self.get('/api/weatherman/daily_minmax?start=2004/3&end=2004/1')
+        self.assertEqual(response.status_code, 400)
+
+    def test_daily_minmax_reports_failures(self):
+        with open(os.path.join(self.files_dir, 'Murree_weather_2004_Feb.txt'), 'a') as broken:
+            broken.write('2004-2-30,not a number,1,2\n')
+
+        response = self.get('/api/weatherman/daily_minmax?date=2004/2&date=2004/8')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.get('/api/weatherman/daily_minmax?start=2004/1&end=2004/3',
+                            Accept='application/x-ndjson')
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual([line['date'] for line in lines], ['2004/1', '2004/2'])
+        self.assertIn('error', lines[-1])
+
+        series = self.get('/api/weatherman/daily_minmax?start=2004/1&end=2004/3').get_json()
+        self.assertEqual(series[-1]['date'], '2004/2')
+        self.assertIn('error', series[-1])
+
+    def test_changed_weatherfile_is_sent_again(self):
+        response = self.get('/api/weatherman/monthly_report?date=2004/8')
+        etag = response.headers['ETag']
+
+        file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt')
+        write_weatherfile(self.files_dir, 'Murree', 2004, 8, 30)
+        os.utime(file_name, ns=(0, 10 ** 18))
+
+        response = self.get('/api/weatherman/monthly_report?date=2004/8', If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_range_report_follows_rewritten_weatherfile(self):
+        url = '/api/weatherman/range_report?start=2004-04-01&end=2004-04-30&column=Max TemperatureC'
+        response = self.get(url)
+        self.assertEqual(response.get_json()['columns']['Max TemperatureC']['max'], 30.0)
+
+        file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Apr.txt')
+        with open(file_name) as weather_file:
+            lines = weather_file.read().split('\n')
+        lines[1] = lines[1].replace('2004-4-1,25,', '2004-4-1,99,')
+        with open(file_name, 'w') as weather_file:
+            weather_file.write('\n'.join(lines))
+        os.utime(file_name, ns=(0, os.stat(file_name).st_mtime_ns + 1))
+
+        with mock.patch.dict(app.config, WEATHERMAN_RANGE_MAX_AGE=0):
+            response = self.get(url)
+        self.assertEqual(response.get_json()['columns']['Max TemperatureC']['max'], 99.0)
+
+
+class TestMetrics(WeatherFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        if 'api' not in app.blueprints:
+            init_app()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = app.test_client()
+        # Stage latencies are only recorded while stages are timed
+        self.addCleanup(timing.set_enabled, timing.is_enabled())
+        timing.set_enabled(True)
+
+        backend = TextFileBackend(self.files_dir)
+        patcher = mock.patch('app.routes.api.get_backend', return_value=backend)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        super().tearDown()
+
+    @staticmethod
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_auth_metrics(self):
+        requests = self.sample('weather_http_requests_total', blueprint='auth',
+                               endpoint='auth.login', method='POST', status='200')
+        hashes = self.sample('weather_bcrypt_duration_seconds_count', operation='hash')
+        verifies = self.sample('weather_bcrypt_duration_seconds_count', operation='verify')
+        inserts = self.sample('weather_db_queries_total', statement='insert')
+
+        user = {'email': 'tester@example.com', 'username': 'tester', 'password': 'secret'}
+        self.assertEqual(self.client.post('/auth/register', json=user).status_code, 201)
+        self.assertEqual(self.client.post('/auth/login', json=user).status_code, 200)
+
+        self.assertEqual(self.sample('weather_http_requests_total', blueprint='auth',
+                                     endpoint='auth.login', method='POST', status='200'),
+                         requests + 1)
+        self.assertEqual(self.sample('weather_bcrypt_duration_seconds_count',
+                                     operation='hash'), hashes + 1)
+        self.assertEqual(self.sample('weather_bcrypt_duration_seconds_count',
+                                     operation='verify'), verifies + 1)
+        self.assertEqual(self.sample('weather_db_queries_total', statement='insert'),
+                         inserts + 1)
+
+    def test_metrics_endpoint(self):
+        read_bytes = self.sample('weather_weatherfile_read_bytes_total')
+        with app.app_context():
+            token = create_access_token(identity='tester')
+        response = self.client.get('/api/weatherman/monthly_report?date=2004/8',
+                                   headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 200)
+
+        file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt')
+        self.assertEqual(self.sample('weather_weatherfile_read_bytes_total'),
+                         read_bytes + os.path.getsize(file_name))
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('weather_http_request_duration_seconds_bucket{blueprint="api",'
+                      'endpoint="api.weatherman_monthly_report"', text)
+        self.assertIn('weather_stage_duration_seconds_count{stage="generate"}', text)
+        self.assertIn('weather_cache_lookups_total{cache="report",result="miss"}', text)
+
+    def test_multiprocess_metrics(self):
+        multiproc_dir = tempfile.mkdtemp(dir=self.files_dir)
+        with mock.patch.dict(os.environ, PROMETHEUS_MULTIPROC_DIR=multiproc_dir):
+            registry = metrics_registry()
+        self.assertIsNot(registry, REGISTRY)
+        self.assertEqual(generate_latest(registry), b'')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,11 +1,42 @@
+import os
+import tempfile
 import unittest
 
+from weatherman.helper import iter_csv, parse_iso_date, parse_report_date, read_csv
+
 
 class TestUtils(unittest.TestCase):
-    def test_some_utility_function(self):
-        # result = some_utility_function(3, 4)
-        # self.assertEqual(result, 7)
-        pass
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.tmp.name, 'Murree_weather_2004_Aug.txt')
+        with open(self.file_path, 'w') as csv_file:
+            csv_file.write('PKST,Max TemperatureC, Mean Humidity, Events,WindDirDegrees\n'
+                           '2004-8-1,30,40,Rain,150\n'
+                           '2004-8-2,,42,"Fog,Rain",160\n'
+                           '\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_iter_csv_matches_read_csv(self):
+        self.assertEqual(list(iter_csv(self.file_path)), read_csv(self.file_path))
+
+    def test_iter_csv_projects_columns(self):
+        rows = list(iter_csv(self.file_path, ['PKT', 'Mean Humidity']))
+        self.assertEqual(rows, [{'PKT': '2004-8-1', 'Mean Humidity': '40'},
+                                {'PKT': '2004-8-2', 'Mean Humidity': '42'}])
+
+    def test_parse_iso_date(self):
+        self.assertEqual(parse_iso_date('2004-8-1'), (2004, 8, 1))
+        self.assertEqual(parse_iso_date('2004-08-31'), (2004, 8, 31))
+        for value in ('2004-13-1', '2004/8/1', '2004-8'):
+            with self.assertRaises(ValueError):
+                parse_iso_date(value)
+
+    def test_parse_report_date(self):
+        self.assertEqual(parse_report_date('2011/07'), (2011, 7))
+        with self.assertRaises(ValueError):
+            parse_report_date('2011')
 
 
 if __name__ == '__main__':
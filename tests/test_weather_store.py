@@ -0,0 +1,131 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from app import app, db
+from app.models.readings import DailyReading
+from app.weather_store import SQLAlchemyBackend, get_backend, import_weatherfiles
+from config.env_vars import EnvVariableNotSet
+from tests.test_weatherman import WeatherFilesTestCase, write_weatherfile
+from weatherman.backends import create_backend
+from weatherman.runner import (DataReader, compute_min_max, compute_monthly_average,
+                               generate_average_report, process_args)
+
+
+class TestWeatherStore(WeatherFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.imported = import_weatherfiles(self.files_dir)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        super().tearDown()
+
+    def test_import_replaces_existing_readings(self):
+        self.assertEqual(self.imported, 12 * 28 + 31)
+        import_weatherfiles(self.files_dir)
+        self.assertEqual(DailyReading.query.count(), self.imported)
+
+    def test_readings_match_weatherfiles(self):
+        for station, days in (('Murree', 28), ('Sibi', 31)):
+            readings = SQLAlchemyBackend().load_month(2004, 8, station=station)
+            self.assertEqual((readings.year, readings.month, len(readings)), (2004, 8, days))
+
+        readings = SQLAlchemyBackend().load_year(2004)
+        expected = DataReader(self.files_dir, '2004').get_yearly_readings()
+        for frame, expected_frame in zip(readings, expected):
+            self.assertEqual(frame.days, expected_frame.days)
+            self.assertEqual(frame.values('Events'), expected_frame.values('Events'))
+            self.assertEqual(list(frame.present('Max TemperatureC')),
+                             list(expected_frame.present('Max TemperatureC')))
+
+    def test_fingerprint_changes_on_import(self):
+        backend = SQLAlchemyBackend()
+        fingerprint = backend.fingerprint(2004, 8)
+        self.assertEqual(fingerprint[0], 28)
+        self.assertEqual(len(backend.load_history()), 12)
+        import_weatherfiles(self.files_dir)
+        self.assertNotEqual(backend.fingerprint(2004, 8), fingerprint)
+
+    def test_fingerprint_changes_when_ids_are_reused(self):
+        # Sibi holds the highest ids, so SQLite hands them out again to its new readings
+        sibi_dir = os.path.join(self.files_dir, 'sibi')
+        os.mkdir(sibi_dir)
+        write_weatherfile(sibi_dir, 'Sibi', 2004, 8, 31)
+        backend = SQLAlchemyBackend()
+        fingerprint = backend.fingerprint(2004, 8, 'Sibi')
+        generation = backend.generation()
+        import_weatherfiles(sibi_dir)
+        self.assertNotEqual(backend.fingerprint(2004, 8, 'Sibi'), fingerprint)
+        self.assertNotEqual(backend.generation(), generation)
+
+    def test_reports_match_weatherfiles(self):
+        yearly = {'calc_strategy': None, 'report_strategy': None}
+        self.assertEqual(
+            process_args(['2004'], 1, self.files_dir, yearly, True, backend=SQLAlchemyBackend()),
+            process_args(['2004'], 1, self.files_dir, yearly, True))
+
+        monthly = {'calc_strategy': compute_monthly_average,
+                   'report_strategy': generate_average_report}
+        self.assertEqual(
+            process_args(['2004/8', '2004/2'], 1, self.files_dir, monthly,
+                         backend=SQLAlchemyBackend()),
+            process_args(['2004/8', '2004/2'], 1, self.files_dir, monthly))
+
+    def test_min_max_is_computed_from_readings(self):
+        data_reader = DataReader(self.files_dir, '2004/8', backend=SQLAlchemyBackend())
+        self.assertIsNone(data_reader.aggregate(compute_min_max))
+
+
+class TestGetBackend(unittest.TestCase):
+    def setUp(self):
+        self.backend = app.extensions.pop('weatherman_backend', None)
+
+    def tearDown(self):
+        app.extensions.pop('weatherman_backend', None)
+        if self.backend is not None:
+            app.extensions['weatherman_backend'] = self.backend
+
+    def test_writing_backends_need_their_path(self):
+        for name, setting in (('columnar', 'WEATHER_CACHE_PATH'),
+                              ('sqlite', 'WEATHER_SQLITE_PATH')):
+            with mock.patch.dict(app.config, WEATHERMAN_BACKEND=name), \
+                    mock.patch(f'app.weather_store.{setting}', None):
+                with self.assertRaises(EnvVariableNotSet):
+                    get_backend()
+            self.assertNotIn('weatherman_backend', app.extensions)
+
+    def test_backend_is_created_once(self):
+        with tempfile.TemporaryDirectory() as files_dir, \
+                mock.patch.dict(app.config, WEATHERMAN_BACKEND='files'), \
+                mock.patch('app.weather_store.WEATHER_FILES_PATH', files_dir), \
+                mock.patch('app.weather_store.create_backend',
+                           wraps=create_backend) as create:
+            with ThreadPoolExecutor(8) as executor:
+                backends = list(executor.map(lambda _: get_backend(), range(32)))
+            self.assertEqual(len({id(backend) for backend in backends}), 1)
+            create.assert_called_once()
+            self.assertIsNotNone(backends[0].loader)
+            backends[0].loader.close()
+
+    def test_sqlite_backend_gets_no_loader(self):
+        with tempfile.TemporaryDirectory() as files_dir, \
+                mock.patch.dict(app.config, WEATHERMAN_BACKEND='sqlite'), \
+                mock.patch('app.weather_store.WEATHER_FILES_PATH', files_dir), \
+                mock.patch('app.weather_store.WEATHER_SQLITE_PATH',
+                           os.path.join(files_dir, 'weather.db')), \
+                mock.patch('app.weather_store.create_backend',
+                           wraps=create_backend) as create:
+            get_backend().close()
+        self.assertIsNone(create.call_args.args[4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,901 @@
+import contextlib
+import importlib.util
+import io
+import math
+import os
+import pickle
+import random
+import shutil
+import threading
+import time
+from datetime import date
+import tempfile
+import unittest
+from array import array
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from unittest import mock
+
+from weatherman import cache as cache_module
+from weatherman import events
+from weatherman import runner
+from weatherman.backends import BACKENDS, SummaryStore, TextFileBackend, create_backend
+from weatherman.cache import ColumnarCache
+from weatherman.frames import MonthFrame
+from weatherman.fused import compute_fused
+from weatherman.helper import WEATHER_HEADERS, read_csv
+from weatherman.index import WeatherFileIndex, parse_file_name
+from weatherman.loader import EXECUTORS, MonthLoader
+from weatherman.ranges import RangeIndex, get_range_index, query_range, refresh_range_indexes
+from weatherman.registry import StrategyRegistry
+from weatherman.render import BLUE, RED, RESET, BarRenderer, ChunkedWriter
+from weatherman.report_cache import ReportCache
+from weatherman.single_flight import SingleFlight
+from weatherman.summaries import SUMMARY_HEADERS
+from weatherman.synth import generate, month_rows, station_names
+from weatherman import timing
+from weatherman.runner import (Calculator, DataReader, compute_fused_month, compute_min_max,
+                               compute_monthly_average, generate_average_report, process_args)
+
+HEADER = ('PKT,Max TemperatureC,Mean TemperatureC,Min TemperatureC,Dew PointC,MeanDew PointC,'
+          'Min DewpointC,Max Humidity, Mean Humidity, Min Humidity, Max Sea Level PressurehPa,'
+          ' Mean Sea Level PressurehPa, Min Sea Level PressurehPa, Max VisibilityKm,'
+          ' Mean VisibilityKm, Min VisibilitykM, Max Wind SpeedKm/h, Mean Wind SpeedKm/h,'
+          ' Max Gust SpeedKm/h,Precipitationmm, CloudCover, Events,WindDirDegrees')
+
+
+def write_weatherfile(files_dir, station, year, month, days):
+    """Writes a weatherfile whose readings are derived from the day of the month."""
+
+    month_abbr = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
+                  'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'][month - 1]
+    lines = [HEADER]
+    for day in range(1, days + 1):
+        max_temp = '' if day == 3 else str(20 + day % 7 + month)
+        lines.append(f'{year}-{month}-{day},{max_temp},{15 + day % 5},{5 + day % 4 - month},'
+                     f'8,6,4,{60 + day % 11},{40 + day % 9},20,1015,1010,1005,10,8,4,'
+                     f'20,10,,0.0,4,{"Rain" if day % 4 == 0 else ""},{day * 10}')
+    path = os.path.join(files_dir, f'{station}_weather_{year}_{month_abbr}.txt')
+    with open(path, 'w') as weather_file:
+        weather_file.write('\n'.join(lines) + '\n')
+    return path
+
+
+class WeatherFilesTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files_dir = self.tmp.name
+        for month in range(1, 13):
+            write_weatherfile(self.files_dir, 'Murree', 2004, month, 28)
+        write_weatherfile(self.files_dir, 'Sibi', 2004, 8, 31)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+
+class TestWeatherFileIndex(WeatherFilesTestCase):
+    def test_parse_file_name(self):
+        self.assertEqual(parse_file_name('Murree_weather_2004_Aug.txt'), ('Murree', 2004, 8))
+        self.assertEqual(parse_file_name('2011_Jul.txt'), ('', 2011, 7))
+        self.assertIsNone(parse_file_name('notes.txt'))
+
+    def test_lookup(self):
+        index = WeatherFileIndex(self.files_dir)
+        self.assertTrue(index.get_month(2004, 8).endswith('Murree_weather_2004_Aug.txt'))
+        self.assertTrue(index.get_month(2004, 8, 'Sibi').endswith('Sibi_weather_2004_Aug.txt'))
+        self.assertEqual(len(index.get_year(2004)), 12)
+        self.assertEqual(len(index.get_year(2004, 'Sibi')), 1)
+        self.assertIsNone(index.get_month(2005, 1))
+        self.assertEqual(index.stations(), ['Murree', 'Sibi'])
+
+    def test_refresh_picks_up_new_files(self):
+        index = WeatherFileIndex(self.files_dir)
+        self.assertEqual(index.get_year(2005), [])
+        write_weatherfile(self.files_dir, 'Murree', 2005, 1, 31)
+        os.utime(self.files_dir, ns=(0, os.stat(self.files_dir).st_mtime_ns + 1))
+        self.assertEqual(len(index.get_year(2005)), 1)
+
+    def test_refresh_keeps_months_named_by_another_file(self):
+        other = os.path.join(self.files_dir, 'Murree_2004_Aug.txt')
+        shutil.copy(os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt'), other)
+        index = WeatherFileIndex(self.files_dir)
+        os.remove(index.get_month(2004, 8))
+        os.utime(self.files_dir, ns=(0, os.stat(self.files_dir).st_mtime_ns + 1))
+        self.assertEqual(index.get_month(2004, 8), f'{self.files_dir}/Murree_2004_Aug.txt')
+
+    def test_lookups_during_refreshes(self):
+        index = WeatherFileIndex(self.files_dir)
+        index.refresh()
+        stop = threading.Event()
+
+        def read():
+            while not stop.is_set():
+                index.items()
+                index.get_year(2004)
+                index.get_month(2005, 1)
+                index.stations()
+
+        with ThreadPoolExecutor(4) as executor:
+            readers = [executor.submit(read) for _ in range(4)]
+            for number in range(50):
+                path = write_weatherfile(self.files_dir, f'Station{number}', 2005, 1, 1)
+                os.utime(self.files_dir, ns=(0, os.stat(self.files_dir).st_mtime_ns + 1))
+                index.refresh()
+                os.remove(path)
+            stop.set()
+            for reader in readers:
+                reader.result()
+
+
+class TestDataReader(WeatherFilesTestCase):
+    def test_monthly_readings(self):
+        readings = DataReader(self.files_dir, '2004/8').get_monthly_readings()
+        self.assertEqual((readings.year, readings.month, len(readings)), (2004, 8, 28))
+        self.assertEqual(readings.get('Max TemperatureC', 0), 29.0)
+        self.assertIsNone(readings.get('Max TemperatureC', 2))
+        self.assertEqual(readings.get('Events', 3), 'Rain')
+        self.assertIsNone(readings.get('Events', 0))
+
+    def test_yearly_readings(self):
+        readings = DataReader(self.files_dir, '2004').get_yearly_readings()
+        self.assertEqual([frame.month_name for frame in readings][:2], ['January', 'February'])
+        self.assertEqual(len(readings), 12)
+
+    def test_projected_readings(self):
+        data_reader = DataReader(self.files_dir, '2004/8', columns=['Mean Humidity'])
+        readings = data_reader.get_monthly_readings()
+        self.assertEqual(list(readings.columns), ['Mean Humidity'])
+        self.assertEqual(list(readings.present('Mean Humidity'))[0], (1, 41.0))
+
+    def test_missing_month(self):
+        with self.assertRaises(FileNotFoundError):
+            DataReader(self.files_dir, '2010/1').get_monthly_readings()
+
+
+class TestColumnarCache(WeatherFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ColumnarCache(os.path.join(self.files_dir, 'cache'))
+        self.file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt')
+
+    def test_load_parses_once(self):
+        n_rows, columns = self.cache.load(self.file_name)
+        with mock.patch.object(cache_module, 'parse_columns') as parse_columns:
+            cached_rows, cached = self.cache.load(self.file_name)
+        parse_columns.assert_not_called()
+        self.assertEqual(cached_rows, n_rows)
+        self.assertEqual(cached['Events'], columns['Events'])
+        self.assertTrue(math.isnan(cached['Max TemperatureC'][2]))
+
+    def test_load_projects_columns(self):
+        self.cache.load(self.file_name)
+        _, columns = self.cache.load(self.file_name, ['PKT', 'Mean Humidity'])
+        self.assertEqual(set(columns), {'PKT', 'Mean Humidity'})
+
+    def test_changed_file_is_parsed_again(self):
+        self.cache.load(self.file_name)
+        write_weatherfile(self.files_dir, 'Murree', 2004, 8, 30)
+        n_rows, _ = self.cache.load(self.file_name)
+        self.assertEqual(n_rows, 30)
+
+    def test_concurrent_writers_leave_a_valid_file(self):
+        with ThreadPoolExecutor(8) as executor:
+            results = list(executor.map(lambda _: self.cache.load(self.file_name)[0], range(16)))
+        self.assertEqual(results, [28] * 16)
+        self.assertEqual([name for name in os.listdir(self.cache.cache_dir)
+                          if name.endswith('.tmp')], [])
+        with mock.patch.object(cache_module, 'parse_columns') as parse_columns:
+            self.assertEqual(self.cache.load(self.file_name)[0], 28)
+        parse_columns.assert_not_called()
+
+    def test_reader_matches_uncached(self):
+        cached = DataReader(self.files_dir, '2004', cache=self.cache).get_yearly_readings()
+        uncached = DataReader(self.files_dir, '2004').get_yearly_readings()
+        for cached_frame, frame in zip(cached, uncached):
+            self.assertEqual(cached_frame.days, frame.days)
+            self.assertEqual(cached_frame.values('Events'), frame.values('Events'))
+            self.assertEqual(list(cached_frame.present('Max TemperatureC')),
+                             list(frame.present('Max TemperatureC')))
+
+
+class TestMonthLoader(WeatherFilesTestCase):
+    def test_load_keeps_month_order(self):
+        for executor in EXECUTORS:
+            loader = MonthLoader(4, executor)
+            try:
+                readings = DataReader(self.files_dir, '2004', loader=loader).get_yearly_readings()
+            finally:
+                loader.close()
+            self.assertEqual([frame.month for frame in readings], list(range(1, 13)))
+
+    def test_backend_loads_years_in_one_fan_out(self):
+        write_weatherfile(self.files_dir, 'Murree', 2005, 1, 31)
+        loader = MonthLoader(4)
+        with mock.patch.object(loader, 'load', wraps=loader.load) as load:
+            readings = TextFileBackend(self.files_dir, loader).load_years([2004, 2005])
+        loader.close()
+        load.assert_called_once()
+        self.assertEqual([len(frames) for frames in readings], [12, 1])
+
+
+class TestBackends(WeatherFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.backends = {name: create_backend(name, self.files_dir) for name in BACKENDS}
+
+    def tearDown(self):
+        for backend in self.backends.values():
+            backend.close()
+        super().tearDown()
+
+    def test_backends_load_the_same_readings(self):
+        expected = self.backends['files'].load_year(2004)
+        for name, backend in self.backends.items():
+            for frame, expected_frame in zip(backend.load_year(2004), expected):
+                self.assertEqual(frame.days, expected_frame.days, name)
+                self.assertEqual(frame.values('Events'), expected_frame.values('Events'), name)
+                self.assertEqual(list(frame.present('Max TemperatureC')),
+                                 list(expected_frame.present('Max TemperatureC')), name)
+            sibi = backend.load_month(2004, 8, ['Mean Humidity'], 'Sibi')
+            self.assertEqual((len(sibi), list(sibi.columns)), (31, ['Mean Humidity']), name)
+            with self.assertRaises(FileNotFoundError):
+                backend.load_month(2010, 1)
+            history = backend.load_history(['Max Humidity'])
+            self.assertEqual([(frame.year, frame.month) for frame in history],
+                             [(2004, month) for month in range(1, 13)], name)
+            self.assertEqual(backend.fingerprint(2004), backend.fingerprint(2004), name)
+            self.assertNotEqual(backend.fingerprint(2004, 8), backend.fingerprint(2004, 7), name)
+
+    def test_backends_generate_the_same_reports(self):
+        yearly = {'calc_strategy': None, 'report_strategy': None}
+        monthly = {'calc_strategy': compute_monthly_average,
+                   'report_strategy': generate_average_report}
+        expected = (process_args(['2004'], 1, self.files_dir, yearly, True),
+                    process_args(['2004/8', '2004/2'], 1, self.files_dir, monthly))
+        for name, backend in self.backends.items():
+            reports = (process_args(['2004'], 1, self.files_dir, yearly, True, backend=backend),
+                       process_args(['2004/8', '2004/2'], 1, self.files_dir, monthly,
+                                    backend=backend))
+            self.assertEqual(reports, expected, name)
+
+    def test_sqlite_sync_imports_changed_files(self):
+        backend = self.backends['sqlite']
+        self.assertEqual(backend.sync(), 0)
+        write_weatherfile(self.files_dir, 'Murree', 2004, 8, 30)
+        self.assertEqual(backend.sync(), 1)
+        self.assertEqual(len(backend.load_month(2004, 8)), 30)
+
+    def test_sqlite_follows_files_changed_after_startup(self):
+        backend = self.backends['sqlite']
+        fingerprint = backend.fingerprint(2004, 8)
+        write_weatherfile(self.files_dir, 'Murree', 2004, 8, 30)
+        self.assertNotEqual(backend.fingerprint(2004, 8), fingerprint)
+        self.assertEqual(len(backend.load_month(2004, 8)), 30)
+
+        write_weatherfile(self.files_dir, 'Murree', 2005, 1, 31)
+        os.remove(os.path.join(self.files_dir, 'Murree_weather_2004_Dec.txt'))
+        # Directory mtimes can be coarser than the time between two writes
+        os.utime(self.files_dir, ns=(0, os.stat(self.files_dir).st_mtime_ns + 1))
+        self.assertEqual(len(backend.load_month(2005, 1)), 31)
+        self.assertEqual(len(backend.load_year(2004)), 11)
+        with self.assertRaises(FileNotFoundError):
+            backend.load_month(2004, 12)
+        self.assertEqual(len(backend.fingerprint(2004)), 11)
+
+    def test_backends_are_picklable(self):
+        for name, backend in self.backends.items():
+            copy = pickle.loads(pickle.dumps(backend))
+            self.assertEqual(len(copy.load_month(2004, 8)), 28, name)
+            copy.close()
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_backend('csv', self.files_dir)
+
+
+class TestSummaries(WeatherFilesTestCase):
+    def test_summaries_match_calculator(self):
+        backend = TextFileBackend(self.files_dir)
+        yearly = backend.load_year(2004)
+        monthly = backend.load_month(2004, 8)
+        self.assertEqual(backend.aggregate('compute', 2004), Calculator(yearly).compute())
+        self.assertEqual(backend.aggregate('compute_monthly_average', 2004, 8),
+                         Calculator(monthly, compute_monthly_average).compute())
+        self.assertIsNone(backend.aggregate('compute_min_max', 2004, 8))
+
+    def test_summary_parses_only_aggregated_columns(self):
+        file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt')
+        summary = SummaryStore().get(file_name)
+        self.assertEqual(set(summary.columns), set(SUMMARY_HEADERS))
+
+    def test_summary_is_materialized_in_cache(self):
+        cache = ColumnarCache(os.path.join(self.files_dir, 'cache'))
+        file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt')
+        cache.load(file_name, ['PKT'])
+        with mock.patch.object(cache_module, 'parse_columns') as parse_columns:
+            summary = cache.summary(file_name)
+        parse_columns.assert_not_called()
+        column = summary.columns['Max TemperatureC']
+        self.assertEqual((column.count, column.max, column.max_day), (27, 34.0, 6))
+
+    def test_summary_follows_changed_file(self):
+        backend = TextFileBackend(self.files_dir)
+        self.assertEqual(backend.aggregate('compute', 2004)['max_temp'], 38)
+        path = write_weatherfile(self.files_dir, 'Murree', 2004, 12, 5)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        self.assertEqual(backend.aggregate('compute', 2004)['max_temp'], 37)
+
+
+class TestRanges(WeatherFilesTestCase):
+    def brute_force(self, frames, header, start, end):
+        readings = [(date(frame.year, frame.month, day), value) for frame in frames
+                    for day, value in frame.present(header)
+                    if start <= date(frame.year, frame.month, day) <= end]
+        if not readings:
+            return 0, None, None, None
+        highest = max(readings, key=lambda reading: reading[1])
+        lowest = min(readings, key=lambda reading: reading[1])
+        return (len(readings), sum(value for _, value in readings) / len(readings),
+                (highest[1], highest[0].isoformat()), (lowest[1], lowest[0].isoformat()))
+
+    def test_stats_match_brute_force(self):
+        frames = TextFileBackend(self.files_dir).load_history()
+        index = RangeIndex(frames)
+        ordinals = range(date(2003, 12, 25).toordinal(), date(2005, 1, 5).toordinal())
+        rng = random.Random(7)
+        for _ in range(200):
+            start, end = sorted(date.fromordinal(rng.choice(ordinals)) for _ in range(2))
+            for header in ('Max TemperatureC', 'Min TemperatureC', 'Mean Humidity'):
+                stats = index.stats(header, start, end)
+                count, average, highest, lowest = self.brute_force(frames, header, start, end)
+                self.assertEqual(stats['count'], count)
+                if count:
+                    self.assertAlmostEqual(stats['average'], average)
+                    self.assertEqual((stats['max'], stats['max_date']), highest)
+                    self.assertEqual((stats['min'], stats['min_date']), lowest)
+
+    def test_query_range(self):
+        backend = TextFileBackend(self.files_dir)
+        columns = query_range(backend, date(2004, 8, 1), date(2004, 8, 31))
+        self.assertEqual(columns['Max TemperatureC']['count'], 27)
+        self.assertEqual(columns['Max TemperatureC']['max_date'], '2004-08-06')
+        sibi = query_range(backend, date(2004, 1, 1), date(2004, 12, 31), ['Max Humidity'],
+                           'Sibi')
+        self.assertEqual(sibi['Max Humidity']['count'], 31)
+        with self.assertRaises(ValueError):
+            query_range(backend, date(2004, 2, 1), date(2004, 1, 1))
+        with self.assertRaises(KeyError):
+            query_range(backend, date(2004, 1, 1), date(2004, 2, 1), ['Events'])
+
+    def test_index_is_rebuilt_when_files_change(self):
+        backend = TextFileBackend(self.files_dir)
+        index = get_range_index(backend)
+        with mock.patch.object(backend, 'fingerprint') as fingerprint:
+            self.assertIs(get_range_index(backend), index)
+        fingerprint.assert_not_called()
+
+        write_weatherfile(self.files_dir, 'Murree', 2005, 1, 31)
+        os.utime(self.files_dir, ns=(0, os.stat(self.files_dir).st_mtime_ns + 1))
+        rebuilt = get_range_index(backend)
+        self.assertIsNot(rebuilt, index)
+        self.assertIs(get_range_index(backend), rebuilt)
+
+    def test_index_follows_files_rewritten_in_place(self):
+        backend = TextFileBackend(self.files_dir)
+        august = (date(2004, 8, 1), date(2004, 8, 31), ['Max TemperatureC'])
+        self.assertEqual(query_range(backend, *august)['Max TemperatureC']['max'], 34.0)
+
+        path = write_weatherfile(self.files_dir, 'Murree', 2004, 8, 5)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        with mock.patch.object(backend, 'fingerprint') as fingerprint:
+            query_range(backend, *august, max_age=60)
+        fingerprint.assert_not_called()
+        self.assertEqual(query_range(backend, *august, max_age=0)['Max TemperatureC']['max'],
+                         33.0)
+
+    def test_concurrent_queries_share_one_build(self):
+        backend = TextFileBackend(self.files_dir)
+        single_flight = SingleFlight()
+        release = threading.Event()
+        load_history = backend.load_history
+
+        def slow_load_history(**kwargs):
+            release.wait()
+            return load_history(**kwargs)
+
+        with mock.patch.object(backend, 'load_history',
+                               side_effect=slow_load_history) as loads:
+            with ThreadPoolExecutor(4) as executor:
+                futures = [executor.submit(get_range_index, backend, single_flight=single_flight)
+                           for _ in range(4)]
+                while single_flight.stats()['coalesced'] < 3:
+                    time.sleep(0.001)
+                release.set()
+                indexes = [future.result() for future in futures]
+
+        self.assertEqual(loads.call_count, 1)
+        self.assertTrue(all(index is indexes[0] for index in indexes))
+        self.assertIs(get_range_index(backend), indexes[0])
+
+    def test_refresh_rebuilds_files_rewritten_in_place(self):
+        for name in BACKENDS:
+            backend = create_backend(name, self.files_dir)
+            index = get_range_index(backend)
+            self.assertEqual(refresh_range_indexes(backend), 0, name)
+            path = write_weatherfile(self.files_dir, 'Murree', 2004, 12, 5)
+            os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+            self.assertEqual(refresh_range_indexes(backend), 1, name)
+            self.assertIsNot(get_range_index(backend), index, name)
+            self.assertEqual(get_range_index(backend).ordinals[-1],
+                             date(2004, 12, 5).toordinal(), name)
+            write_weatherfile(self.files_dir, 'Murree', 2004, 12, 28)
+            backend.close()
+
+
+class TestReportCache(WeatherFilesTestCase):
+    def test_lru_eviction(self):
+        report_cache = ReportCache(2)
+        report_cache.put('a', 1)
+        report_cache.put('b', 2)
+        self.assertEqual(report_cache.get('a'), 1)
+        report_cache.put('c', 3)
+        self.assertIsNone(report_cache.get('b'))
+        self.assertEqual(report_cache.get('a'), 1)
+        self.assertEqual(report_cache.stats(), {'hits': 2, 'misses': 1, 'evictions': 1,
+                                                'expirations': 0, 'size': 2, 'max_size': 2})
+
+    def test_ttl(self):
+        now = [0.0]
+        report_cache = ReportCache(ttl=10, clock=lambda: now[0])
+        report_cache.put('a', 1)
+        now[0] = 9.9
+        self.assertEqual(report_cache.get('a'), 1)
+        now[0] = 10
+        self.assertIsNone(report_cache.get('a'))
+        self.assertEqual(report_cache.stats()['expirations'], 1)
+
+    def test_returned_reports_are_copies(self):
+        strategy = {'calc_strategy': None, 'report_strategy': None}
+        report_cache = ReportCache()
+        backend = TextFileBackend(self.files_dir)
+        reports = process_args(['2004'], 1, self.files_dir, strategy, True, backend=backend,
+                               report_cache=report_cache, quiet=True)
+        expected = str(reports)
+        reports[0]['highest_temp']['value'] = 'changed'
+        cached = process_args(['2004'], 1, self.files_dir, strategy, True, backend=backend,
+                              report_cache=report_cache, quiet=True)
+        self.assertEqual(str(cached), expected)
+        cached[0].clear()
+        self.assertEqual(str(process_args(['2004'], 1, self.files_dir, strategy, True,
+                                          backend=backend, report_cache=report_cache,
+                                          quiet=True)), expected)
+        self.assertEqual(report_cache.stats()['hits'], 2)
+
+    def test_process_args_reuses_reports_until_files_change(self):
+        strategy = {'calc_strategy': None, 'report_strategy': None}
+        report_cache = ReportCache()
+        backend = TextFileBackend(self.files_dir)
+        reports = process_args(['2004'], 1, self.files_dir, strategy, True, backend=backend,
+                               report_cache=report_cache)
+        with mock.patch.object(backend, 'aggregate') as aggregate:
+            self.assertEqual(process_args(['2004'], 1, self.files_dir, strategy, True,
+                                          backend=backend, report_cache=report_cache), reports)
+        aggregate.assert_not_called()
+
+        path = write_weatherfile(self.files_dir, 'Murree', 2004, 12, 5)
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        changed = process_args(['2004'], 1, self.files_dir, strategy, True, backend=backend,
+                               report_cache=report_cache)
+        self.assertEqual(changed[0]['highest_temp']['value'], '37C')
+        self.assertEqual(report_cache.stats()['hits'], 1)
+
+
+class TestSingleFlight(WeatherFilesTestCase):
+    def run_coalesced(self, single_flight, call, callers, release):
+        """Runs callers concurrently, releasing the computation once all but one are waiting."""
+
+        outcomes = []
+
+        def run():
+            try:
+                outcomes.append(call())
+            except Exception as error:
+                outcomes.append(error)
+
+        threads = [threading.Thread(target=run) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        while single_flight.stats()['coalesced'] < callers - 1:
+            time.sleep(0.001)
+        release.set()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_concurrent_calls_share_one_computation(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        func = mock.Mock(side_effect=lambda: release.wait() and {'max_temp': 38})
+        outcomes = self.run_coalesced(single_flight, lambda: single_flight.do('2004', func), 5,
+                                      release)
+        self.assertEqual(func.call_count, 1)
+        self.assertEqual(outcomes, [{'max_temp': 38}] * 5)
+
+        outcomes[0]['max_temp'] = 0
+        self.assertTrue(all(outcome['max_temp'] == 38 for outcome in outcomes[1:]))
+        self.assertEqual(single_flight.stats(),
+                         {'executions': 1, 'coalesced': 4, 'in_flight': 0})
+
+        single_flight.do('2004', func)
+        self.assertEqual(func.call_count, 2)
+
+    def test_errors_reach_every_caller(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def func():
+            release.wait()
+            raise FileNotFoundError('no weatherfiles found for 2010')
+
+        outcomes = self.run_coalesced(single_flight, lambda: single_flight.do('2010', func), 3,
+                                      release)
+        self.assertTrue(all(isinstance(outcome, FileNotFoundError) for outcome in outcomes))
+
+    def test_process_args_coalesces_identical_reports(self):
+        strategy = {'calc_strategy': None, 'report_strategy': None}
+        backend = TextFileBackend(self.files_dir)
+        single_flight = SingleFlight()
+        release = threading.Event()
+        aggregate = backend.aggregate
+
+        def slow_aggregate(*args):
+            release.wait()
+            return aggregate(*args)
+
+        with mock.patch.object(backend, 'aggregate', side_effect=slow_aggregate) as patched:
+            outcomes = self.run_coalesced(
+                single_flight, lambda: process_args(['2004'], 1, self.files_dir, strategy, True,
+                                                    backend=backend,
+                                                    single_flight=single_flight), 3, release)
+        self.assertEqual(patched.call_count, 1)
+        self.assertEqual(outcomes[0][0]['highest_temp']['value'], '38C')
+        self.assertTrue(all(outcome == outcomes[0] for outcome in outcomes))
+
+
+class TestCalculator(WeatherFilesTestCase):
+    def test_min_max_skips_missing_days(self):
+        readings = DataReader(self.files_dir, '2004/8').get_monthly_readings()
+        computations = Calculator(readings, compute_min_max).compute()
+        self.assertNotIn(3, computations)
+        self.assertEqual(computations[1], {'max_temp': 29, 'min_temp': -2})
+
+    @unittest.skipIf(importlib.util.find_spec('numpy') is None, 'numpy is not installed')
+    def test_numpy_engine_matches_python(self):
+        yearly = DataReader(self.files_dir, '2004').get_yearly_readings()
+        monthly = DataReader(self.files_dir, '2004/8').get_monthly_readings()
+        for readings, func in ((yearly, None), (monthly, compute_monthly_average),
+                               (monthly, compute_min_max)):
+            self.assertEqual(Calculator(readings, func, 'numpy').compute(),
+                             Calculator(readings, func, 'python').compute())
+
+    @unittest.skipIf(importlib.util.find_spec('numpy') is None, 'numpy is not installed')
+    def test_engine_runs_instead_of_aggregates(self):
+        from weatherman import vectorized
+
+        backend = TextFileBackend(self.files_dir)
+        strategies = {'calc_strategy': None, 'report_strategy': None}
+        expected = process_args(['2004'], 1, self.files_dir, strategies, True, backend=backend,
+                                quiet=True)
+        with mock.patch.object(backend, 'aggregate', wraps=backend.aggregate) as aggregate, \
+                mock.patch.object(vectorized, 'compute', wraps=vectorized.compute) as compute:
+            reports = process_args(['2004'], 1, self.files_dir, strategies, True,
+                                   engine='numpy', backend=backend, quiet=True)
+        aggregate.assert_not_called()
+        compute.assert_called_once()
+        self.assertEqual(reports, expected)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            Calculator([], engine='fortran')
+
+
+class TestFused(WeatherFilesTestCase):
+    def random_frame(self, rng):
+        days = array('B', range(1, 31))
+        columns = {header: array('d', (math.nan if rng.random() < 0.2 else rng.randint(0, 9) + 0.5
+                                       for _ in days))
+                   for header in ('Max TemperatureC', 'Min TemperatureC', 'Max Humidity',
+                                  'Mean Humidity')}
+        return MonthFrame(2004, 8, days, columns)
+
+    def test_fused_matches_strategies(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            frame = self.random_frame(rng)
+            computations = compute_fused(frame, ['compute', 'compute_monthly_average',
+                                                 'compute_min_max'])
+            self.assertEqual(computations['compute'], Calculator(frame).compute())
+            self.assertEqual(computations['compute_monthly_average'],
+                             Calculator(frame, compute_monthly_average).compute())
+            self.assertEqual(computations['compute_min_max'],
+                             Calculator(frame, compute_min_max).compute())
+
+    def test_fused_month_loads_once(self):
+        backend = TextFileBackend(self.files_dir)
+        strategies = [None, compute_monthly_average, compute_min_max]
+        with mock.patch.object(backend, 'load_month', wraps=backend.load_month) as load_month:
+            computations = compute_fused_month(self.files_dir, '2004/8', strategies, backend)
+        self.assertEqual(load_month.call_count, 1)
+
+        readings = backend.load_month(2004, 8)
+        for func in strategies:
+            self.assertEqual(computations[func], Calculator(readings, func).compute())
+
+        with self.assertRaises(ValueError):
+            compute_fused_month(self.files_dir, '2004/8', [lambda self: {}], backend)
+
+    def test_process_args_reports_given_computations(self):
+        strategy = {'calc_strategy': compute_monthly_average,
+                    'report_strategy': generate_average_report}
+        computations = compute_fused_month(self.files_dir, '2004/8', [compute_monthly_average])
+        with mock.patch.object(DataReader, 'get_monthly_readings') as get_monthly_readings:
+            reports = process_args(['2004/8'], 1, self.files_dir, strategy,
+                                   computations={'2004/8': computations[compute_monthly_average]})
+        get_monthly_readings.assert_not_called()
+        self.assertEqual(reports, process_args(['2004/8'], 1, self.files_dir, strategy))
+
+    def test_main_numbers_reports_across_flags(self):
+        argv = ['weatherman', self.files_dir, '-e', '2004', '-a', '2004/8', '2004/2',
+                '-c', '2004/8', '-b', '2004/8']
+        output = io.StringIO()
+        with mock.patch('sys.argv', argv), contextlib.redirect_stdout(output), \
+                mock.patch.object(runner, 'compute_fused',
+                                  wraps=runner.compute_fused) as fused:
+            runner.main()
+        self.assertEqual(fused.call_count, 1)
+        self.assertEqual([line for line in output.getvalue().splitlines()
+                          if line.startswith('Report #')],
+                         [f'Report # {number}' for number in range(1, 6)])
+
+    def test_main_rejects_numpy_engine_without_numpy(self):
+        argv = ['weatherman', self.files_dir, '-e', '2004', '--engine', 'numpy']
+        errors = io.StringIO()
+        with mock.patch('sys.argv', argv), contextlib.redirect_stderr(errors), \
+                mock.patch('importlib.util.find_spec', return_value=None), \
+                self.assertRaises(SystemExit):
+            runner.main()
+        self.assertIn('pip install numpy', errors.getvalue())
+
+
+class TestStrategyRegistry(WeatherFilesTestCase):
+    def test_register_and_look_up(self):
+        registry = StrategyRegistry('calc', 'first')
+
+        @registry.register('first')
+        def first(self):
+            return 1
+
+        @registry.register()
+        def second(self):
+            return 2
+
+        self.assertIs(registry.get(None), first)
+        self.assertIs(registry.get('second'), second)
+        self.assertEqual(registry.name(second), 'second')
+        self.assertEqual(registry.name(None), 'first')
+        self.assertIsNone(registry.name(lambda self: 3))
+        self.assertEqual(registry.names(), ('first', 'second'))
+
+        with self.assertRaises(ValueError):
+            registry.get('third')
+        with self.assertRaises(ValueError):
+            registry.register('second')(first)
+
+    def test_strategies_by_name(self):
+        readings = DataReader(self.files_dir, '2004/8').get_monthly_readings()
+        self.assertEqual(Calculator(readings, 'compute_monthly_average').compute(),
+                         Calculator(readings, compute_monthly_average).compute())
+
+        report_cache = ReportCache()
+        by_function = process_args(['2004/8'], 1, self.files_dir,
+                                   {'calc_strategy': compute_monthly_average,
+                                    'report_strategy': generate_average_report},
+                                   report_cache=report_cache)
+        by_name = process_args(['2004/8'], 1, self.files_dir,
+                               {'calc_strategy': 'compute_monthly_average',
+                                'report_strategy': 'generate_average_report'},
+                               report_cache=report_cache)
+        self.assertEqual(by_name, by_function)
+        self.assertEqual(report_cache.stats()['hits'], 1)
+
+
+class TestRender(unittest.TestCase):
+    results = {1: {'max_temp': 40, 'min_temp': 12}, 2: {'max_temp': 31, 'min_temp': -3}}
+
+    def test_bars_match_legacy_format(self):
+        renderer = BarRenderer()
+        self.assertEqual(renderer.multiple('2011/7', self.results).splitlines()[:3], [
+            'July 2011', f'01 {RED}{"+" * 40} {RESET}40C', f'01 {BLUE}{"+" * 12} {RESET}12C'])
+        self.assertEqual(renderer.single('2011/7', self.results).splitlines()[2],
+                         f'02 {BLUE}{RED}{"+" * 31} {RESET}-3C - 31C')
+
+    def test_bars_fit_width_without_colors(self):
+        renderer = BarRenderer(width=30, color=False)
+        for text in (renderer.multiple('2011/7', self.results),
+                     renderer.single('2011/7', self.results)):
+            self.assertNotIn('\033', text)
+            self.assertTrue(all(len(line) <= 30 for line in text.splitlines()))
+        self.assertEqual(renderer.multiple('2011/7', self.results).splitlines()[1],
+                         f'01 {"+" * 23} 40C')
+
+    def test_chunked_writer(self):
+        stream = mock.Mock()
+        with ChunkedWriter(stream, chunk_size=10) as out:
+            out.write('abcd')
+            out.write('efgh')
+            stream.write.assert_not_called()
+            out.write('ijkl')
+            stream.write.assert_called_once_with('abcdefghijkl')
+            out.write('mn')
+        self.assertEqual(stream.write.call_args_list[-1], mock.call('mn'))
+
+
+class TestTiming(WeatherFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        enabled = timing.is_enabled()
+        self.addCleanup(timing.set_enabled, enabled)
+        timing.reset()
+
+    def test_disabled_stages_are_not_timed(self):
+        timing.set_enabled(False)
+        self.assertIs(timing.stage('load'), timing.stage('compute'))
+        with timing.collect() as timings, timing.stage('load'):
+            pass
+        self.assertEqual(timings, {})
+        self.assertEqual(timing.histograms(), {})
+
+    def test_process_args_stages(self):
+        timing.set_enabled(True)
+        strategy = {'calc_strategy': compute_min_max, 'report_strategy': 'generate_daily_report'}
+        with timing.collect() as timings:
+            process_args(['2004/8'], 1, self.files_dir, strategy, quiet=True)
+        self.assertTrue({'aggregate', 'load', 'lookup', 'parse', 'compute',
+                         'generate'} <= set(timings))
+        self.assertGreaterEqual(timings['load'], timings['parse'])
+
+        histogram = timing.histograms()['compute']
+        self.assertEqual((histogram['count'], histogram['buckets'][-1]),
+                         (1, {'le': '+Inf', 'count': 1}))
+        self.assertEqual(timing.server_timing({'load': 0.0012}), 'load;dur=1.200')
+
+
+class TestEvents(WeatherFilesTestCase):
+    def listen(self, event):
+        emitted = []
+
+        def listener(*args):
+            emitted.append(args)
+
+        events.subscribe(event, listener)
+        self.addCleanup(events.unsubscribe, event, listener)
+        return emitted
+
+    def test_weatherfile_reads_and_cache_lookups(self):
+        reads = self.listen(events.WEATHERFILE_READ)
+        lookups = self.listen(events.CACHE_LOOKUP)
+        file_name = os.path.join(self.files_dir, 'Murree_weather_2004_Aug.txt')
+
+        cache = ColumnarCache(tempfile.mkdtemp(dir=self.files_dir))
+        cache.load(file_name)
+        cache.load(file_name)
+        self.assertEqual(reads, [(file_name, os.path.getsize(file_name))])
+        self.assertEqual(lookups, [('columnar', False), ('columnar', True)])
+
+        report_cache = ReportCache()
+        report_cache.get('key')
+        report_cache.put('key', 'report')
+        report_cache.get('key')
+        self.assertEqual(lookups[2:], [('report', False), ('report', True)])
+
+    def test_unsubscribe(self):
+        reads = []
+        events.subscribe(events.WEATHERFILE_READ, reads.append)
+        events.unsubscribe(events.WEATHERFILE_READ, reads.append)
+        events.unsubscribe(events.WEATHERFILE_READ, reads.append)
+        events.emit(events.WEATHERFILE_READ, 'file.txt', 1)
+        self.assertEqual(reads, [])
+
+
+class TestSynth(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.files_dir = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_generated_weatherfiles_are_readable(self):
+        stations = station_names(2)
+        self.assertEqual(generate(self.files_dir, stations, [2003, 2004], missing=0.05), 48)
+
+        index = WeatherFileIndex(self.files_dir)
+        self.assertEqual(len(index.get_year(2004, 'Station0002')), 12)
+        rows = read_csv(index.get_month(2004, 2, 'Station0001'))
+        self.assertEqual(len(rows), 29)
+        self.assertEqual(set(rows[0]), {'PKT', *WEATHER_HEADERS})
+        self.assertEqual(rows[0]['PKT'], '2004-2-1')
+
+        reports = process_args(['2004/7', '2003/1'], 1, self.files_dir,
+                               {'calc_strategy': None, 'report_strategy': None}, quiet=True)
+        self.assertEqual(len(reports), 2)
+
+    def test_generation_is_deterministic(self):
+        rows = list(month_rows('Murree', 2004, 8, missing=0.1, seed=7))
+        self.assertEqual(rows, list(month_rows('Murree', 2004, 8, missing=0.1, seed=7)))
+        self.assertNotEqual(rows, list(month_rows('Murree', 2004, 8, missing=0.1, seed=8)))
+        self.assertTrue(rows[0].startswith('PKST,Max TemperatureC,'))
+
+        values = [value for row in rows[1:] for value in row.split(',')[1:-3]]
+        self.assertEqual(len(values), 31 * 19)
+        self.assertTrue(0 < values.count('') < len(values) * 0.2)
+        complete = list(month_rows('Murree', 2004, 8))
+        self.assertNotIn('', [value for row in complete[1:] for value in row.split(',')[1:-3]])
+
+        with self.assertRaises(ValueError):
+            generate(self.files_dir, ['Murree'], [2004], missing=1.5)
+
+
+class TestProcessArgs(WeatherFilesTestCase):
+    def test_pool_keeps_date_order(self):
+        write_weatherfile(self.files_dir, 'Murree', 2005, 1, 31)
+        strategy = {'calc_strategy': compute_monthly_average,
+                    'report_strategy': generate_average_report}
+        dates = ['2005/1', '2004/8', '2004/2']
+        with ProcessPoolExecutor(2) as pool:
+            reports = process_args(dates, 1, self.files_dir, strategy, pool=pool)
+        self.assertEqual([report['date'] for report in reports], dates)
+        self.assertEqual(reports, process_args(dates, 1, self.files_dir, strategy))
+
+    def test_pool_needs_registered_strategies(self):
+        strategy = {'calc_strategy': lambda self: {}, 'report_strategy': None}
+        with ThreadPoolExecutor(2) as pool, self.assertRaises(ValueError):
+            process_args(['2004/1', '2004/2'], 1, self.files_dir, strategy, pool=pool)
+
+    def test_yearly_report(self):
+        strategy = {'calc_strategy': None, 'report_strategy': None}
+        reports = process_args(['2004'], 1, self.files_dir, strategy, yearly=True)
+        self.assertEqual(reports[0]['highest_temp'], {'value': '38C', 'date': '6 December'})
+        self.assertEqual(reports[0]['lowest_temp'], {'value': '-7C', 'date': '4 December'})
+        self.assertEqual(reports[0]['max_humidity'], {'value': '70%', 'date': '10 January'})
+
+    def test_monthly_average_report(self):
+        strategy = {'calc_strategy': compute_monthly_average,
+                    'report_strategy': generate_average_report}
+        reports = process_args(['2004/8'], 1, self.files_dir, strategy)
+        self.assertEqual(reports, [{'date': '2004/8', 'highest_avg_temp': '31C',
+                                    'lowest_avg_temp': '-2C', 'avg_mean_humidity': '44%'}])
+
+    def test_quiet_reports_are_not_rendered(self):
+        strategy = {'calc_strategy': compute_monthly_average,
+                    'report_strategy': generate_average_report}
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), \
+                mock.patch.object(generate_average_report, 'renderer') as render:
+            reports = process_args(['2004/8'], 1, self.files_dir, strategy, quiet=True)
+        render.assert_not_called()
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertEqual(reports[0]['highest_avg_temp'], '31C')
+
+    def test_reports_render_into_out(self):
+        strategy = {'calc_strategy': compute_monthly_average,
+                    'report_strategy': generate_average_report}
+        stdout, out = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            process_args(['2004/8', '2004/2'], 3, self.files_dir, strategy, out=out)
+        self.assertEqual(stdout.getvalue(), '')
+        self.assertTrue(out.getvalue().startswith('\nReport # 3\nHighest Average: 31C\n'))
+        self.assertIn('\nReport # 4\n', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
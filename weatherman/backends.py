@@ -0,0 +1,803 @@
+"""Storage Backends
+
+This module holds the storage backends a DataReader loads readings from. Every backend returns
+MonthFrames, so Calculator and ReportGenerator work the same whichever backend is selected.
+
+    files: Raw weatherfiles, parsed on every read.
+    columnar: Raw weatherfiles, parsed once into a ColumnarCache.
+    sqlite: An embedded SQLite database, synced from the weatherfiles.
+
+Attributes:
+    BACKENDS (dict): Backend classes by name.
+
+"""
+
+import os
+import sqlite3
+import threading
+from array import array
+from math import nan
+from typing import Hashable, Iterable, Optional
+
+from weatherman.cache import ColumnarCache, file_fingerprint
+from weatherman.frames import MonthFrame
+from weatherman.helper import STR_HEADERS, WEATHER_HEADERS, parse_columns
+from weatherman.index import WeatherFileIndex, parse_file_name
+from weatherman.loader import MonthLoader, load_frame
+from weatherman.summaries import (SUMMARY_HEADERS, ColumnSummary, MonthSummary,
+                                  monthly_averages, summarize_columns, yearly_extremes)
+from weatherman.timing import stage
+
+
+def aggregate_summaries(strategy: str, summaries: list[MonthSummary]) -> Optional[dict]:
+    """Returns the computations of a calc strategy combined from monthly summaries.
+
+        Args:
+            strategy (str): Name of the calc strategy.
+            summaries (list): Summaries of the months, in calendar order.
+
+        Returns:
+            dict: The computations of the strategy, or None if they cannot be combined from
+                summaries.
+    """
+
+    if strategy == 'compute':
+        return yearly_extremes(summaries)
+    if strategy == 'compute_monthly_average':
+        return monthly_averages(summaries)
+    return None
+
+
+class SummaryStore:
+    """A Class to keep the summaries of weatherfiles in memory.
+
+    A summary is rebuilt as soon as the fingerprint of its weatherfile changes. When a columnar
+    cache is given, summaries are read from the cache, which materializes them whenever it
+    parses a weatherfile, so a cold store does not have to parse files again. Without a cache
+    only the dates and the SUMMARY_HEADERS columns are parsed, so the summary holds just the
+    columns aggregate_summaries() reads.
+
+        Attributes:
+            cache (ColumnarCache): The cache holding parsed weatherfiles, or None.
+
+        Methods:
+            get: Returns the summary of a weatherfile.
+    """
+
+    def __init__(self, cache: Optional[ColumnarCache] = None) -> None:
+        """The constructor for SummaryStore class.
+
+            Args:
+                cache (ColumnarCache, optional): The cache holding parsed weatherfiles.
+                    Defaults to None, which parses weatherfiles to summarize them.
+        """
+
+        self.cache = cache
+        self._summaries = {}
+        self._lock = threading.Lock()
+
+    def __reduce__(self):
+        return self.__class__, (self.cache,)
+
+    def get(self, file_name: str) -> MonthSummary:
+        """Returns the summary of a weatherfile.
+
+            Args:
+                file_name (str): The path to a weatherfile.
+
+            Returns:
+                MonthSummary: The summaries of the numeric columns of the weatherfile, only
+                    of its SUMMARY_HEADERS columns without a cache.
+        """
+
+        fingerprint = file_fingerprint(file_name)
+        stored = self._summaries.get(file_name)
+        if stored is not None and stored[0] == fingerprint:
+            return stored[1]
+
+        if self.cache is not None:
+            summary = self.cache.summary(file_name)
+        else:
+            summary = summarize_columns(*parse_columns(file_name, ('PKT', *SUMMARY_HEADERS)))
+
+        with self._lock:
+            self._summaries[file_name] = fingerprint, summary
+
+        return summary
+
+
+def _latest_mtime(fingerprint: tuple) -> Optional[float]:
+    """Returns the latest modification time in seconds of (path, size, mtime_ns, inode) rows."""
+
+    latest = max((mtime_ns for _, _, mtime_ns, _ in fingerprint), default=None)
+    return latest / 1e9 if latest is not None else None
+
+
+class Backend:
+    """A Class defining the interface of a storage backend.
+
+        Attributes:
+            aggregates (tuple): Names of the calc strategies the storage computes itself.
+
+        Methods:
+            load_month: Returns the readings of a month.
+            load_year: Returns the readings of every month of a year.
+            load_years: Returns the readings of several years.
+            load_history: Returns the readings of every month stored for a station.
+            fingerprint: Returns a value which changes whenever stored readings change.
+            generation: Returns a value which changes whenever weatherfiles are stored or
+                removed.
+            last_modified: Returns when stored readings last changed.
+            aggregate: Returns computations done by the storage itself.
+            close: Releases the resources held by the backend.
+    """
+
+    aggregates = ()
+
+    def load_month(self, year: int, month: int, columns: Optional[Iterable[str]] = None,
+                   station: Optional[str] = None) -> MonthFrame:
+        """Returns the readings of a month.
+
+            Args:
+                year (int): Year of the readings.
+                month (int): Month number of the readings.
+                columns (iterable, optional): Headers of the columns to load. Defaults to
+                    None, which loads every column.
+                station (str, optional): Station of the readings. Defaults to the first
+                    station, by name, which has readings for the month.
+
+            Returns:
+                MonthFrame: The readings of the month.
+
+            Raises:
+                FileNotFoundError: If there are no readings for the month.
+        """
+
+        raise NotImplementedError
+
+    def load_year(self, year: int, columns: Optional[Iterable[str]] = None,
+                  station: Optional[str] = None) -> list[MonthFrame]:
+        """Returns the readings of every month of a year.
+
+            Args:
+                year (int): Year of the readings.
+                columns (iterable, optional): Headers of the columns to load. Defaults to
+                    None, which loads every column.
+                station (str, optional): Station of the readings. Defaults to the first
+                    station, by name, which has readings for the year.
+
+            Returns:
+                list: List of MonthFrames in calendar order.
+
+            Raises:
+                FileNotFoundError: If there are no readings for the year.
+        """
+
+        raise NotImplementedError
+
+    def load_years(self, years: list[int], columns: Optional[Iterable[str]] = None,
+                   station: Optional[str] = None) -> list[list[MonthFrame]]:
+        """Returns the readings of several years.
+
+            Args:
+                years (list): Years of the readings.
+                columns (iterable, optional): Headers of the columns to load. Defaults to
+                    None, which loads every column.
+                station (str, optional): Station of the readings. Defaults to None.
+
+            Returns:
+                list: One list of MonthFrames per year, in the order of years.
+        """
+
+        return [self.load_year(year, columns, station) for year in years]
+
+    def load_history(self, columns: Optional[Iterable[str]] = None,
+                     station: Optional[str] = None) -> list[MonthFrame]:
+        """Returns the readings of every month stored for a station.
+
+            Args:
+                columns (iterable, optional): Headers of the columns to load. Defaults to
+                    None, which loads every column.
+                station (str, optional): Station of the readings. Defaults to the first
+                    station by name.
+
+            Returns:
+                list: List of MonthFrames in chronological order.
+
+            Raises:
+                FileNotFoundError: If there are no readings.
+        """
+
+        raise NotImplementedError
+
+    def fingerprint(self, year: Optional[int] = None, month: Optional[int] = None,
+                    station: Optional[str] = None) -> tuple:
+        """Returns a value which changes whenever the stored readings of a period change.
+
+            Args:
+                year (int, optional): Year of the readings. Defaults to None, which covers
+                    every year.
+                month (int, optional): Month number of the readings. Defaults to None, which
+                    covers the whole year.
+                station (str, optional): Station of the readings. Defaults to the station
+                    readings of the period are loaded for.
+
+            Returns:
+                tuple: The fingerprint of the period.
+        """
+
+        raise NotImplementedError
+
+    def generation(self) -> Hashable:
+        """Returns a value which changes whenever weatherfiles are stored or removed.
+
+        Unlike fingerprint() it covers the whole storage without touching every weatherfile,
+        so it can be checked on every request. Weatherfiles rewritten in place may only change
+        it once they are synced into the storage, or not at all.
+
+            Returns:
+                hashable: The generation of the storage.
+        """
+
+        raise NotImplementedError
+
+    def last_modified(self, year: Optional[int] = None, month: Optional[int] = None,
+                      station: Optional[str] = None) -> Optional[float]:
+        """Returns when the stored readings of a period last changed.
+
+            Args:
+                year (int, optional): Year of the readings. Defaults to None, which covers
+                    every year.
+                month (int, optional): Month number of the readings. Defaults to None, which
+                    covers the whole year.
+                station (str, optional): Station of the readings. Defaults to the station
+                    readings of the period are loaded for.
+
+            Returns:
+                float: Seconds since the epoch, or None if the storage does not track it.
+        """
+
+        return None
+
+    def aggregate(self, strategy: str, year: int, month: Optional[int] = None,
+                  station: Optional[str] = None) -> Optional[dict]:
+        """Returns the computations of a calc strategy done by the storage itself.
+
+            Args:
+                strategy (str): Name of the calc strategy.
+                year (int): Year of the readings.
+                month (int, optional): Month number of the readings, or None for the whole
+                    year.
+                station (str, optional): Station of the readings. Defaults to None.
+
+            Returns:
+                dict: The computations of the strategy, or None if they have to be computed
+                    from readings.
+        """
+
+        return None
+
+    def close(self) -> None:
+        """Releases the resources held by the backend."""
+
+
+class TextFileBackend(Backend):
+    """A Class to load readings by parsing weatherfiles.
+
+        Attributes:
+            files_dir (str): The directory pointing to weatherfiles.
+            index (WeatherFileIndex): The index used to look up weatherfiles.
+            loader (MonthLoader): The loader reading several files concurrently, or None.
+            cache (ColumnarCache): The cache holding parsed weatherfiles, or None.
+            summaries (SummaryStore): The monthly summaries of the weatherfiles.
+    """
+
+    aggregates = ('compute', 'compute_monthly_average')
+
+    def __init__(self, files_dir: str, loader: Optional[MonthLoader] = None,
+                 index: Optional[WeatherFileIndex] = None,
+                 cache: Optional[ColumnarCache] = None) -> None:
+        """The constructor for TextFileBackend class.
+
+            Args:
+                files_dir (str): The directory pointing to weatherfiles.
+                loader (MonthLoader, optional): The loader reading several files concurrently.
+                    Defaults to None.
+                index (WeatherFileIndex, optional): The index used to look up weatherfiles.
+                    Defaults to the shared index of files_dir.
+                cache (ColumnarCache, optional): The cache holding parsed weatherfiles.
+                    Defaults to None, which parses every file on each read.
+        """
+
+        self.files_dir = files_dir
+        self.loader = loader
+        self.index = index if index is not None else WeatherFileIndex.for_dir(files_dir)
+        self.cache = cache
+        self.summaries = SummaryStore(cache)
+
+    def __reduce__(self):
+        # The index and loader hold locks and pools, worker processes build their own
+        return TextFileBackend, (self.files_dir, None, None, self.cache)
+
+    @staticmethod
+    def _with_date(columns: Optional[Iterable[str]]) -> Optional[set[str]]:
+        """Adds the date column, which MonthFrames are built from, to a column selection."""
+
+        return {'PKT', *columns} if columns is not None else None
+
+    def _files(self, year: Optional[int], month: Optional[int],
+               station: Optional[str]) -> list[str]:
+        """Returns paths of the weatherfiles for a month, a year or every year of a station."""
+
+        with stage('lookup'):
+            if year is None:
+                items = self.index.items()
+                if station is None:
+                    station = min((key[0] for key, _ in items), default=None)
+                return [file_name for key, file_name in items if key[0] == station]
+
+            if month is None:
+                return self.index.get_year(year, station)
+
+            file_name = self.index.get_month(year, month, station)
+            return [file_name] if file_name is not None else []
+
+    def get_files(self, year: int, month: Optional[int] = None,
+                  station: Optional[str] = None) -> list[str]:
+        """Returns paths of the weatherfiles for a year or a month.
+
+            Args:
+                year (int): The year to look up in the index.
+                month (int, optional): The month to look up in the index. Defaults to None,
+                    which returns the files for every month of the year.
+                station (str, optional): The station to look up in the index. Defaults to
+                    None.
+
+            Returns:
+                list: List of weatherfile paths in calendar order.
+
+            Raises:
+                FileNotFoundError: If there is no weatherfile for the query.
+        """
+
+        files_list = self._files(year, month, station)
+
+        if not files_list:
+            period = f'{year}/{month}' if month is not None else str(year)
+            raise FileNotFoundError(f'no weatherfiles found for {period}')
+
+        return files_list
+
+    def load_month(self, year: int, month: int, columns: Optional[Iterable[str]] = None,
+                   station: Optional[str] = None) -> MonthFrame:
+        file_name = self.get_files(year, month, station)[0]
+        with stage('parse'):
+            return load_frame(file_name, self._with_date(columns), self.cache)
+
+    def load_year(self, year: int, columns: Optional[Iterable[str]] = None,
+                  station: Optional[str] = None) -> list[MonthFrame]:
+        return self.load_years([year], columns, station)[0]
+
+    def load_years(self, years: list[int], columns: Optional[Iterable[str]] = None,
+                   station: Optional[str] = None) -> list[list[MonthFrame]]:
+        groups = [self.get_files(year, station=station) for year in years]
+        columns = self._with_date(columns)
+
+        with stage('parse'):
+            if self.loader is None:
+                return [[load_frame(file_name, columns, self.cache) for file_name in group]
+                        for group in groups]
+
+            return self.loader.load_groups(groups, columns, self.cache)
+
+    def load_history(self, columns: Optional[Iterable[str]] = None,
+                     station: Optional[str] = None) -> list[MonthFrame]:
+        files_list = self._files(None, None, station)
+        if not files_list:
+            raise FileNotFoundError('no weatherfiles found')
+
+        columns = self._with_date(columns)
+        with stage('parse'):
+            if self.loader is None:
+                return [load_frame(file_name, columns, self.cache) for file_name in files_list]
+
+            return self.loader.load(files_list, columns, self.cache)
+
+    def fingerprint(self, year: Optional[int] = None, month: Optional[int] = None,
+                    station: Optional[str] = None) -> tuple:
+        return tuple((file_name, *file_fingerprint(file_name))
+                     for file_name in self._files(year, month, station))
+
+    def generation(self) -> int:
+        """Returns the generation of the index, which changes when the directory changes."""
+
+        self.index.refresh()
+        return self.index.generation
+
+    def last_modified(self, year: Optional[int] = None, month: Optional[int] = None,
+                      station: Optional[str] = None) -> Optional[float]:
+        return _latest_mtime(self.fingerprint(year, month, station))
+
+    def aggregate(self, strategy: str, year: int, month: Optional[int] = None,
+                  station: Optional[str] = None) -> Optional[dict]:
+        """Computes Calculator.compute() and compute_monthly_average() from monthly summaries."""
+
+        if strategy not in self.aggregates:
+            return None
+
+        summaries = [self.summaries.get(file_name)
+                     for file_name in self.get_files(year, month, station)]
+        return aggregate_summaries(strategy, summaries)
+
+
+class ColumnarCacheBackend(TextFileBackend):
+    """A Class to load readings from weatherfiles parsed once into a ColumnarCache.
+
+        Attributes:
+            cache_dir (str): The directory holding cached files.
+    """
+
+    def __init__(self, files_dir: str, cache_dir: str, loader: Optional[MonthLoader] = None,
+                 index: Optional[WeatherFileIndex] = None) -> None:
+        """The constructor for ColumnarCacheBackend class.
+
+            Args:
+                files_dir (str): The directory pointing to weatherfiles.
+                cache_dir (str): The directory holding cached files.
+                loader (MonthLoader, optional): The loader reading several files concurrently.
+                    Defaults to None.
+                index (WeatherFileIndex, optional): The index used to look up weatherfiles.
+                    Defaults to the shared index of files_dir.
+        """
+
+        super().__init__(files_dir, loader, index, ColumnarCache(cache_dir))
+        self.cache_dir = cache_dir
+
+    def __reduce__(self):
+        return ColumnarCacheBackend, (self.files_dir, self.cache_dir)
+
+
+class SQLiteBackend(Backend):
+    """A Class to load readings from an embedded SQLite database.
+
+    The database is filled from a weatherfiles directory by sync(), which only imports files
+    whose fingerprint changed since the last sync, along with their monthly summaries, and
+    deletes the rows of files which were removed. Loads, fingerprints and aggregates sync
+    lazily first: the whole directory when its WeatherFileIndex re-scanned it, otherwise only
+    the files of the queried period, so weatherfiles added, rewritten or removed after startup
+    reach the database. Readings are keyed by (station, year, month, day), so every month or
+    year query is a single primary key range scan, and aggregates only read the summaries of
+    the months.
+
+        Attributes:
+            db_path (str): Path of the SQLite database file.
+            files_dir (str): The directory the database is synced from, or None.
+            index (WeatherFileIndex): The index of files_dir, or None.
+
+        Methods:
+            sync: Imports new and changed weatherfiles into the database.
+    """
+
+    aggregates = ('compute', 'compute_monthly_average')
+
+    def __init__(self, db_path: str, files_dir: Optional[str] = None) -> None:
+        """The constructor for SQLiteBackend class.
+
+            Args:
+                db_path (str): Path of the SQLite database file.
+                files_dir (str, optional): The directory the database is synced from.
+                    Defaults to None.
+        """
+
+        self.db_path = db_path
+        self.files_dir = files_dir
+        self.index = WeatherFileIndex.for_dir(files_dir) if files_dir is not None else None
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+        self._synced_generation = None
+        self._changes = 0
+
+        columns = ', '.join(
+            f'"{header}" {"TEXT" if header in STR_HEADERS else "REAL"}'
+            for header in WEATHER_HEADERS)
+        with self._connection() as connection:
+            connection.executescript(f'''
+                CREATE TABLE IF NOT EXISTS readings (
+                    station TEXT NOT NULL, year INTEGER NOT NULL, month INTEGER NOT NULL,
+                    day INTEGER NOT NULL, {columns},
+                    PRIMARY KEY (station, year, month, day)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS readings_year ON readings (year, month, station);
+                CREATE TABLE IF NOT EXISTS summaries (
+                    station TEXT NOT NULL, year INTEGER NOT NULL, month INTEGER NOT NULL,
+                    header TEXT NOT NULL, count INTEGER, total REAL, max REAL, max_day INTEGER,
+                    min REAL, min_day INTEGER,
+                    PRIMARY KEY (station, year, month, header)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS sources (
+                    path TEXT PRIMARY KEY, station TEXT NOT NULL, year INTEGER NOT NULL,
+                    month INTEGER NOT NULL, size INTEGER, mtime_ns INTEGER, inode INTEGER
+                );
+            ''')
+
+    def __reduce__(self):
+        return self.__class__, (self.db_path, self.files_dir)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Returns the connection of the current thread, opening it on first use."""
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = sqlite3.connect(self.db_path)
+        return connection
+
+    def sync(self, paths: Optional[Iterable[str]] = None) -> int:
+        """Imports new and changed weatherfiles from files_dir into the database.
+
+        Syncing the whole directory also deletes the rows of weatherfiles which no longer exist.
+
+            Args:
+                paths (iterable, optional): Paths of the weatherfiles to sync. Defaults to None,
+                    which syncs the whole directory.
+
+            Returns:
+                int: Number of weatherfiles imported or deleted.
+        """
+
+        if self.index is None:
+            return 0
+
+        with self._sync_lock:
+            connection = self._connection()
+            query = 'SELECT path, station, year, month, size, mtime_ns, inode FROM sources'
+            if paths is None:
+                self.index.refresh()
+                generation = self.index.generation
+                files = self.index.items()
+                sources = connection.execute(query).fetchall()
+            else:
+                files = [(parse_file_name(os.path.basename(path)), path) for path in paths]
+                if not files:
+                    return 0
+                sources = connection.execute(
+                    f'{query} WHERE path IN ({", ".join("?" * len(files))})',
+                    [path for _, path in files]).fetchall()
+
+            known = {path: (tuple(source[:3]), tuple(source[3:])) for path, *source in sources}
+            removed = []
+            if paths is None:
+                current = {path for _, path in files}
+                removed = [(path, key) for path, (key, _) in known.items()
+                           if path not in current]
+
+            changed = []
+            for key, file_name in files:
+                try:
+                    fingerprint = file_fingerprint(file_name)
+                except FileNotFoundError:
+                    # Removed since it was indexed, the next sync of the directory deletes it
+                    continue
+                if known.get(file_name, (None, None))[1] != fingerprint:
+                    changed.append((key, file_name, fingerprint))
+
+            with connection:
+                for path, key in removed:
+                    for table in ('readings', 'summaries'):
+                        connection.execute(f'DELETE FROM {table} WHERE station = ? AND year = ? '
+                                           'AND month = ?', key)
+                    connection.execute('DELETE FROM sources WHERE path = ?', (path,))
+                for key, file_name, fingerprint in changed:
+                    self._import(connection, key, file_name, fingerprint)
+
+            if paths is None:
+                self._synced_generation = generation
+            if removed or changed:
+                self._changes += 1
+
+        return len(removed) + len(changed)
+
+    @staticmethod
+    def _import(connection: sqlite3.Connection, key: tuple[str, int, int], file_name: str,
+                fingerprint: tuple) -> None:
+        """Replaces the readings, summaries and source row of a month with a weatherfile."""
+
+        station, year, month = key
+        frame = load_frame(file_name)
+        headers = [header for header in WEATHER_HEADERS if header in frame.columns]
+        quoted = ''.join(f', "{header}"' for header in headers)
+        placeholders = ', '.join('?' * (len(headers) + 4))
+        rows = [(station, year, month, day, *(frame.get(header, position) for header in headers))
+                for position, day in enumerate(frame.days)]
+
+        for table in ('readings', 'summaries'):
+            connection.execute(f'DELETE FROM {table} WHERE station = ? AND year = ? '
+                               'AND month = ?', key)
+        connection.executemany(f'INSERT INTO readings (station, year, month, day{quoted}) '
+                               f'VALUES ({placeholders})', rows)
+        connection.executemany(
+            'INSERT INTO summaries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(station, year, month, header, *column.as_list())
+             for header, column in MonthSummary.from_frame(frame).columns.items()])
+        connection.execute('INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?, ?)',
+                           (file_name, station, year, month, *fingerprint))
+
+    def _sync_period(self, year: Optional[int], month: Optional[int],
+                     station: Optional[str]) -> None:
+        """Syncs the weatherfiles of a period, or the whole directory if it was re-scanned."""
+
+        if self.index is None:
+            return
+
+        self.index.refresh()
+        if self.index.generation != self._synced_generation:
+            self.sync()
+        elif month is not None:
+            path = self.index.get_month(year, month, station)
+            if path is not None:
+                self.sync([path])
+        elif year is not None:
+            self.sync(self.index.get_year(year, station))
+        else:
+            if station is None:
+                station = min(self.index.stations(), default=None)
+            self.sync([path for key, path in self.index.items() if key[0] == station])
+
+    @staticmethod
+    def _where(year: Optional[int], month: Optional[int], station: Optional[str],
+               table: str = 'readings') -> tuple[str, list]:
+        """Returns the WHERE clause and parameters selecting the rows of a table in a period.
+
+        When no station is given, the first station by name with rows in the period is used.
+        """
+
+        conditions, params = [], []
+        if year is not None:
+            conditions.append('year = ?')
+            params.append(year)
+        if month is not None:
+            conditions.append('month = ?')
+            params.append(month)
+        period = ' AND '.join(conditions) or '1'
+
+        if station is None:
+            return (f'station = (SELECT MIN(station) FROM {table} WHERE {period}) AND {period}',
+                    params + params)
+        return f'station = ? AND {period}', [station, *params]
+
+    def _load(self, year: Optional[int], month: Optional[int],
+              columns: Optional[Iterable[str]], station: Optional[str]) -> list[MonthFrame]:
+        """Loads the readings of a period with one range query, one frame per month."""
+
+        self._sync_period(year, month, station)
+        headers = [header for header in WEATHER_HEADERS
+                   if columns is None or header in columns]
+        quoted = ''.join(f', "{header}"' for header in headers)
+        where, params = self._where(year, month, station)
+
+        with stage('query'):
+            rows = self._connection().execute(
+                f'SELECT year, month, day{quoted} FROM readings WHERE {where} '
+                f'ORDER BY year, month, day', params).fetchall()
+
+        frames = []
+        for row in rows:
+            if not frames or (frames[-1].year, frames[-1].month) != row[:2]:
+                frames.append(MonthFrame(
+                    row[0], row[1], array('B'),
+                    {header: [] if header in STR_HEADERS else array('d') for header in headers}))
+            frame = frames[-1]
+            frame.days.append(row[2])
+            for header, value in zip(headers, row[3:]):
+                if value is None and header not in STR_HEADERS:
+                    value = nan
+                frame.columns[header].append(value)
+
+        if not frames:
+            period = '/'.join(str(part) for part in (year, month) if part is not None)
+            raise FileNotFoundError(f'no readings found for {period or "any date"}')
+
+        return frames
+
+    def load_month(self, year: int, month: int, columns: Optional[Iterable[str]] = None,
+                   station: Optional[str] = None) -> MonthFrame:
+        return self._load(year, month, columns, station)[0]
+
+    def load_year(self, year: int, columns: Optional[Iterable[str]] = None,
+                  station: Optional[str] = None) -> list[MonthFrame]:
+        return self._load(year, None, columns, station)
+
+    def load_history(self, columns: Optional[Iterable[str]] = None,
+                     station: Optional[str] = None) -> list[MonthFrame]:
+        return self._load(None, None, columns, station)
+
+    def fingerprint(self, year: Optional[int] = None, month: Optional[int] = None,
+                    station: Optional[str] = None) -> tuple:
+        self._sync_period(year, month, station)
+        where, params = self._where(year, month, station, 'sources')
+        return tuple(self._connection().execute(
+            f'SELECT path, size, mtime_ns, inode FROM sources WHERE {where} ORDER BY path',
+            params))
+
+    def generation(self) -> int:
+        """Returns the number of syncs which changed the database.
+
+        The whole directory is synced first if its index re-scanned it.
+        """
+
+        if self.index is not None:
+            self.index.refresh()
+            if self.index.generation != self._synced_generation:
+                self.sync()
+        return self._changes
+
+    def last_modified(self, year: Optional[int] = None, month: Optional[int] = None,
+                      station: Optional[str] = None) -> Optional[float]:
+        return _latest_mtime(self.fingerprint(year, month, station))
+
+    def aggregate(self, strategy: str, year: int, month: Optional[int] = None,
+                  station: Optional[str] = None) -> Optional[dict]:
+        """Computes Calculator.compute() and compute_monthly_average() from monthly summaries."""
+
+        if strategy not in self.aggregates:
+            return None
+
+        self._sync_period(year, month, station)
+        where, params = self._where(year, month, station, 'summaries')
+        summaries = {}
+        for row in self._connection().execute(
+                f'SELECT month, header, count, total, max, max_day, min, min_day FROM summaries '
+                f'WHERE {where} ORDER BY month', params):
+            summary = summaries.setdefault(row[0], MonthSummary(year, row[0], {}))
+            summary.columns[row[1]] = ColumnSummary(*row[2:])
+
+        if not summaries:
+            period = f'{year}/{month}' if month is not None else str(year)
+            raise FileNotFoundError(f'no readings found for {period}')
+
+        return aggregate_summaries(strategy, list(summaries.values()))
+
+    def close(self) -> None:
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+BACKENDS = {
+    'files': TextFileBackend,
+    'columnar': ColumnarCacheBackend,
+    'sqlite': SQLiteBackend,
+}
+
+
+def create_backend(name: str, files_dir: str, cache_dir: Optional[str] = None,
+                   db_path: Optional[str] = None,
+                   loader: Optional[MonthLoader] = None) -> Backend:
+    """Creates a backend by name.
+
+        Args:
+            name (str): Name of the backend, one of BACKENDS.
+            files_dir (str): The directory pointing to weatherfiles.
+            cache_dir (str, optional): The directory holding cached files, used by the
+                columnar backend. Defaults to a .weathercache directory inside files_dir.
+            db_path (str, optional): Path of the SQLite database file, used by the sqlite
+                backend. Defaults to weather.db inside files_dir.
+            loader (MonthLoader, optional): The loader reading several files concurrently,
+                used by the files and columnar backends. Defaults to None.
+
+        Returns:
+            Backend: The backend. A sqlite backend is synced from files_dir before it is
+                returned.
+    """
+
+    if name == 'files':
+        return TextFileBackend(files_dir, loader)
+    if name == 'columnar':
+        return ColumnarCacheBackend(
+            files_dir, cache_dir or os.path.join(files_dir, '.weathercache'), loader)
+    if name == 'sqlite':
+        backend = SQLiteBackend(db_path or os.path.join(files_dir, 'weather.db'), files_dir)
+        backend.sync()
+        return backend
+
+    raise ValueError(f'unknown backend {name!r}, expected one of {tuple(BACKENDS)}')
@@ -0,0 +1,233 @@
+"""Columnar Cache
+
+This module keeps a compact binary copy of every parsed weatherfile so a file is parsed through
+the csv module only once. Each cached file holds the typed column arrays of one weatherfile and
+the fingerprint of the weatherfile it was built from, along with the MonthSummary of its readings.
+A cached file is rebuilt as soon as the fingerprint of its weatherfile changes.
+
+Numeric columns are stored as little-endian doubles with NaN marking a missing reading, string
+columns are stored as UTF-8 text joined by a unit separator.
+
+Attributes:
+    MAGIC (bytes): Marker written at the start of every cached file.
+    HEADER (struct.Struct): Layout of the fixed size header following the marker.
+    SEPARATOR (str): Separator used between the values of a string column.
+
+"""
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Iterable, Optional
+
+from weatherman.events import CACHE_LOOKUP, emit
+from weatherman.helper import Column, parse_columns
+from weatherman.summaries import MonthSummary, summarize_columns
+
+MAGIC = b'WMCC\x01'
+HEADER = struct.Struct('<QqQII')
+SEPARATOR = '\x1f'
+
+
+def file_fingerprint(file_path: str) -> tuple[int, int, int]:
+    """Returns the size, modification time and inode of a file.
+
+        Args:
+            file_path (str): The path to a file.
+
+        Returns:
+            tuple: Tuple of size in bytes, modification time in nanoseconds and inode number.
+    """
+
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
+
+class ColumnarCache:
+    """A Class to store and load parsed weatherfiles as binary column arrays.
+
+        Attributes:
+            cache_dir (str): The directory holding cached files.
+
+        Methods:
+            load: Returns the typed columns of a weatherfile.
+            summary: Returns the MonthSummary of a weatherfile.
+    """
+
+    def __init__(self, cache_dir: str) -> None:
+        """The constructor for ColumnarCache class.
+
+            Args:
+                cache_dir (str): The directory holding cached files.
+        """
+
+        self.cache_dir = cache_dir
+
+    def _cache_path(self, file_path: str) -> str:
+        """Returns the path of the cached file for a weatherfile."""
+
+        digest = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:12]
+        return f'{self.cache_dir}/{os.path.basename(file_path)}.{digest}.col'
+
+    def load(self, file_path: str, columns: Optional[Iterable[str]] = None) \
+            -> tuple[int, dict[str, Column]]:
+        """Returns the typed columns of a weatherfile, parsing it only if it is not cached.
+
+            Args:
+                file_path (str): The path to a txt file.
+                columns (iterable, optional): Headers of the columns to return. Defaults to
+                    None, which returns every column.
+
+            Returns:
+                tuple: Number of rows and a dictionary mapping headers to column values.
+        """
+
+        if columns is not None:
+            columns = set(columns)
+
+        fingerprint = file_fingerprint(file_path)
+        cache_path = self._cache_path(file_path)
+
+        cached = self._read(cache_path, fingerprint, columns)
+        emit(CACHE_LOOKUP, 'columnar', cached is not None)
+        if cached is not None:
+            return cached
+
+        n_rows, parsed = self._ingest(file_path, cache_path, fingerprint)
+
+        if columns is not None:
+            parsed = {header: parsed[header] for header in parsed if header in columns}
+        return n_rows, parsed
+
+    def summary(self, file_path: str) -> MonthSummary:
+        """Returns the MonthSummary of a weatherfile, parsing it only if it is not cached.
+
+        Only the header of a cached file is read, none of its columns.
+
+            Args:
+                file_path (str): The path to a txt file.
+
+            Returns:
+                MonthSummary: The summaries of every numeric column of the weatherfile.
+        """
+
+        fingerprint = file_fingerprint(file_path)
+        cache_path = self._cache_path(file_path)
+
+        opened = self._open(cache_path, fingerprint)
+        if opened is not None:
+            cache_file, _, meta = opened
+            cache_file.close()
+            if 'summary' in meta:
+                emit(CACHE_LOOKUP, 'columnar', True)
+                return MonthSummary.from_dict(meta['summary'])
+
+        emit(CACHE_LOOKUP, 'columnar', False)
+        return summarize_columns(*self._ingest(file_path, cache_path, fingerprint))
+
+    def _ingest(self, file_path: str, cache_path: str,
+                fingerprint: tuple[int, int, int]) -> tuple[int, dict[str, Column]]:
+        """Parses a weatherfile and caches its columns along with their summary."""
+
+        n_rows, parsed = parse_columns(file_path)
+        self._write(cache_path, fingerprint, n_rows, parsed,
+                    summarize_columns(n_rows, parsed).as_dict())
+        return n_rows, parsed
+
+    @staticmethod
+    def _open(cache_path: str, fingerprint: tuple[int, int, int]):
+        """Opens a cached file and reads its header if it matches the weatherfile fingerprint.
+
+            Returns:
+                tuple: The open cached file positioned at the first column, the number of rows
+                    and the metadata, or None if there is no matching cached file.
+        """
+
+        try:
+            cache_file = open(cache_path, 'rb')
+        except OSError:
+            return None
+
+        try:
+            if cache_file.read(len(MAGIC)) != MAGIC:
+                raise ValueError
+            header = cache_file.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError
+            size, mtime_ns, inode, n_rows, meta_len = HEADER.unpack(header)
+            if (size, mtime_ns, inode) != fingerprint:
+                raise ValueError
+            meta = json.loads(cache_file.read(meta_len))
+        except ValueError:
+            cache_file.close()
+            return None
+
+        return cache_file, n_rows, meta
+
+    @classmethod
+    def _read(cls, cache_path: str, fingerprint: tuple[int, int, int],
+              columns: Optional[set[str]]) -> Optional[tuple[int, dict[str, Column]]]:
+        """Reads columns from a cached file if it matches the weatherfile fingerprint."""
+
+        opened = cls._open(cache_path, fingerprint)
+        if opened is None:
+            return None
+
+        cache_file, n_rows, meta = opened
+        with cache_file:
+            data_start = cache_file.tell()
+            loaded = {}
+            for name, kind, offset, length in meta['columns']:
+                if columns is not None and name not in columns:
+                    continue
+                cache_file.seek(data_start + offset)
+                raw = cache_file.read(length)
+                if kind == 'd':
+                    values = array('d')
+                    values.frombytes(raw)
+                    if sys.byteorder == 'big':
+                        values.byteswap()
+                    loaded[name] = values
+                else:
+                    loaded[name] = raw.decode('utf-8').split(SEPARATOR) if n_rows else []
+
+        return n_rows, loaded
+
+    def _write(self, cache_path: str, fingerprint: tuple[int, int, int], n_rows: int,
+               columns: dict[str, Column], summary: dict) -> None:
+        """Writes columns to a cached file, leaving the cache untouched on failure."""
+
+        blobs = []
+        meta = []
+        offset = 0
+        for name, values in columns.items():
+            if isinstance(values, array):
+                if sys.byteorder == 'big':
+                    values = array('d', values)
+                    values.byteswap()
+                blob, kind = values.tobytes(), 'd'
+            else:
+                blob, kind = SEPARATOR.join(values).encode('utf-8'), 's'
+            meta.append([name, kind, offset, len(blob)])
+            blobs.append(blob)
+            offset += len(blob)
+
+        meta_blob = json.dumps({'columns': meta, 'summary': summary}).encode('utf-8')
+        # Unique per thread as well as per process, so concurrent writers never share it
+        tmp_path = f'{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as cache_file:
+                cache_file.write(MAGIC)
+                cache_file.write(HEADER.pack(*fingerprint, n_rows, len(meta_blob)))
+                cache_file.write(meta_blob)
+                for blob in blobs:
+                    cache_file.write(blob)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
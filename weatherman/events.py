@@ -0,0 +1,65 @@
+"""Events
+
+This module lets applications follow what weatherman does, such as how many bytes of
+weatherfiles it reads and how often its caches hit, without weatherman depending on a metrics
+library. Listeners are called synchronously in the thread the event happens in, so they have to
+be cheap. Emitting an event nobody listens to costs one dictionary lookup.
+
+Attributes:
+    WEATHERFILE_READ (str): A weatherfile is read. Listeners get its path and size in bytes.
+    CACHE_LOOKUP (str): A cache is looked up. Listeners get the name of the cache, e.g. report,
+        and whether the lookup hit.
+    STAGE_TIMED (str): A timed stage finished. Listeners get the name of the stage and its time
+        in seconds.
+
+"""
+
+import threading
+from typing import Callable
+
+WEATHERFILE_READ = 'weatherfile_read'
+CACHE_LOOKUP = 'cache_lookup'
+STAGE_TIMED = 'stage_timed'
+
+_listeners: dict[str, tuple[Callable, ...]] = {}
+_listeners_lock = threading.Lock()
+
+
+def subscribe(event: str, listener: Callable) -> None:
+    """Calls a listener every time an event is emitted.
+
+        Args:
+            event (str): Name of the event, e.g. WEATHERFILE_READ.
+            listener (callable): Function called with the arguments of every emitted event.
+    """
+
+    with _listeners_lock:
+        _listeners[event] = _listeners.get(event, ()) + (listener,)
+
+
+def unsubscribe(event: str, listener: Callable) -> None:
+    """Stops calling a listener for an event. Unknown listeners are ignored.
+
+        Args:
+            event (str): Name of the event.
+            listener (callable): The listener.
+    """
+
+    with _listeners_lock:
+        listeners = tuple(other for other in _listeners.get(event, ()) if other != listener)
+        if listeners:
+            _listeners[event] = listeners
+        else:
+            _listeners.pop(event, None)
+
+
+def emit(event: str, *args) -> None:
+    """Calls every listener of an event.
+
+        Args:
+            event (str): Name of the event.
+            *args: Arguments listeners are called with.
+    """
+
+    for listener in _listeners.get(event, ()):
+        listener(*args)
@@ -0,0 +1,144 @@
+"""Month Frames
+
+This module holds the compact in-memory representation of weather readings. A month of readings
+is stored as a struct of arrays: one array of day numbers and one array per column, instead of
+one dictionary per day.
+
+Missing readings are explicit: numeric columns hold NaN and string columns hold None, and every
+accessor of a MonthFrame reports a missing reading as None.
+
+Attributes:
+    MONTH_NAMES (tuple): Full month names indexed by month number.
+
+"""
+
+import calendar
+import math
+from array import array
+from typing import Iterator, Optional, Union
+
+from weatherman.helper import STR_HEADERS, Column, parse_iso_date
+
+MONTH_NAMES = tuple(calendar.month_name)
+
+
+class MonthFrame:
+    """A Class to hold the readings of one month as columns.
+
+        Attributes:
+            year (int): Year of the readings.
+            month (int): Month number of the readings.
+            days (array): Day of the month of every reading.
+            columns (dict): Dictionary mapping headers to arrays of readings.
+
+        Methods:
+            from_columns: Builds a MonthFrame from parsed weatherfile columns.
+            values: Returns all readings of a column.
+            present: Yields the day and value of every reading of a column which is not missing.
+            get: Returns one reading of a column.
+    """
+
+    __slots__ = ('year', 'month', 'days', 'columns')
+
+    def __init__(self, year: int, month: int, days: array,
+                 columns: dict[str, Union[array, list[Optional[str]]]]) -> None:
+        """The constructor for MonthFrame class.
+
+            Args:
+                year (int): Year of the readings.
+                month (int): Month number of the readings.
+                days (array): Day of the month of every reading.
+                columns (dict): Dictionary mapping headers to arrays of readings.
+        """
+
+        self.year = year
+        self.month = month
+        self.days = days
+        self.columns = columns
+
+    @classmethod
+    def from_columns(cls, n_rows: int, columns: dict[str, Column],
+                     year: Optional[int] = None, month: Optional[int] = None) -> 'MonthFrame':
+        """Builds a MonthFrame from parsed weatherfile columns.
+
+            Args:
+                n_rows (int): Number of readings.
+                columns (dict): Dictionary mapping headers to column values, as returned by
+                    parse_columns(). Must contain the PKT column.
+                year (int, optional): Year of the readings, e.g. from the weatherfile index.
+                    Defaults to None, which takes it from the first reading.
+                month (int, optional): Month number of the readings. Defaults to None, which
+                    takes it from the first reading.
+
+            Returns:
+                MonthFrame: The readings of the month.
+        """
+
+        dates = columns.get('PKT', [])
+        if year is None or month is None:
+            year, month, _ = parse_iso_date(dates[0]) if dates else (0, 0, 0)
+
+        # Only the day is needed per row, and it always follows the last dash
+        days = array('B', (int(date[date.rindex('-') + 1:]) for date in dates))
+
+        frame_columns = {}
+        for header, values in columns.items():
+            if header == 'PKT':
+                continue
+            if header in STR_HEADERS:
+                frame_columns[header] = [value if value else None for value in values]
+            else:
+                frame_columns[header] = values
+
+        return cls(year, month, days, frame_columns)
+
+    @property
+    def month_name(self) -> str:
+        """Returns the full name of the month."""
+
+        return MONTH_NAMES[self.month]
+
+    def __len__(self) -> int:
+        return len(self.days)
+
+    def values(self, header: str) -> Union[array, list[Optional[str]]]:
+        """Returns all readings of a column, in day order.
+
+            Args:
+                header (str): Header of the column.
+
+            Returns:
+                array: Readings of the column, NaN or None marking missing readings.
+        """
+
+        return self.columns[header]
+
+    def present(self, header: str) -> Iterator[tuple[int, Union[float, str]]]:
+        """Yields the day and value of every reading of a column which is not missing.
+
+            Args:
+                header (str): Header of the column.
+
+            Yields:
+                tuple: Day of the month and the reading.
+        """
+
+        for day, value in zip(self.days, self.columns[header]):
+            if value is not None and value == value:
+                yield day, value
+
+    def get(self, header: str, position: int) -> Optional[Union[float, str]]:
+        """Returns one reading of a column.
+
+            Args:
+                header (str): Header of the column.
+                position (int): Position of the reading in the month.
+
+            Returns:
+                float: The reading, or None if it is missing.
+        """
+
+        value = self.columns[header][position]
+        if value is None or (isinstance(value, float) and math.isnan(value)):
+            return None
+        return value
@@ -0,0 +1,123 @@
+"""Fused Strategies
+
+This module computes several calc strategies for one month in a single pass over its readings.
+When the same month is requested for several report types, its weatherfile is loaded once and
+every requested strategy is fed from the same scan, instead of each strategy loading and
+iterating the month on its own.
+
+The computations are the same as those of the strategies in weatherman.runner, down to
+tie-breaking and float rounding: extremes are compared on truncated readings and ties go to the
+earliest day, and averages add readings in day order.
+
+Attributes:
+    FUSED_STRATEGIES (tuple): Names of the calc strategies which can be fused.
+
+"""
+
+from typing import Iterable
+
+from weatherman.frames import MonthFrame
+
+FUSED_STRATEGIES = ('compute', 'compute_monthly_average', 'compute_min_max')
+
+
+def compute_fused(readings: MonthFrame, strategies: Iterable[str]) -> dict[str, dict]:
+    """Computes several calc strategies in a single pass over the readings of a month.
+
+        Args:
+            readings (MonthFrame): The readings of a month.
+            strategies (iterable): Names of the calc strategies, from FUSED_STRATEGIES.
+
+        Returns:
+            dict: Dictionary mapping the name of every strategy to its computations.
+
+        Raises:
+            ValueError: If a strategy cannot be fused, or the month has no readings to compute
+                an extreme from.
+            ZeroDivisionError: If the month has no readings to compute an average from.
+    """
+
+    strategies = set(strategies)
+    unknown = strategies.difference(FUSED_STRATEGIES)
+    if unknown:
+        raise ValueError(f'strategies {sorted(unknown)} cannot be fused, '
+                         f'expected some of {FUSED_STRATEGIES}')
+
+    extremes = 'compute' in strategies
+    averages = 'compute_monthly_average' in strategies
+    daily = {} if 'compute_min_max' in strategies else None
+
+    max_temps = readings.values('Max TemperatureC')
+    min_temps = readings.values('Min TemperatureC')
+    max_humidities = readings.values('Max Humidity') if extremes else None
+    mean_humidities = readings.values('Mean Humidity') if averages else None
+
+    highest = lowest = most_humid = None
+    total_max_temp = total_min_temp = total_mean_humidity = 0
+    max_temp_count = min_temp_count = mean_humidity_count = 0
+
+    for position, day in enumerate(readings.days):
+        max_temp = max_temps[position]
+        min_temp = min_temps[position]
+        has_max_temp = max_temp == max_temp
+        has_min_temp = min_temp == min_temp
+
+        if has_max_temp:
+            if extremes and (highest is None or int(max_temp) > highest[0]):
+                highest = int(max_temp), day
+            if averages:
+                total_max_temp += max_temp
+                max_temp_count += 1
+
+        if has_min_temp:
+            if extremes and (lowest is None or int(min_temp) < lowest[0]):
+                lowest = int(min_temp), day
+            if averages:
+                total_min_temp += min_temp
+                min_temp_count += 1
+
+        if daily is not None and has_max_temp and has_min_temp:
+            daily[day] = {
+                'max_temp': int(max_temp),
+                'min_temp': int(min_temp)
+            }
+
+        if extremes:
+            max_humidity = max_humidities[position]
+            if max_humidity == max_humidity and (most_humid is None
+                                                 or int(max_humidity) > most_humid[0]):
+                most_humid = int(max_humidity), day
+
+        if averages:
+            mean_humidity = mean_humidities[position]
+            if mean_humidity == mean_humidity:
+                total_mean_humidity += mean_humidity
+                mean_humidity_count += 1
+
+    computations = {}
+
+    if extremes:
+        if highest is None or lowest is None or most_humid is None:
+            raise ValueError(f'no readings to compute extremes from in {readings.month_name}')
+
+        month = readings.month_name
+        computations['compute'] = {
+            'max_temp': highest[0],
+            'max_date': f'{highest[1]} {month}',
+            'min_temp': lowest[0],
+            'min_date': f'{lowest[1]} {month}',
+            'max_humidity': most_humid[0],
+            'humidity_date': f'{most_humid[1]} {month}',
+        }
+
+    if averages:
+        computations['compute_monthly_average'] = {
+            'max_temp_avg': round(total_max_temp / max_temp_count),
+            'min_temp_avg': round(total_min_temp / min_temp_count),
+            'mean_humidity_avg': round(total_mean_humidity / mean_humidity_count),
+        }
+
+    if daily is not None:
+        computations['compute_min_max'] = daily
+
+    return computations
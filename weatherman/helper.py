@@ -1,5 +1,71 @@
 """Helper Functions"""
 import csv
+import math
+import os
+from array import array
+from typing import Iterable, Iterator, Optional, Union
+
+from weatherman.events import WEATHERFILE_READ, emit
+
+STR_HEADERS = ('PKT', 'Events')
+
+WEATHER_HEADERS = (
+    'Max TemperatureC', 'Mean TemperatureC', 'Min TemperatureC', 'Dew PointC', 'MeanDew PointC',
+    'Min DewpointC', 'Max Humidity', 'Mean Humidity', 'Min Humidity',
+    'Max Sea Level PressurehPa', 'Mean Sea Level PressurehPa', 'Min Sea Level PressurehPa',
+    'Max VisibilityKm', 'Mean VisibilityKm', 'Min VisibilitykM', 'Max Wind SpeedKm/h',
+    'Mean Wind SpeedKm/h', 'Max Gust SpeedKm/h', 'Precipitationmm', 'CloudCover', 'Events',
+    'WindDirDegrees',
+)
+
+Column = Union[array, list[str]]
+
+
+def parse_iso_date(value: str) -> tuple[int, int, int]:
+    """Parses a weatherfile date such as 2004-8-1 or 2004-08-01.
+
+    A fixed format replacement for datetime.strptime(value, '%Y-%m-%d'), which is far too slow
+    to call once per row.
+
+        Args:
+            value (str): A date in year-month-day order, separated by dashes.
+
+        Returns:
+            tuple: Tuple of year, month and day.
+
+        Raises:
+            ValueError: If the value is not a valid date in that format.
+    """
+
+    year, month, day = value.split('-')
+    year, month, day = int(year), int(month), int(day)
+
+    if not 1 <= month <= 12 or not 1 <= day <= 31:
+        raise ValueError(f'invalid date {value!r}')
+
+    return year, month, day
+
+
+def parse_report_date(value: str) -> tuple[int, int]:
+    """Parses a report date such as 2011/7 or 2011/07.
+
+        Args:
+            value (str): A date in year/month order.
+
+        Returns:
+            tuple: Tuple of year and month.
+
+        Raises:
+            ValueError: If the value is not a valid date in that format.
+    """
+
+    year, month = value.split('/')
+    year, month = int(year), int(month)
+
+    if not 1 <= month <= 12:
+        raise ValueError(f'invalid report date {value!r}')
+
+    return year, month
 
 
 def read_csv(file_path: str) -> list:
@@ -13,7 +79,81 @@ def read_csv(file_path: str) -> list:
     """
 
     with open(file_path, 'r') as csv_file:
+        emit(WEATHERFILE_READ, file_path, os.fstat(csv_file.fileno()).st_size)
         header = [h.strip() for h in csv_file.readline().split(',')]
         header[0] = 'PKT'
         data = csv.DictReader(csv_file, fieldnames=header)
         return list(data)
+
+
+def iter_csv(file_path: str, columns: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """Reads a text file as csv and yields rows one at a time.
+
+    Only the requested columns are kept. Lines are split no further than the last requested
+    column, so trailing columns which are not needed are never split or stored.
+
+        Args:
+            file_path (str): The path to a txt file.
+            columns (iterable, optional): Headers of the columns to keep. Defaults to None,
+                which keeps every column.
+
+        Yields:
+            dict: Dictionary containing the requested columns of one row.
+    """
+
+    with open(file_path, 'r') as csv_file:
+        emit(WEATHERFILE_READ, file_path, os.fstat(csv_file.fileno()).st_size)
+        header = [h.strip() for h in csv_file.readline().split(',')]
+        header[0] = 'PKT'
+
+        if columns is None:
+            wanted = list(enumerate(header))
+        else:
+            columns = set(columns)
+            wanted = [(i, h) for i, h in enumerate(header) if h in columns]
+        if not wanted:
+            return
+
+        max_split = wanted[-1][0] + 1
+
+        for line in csv_file:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            if '"' in line:
+                fields = next(csv.reader([line]))
+            else:
+                fields = line.split(',', max_split)
+            n_fields = len(fields)
+            yield {h: fields[i] if i < n_fields else None for i, h in wanted}
+
+
+def parse_columns(file_path: str, columns: Optional[Iterable[str]] = None) \
+        -> tuple[int, dict[str, Column]]:
+    """Parses a weatherfile into typed columns.
+
+    Numeric columns are returned as arrays of floats with NaN marking a missing reading,
+    string columns are returned as lists of strings.
+
+        Args:
+            file_path (str): The path to a txt file.
+            columns (iterable, optional): Headers of the columns to keep. Defaults to None,
+                which keeps every column.
+
+        Returns:
+            tuple: Number of rows and a dictionary mapping headers to column values.
+    """
+
+    n_rows = 0
+    parsed = {}
+    for row in iter_csv(file_path, columns):
+        if not parsed:
+            parsed = {header: [] if header in STR_HEADERS else array('d') for header in row}
+        for header, value in row.items():
+            if header in STR_HEADERS:
+                parsed[header].append(value)
+            else:
+                parsed[header].append(float(value) if value != '' else math.nan)
+        n_rows += 1
+
+    return n_rows, parsed
@@ -0,0 +1,224 @@
+"""Weatherfile Index
+
+This module keeps an in-memory index of the weatherfiles in a directory so report lookups do
+not have to scan the directory on every request.
+
+Weatherfile names follow the ``<Station>_weather_<YYYY>_<Mon>.txt`` layout, e.g.
+``Murree_weather_2004_Aug.txt``. Each name is parsed once into a ``(station, year, month)`` key.
+
+Attributes:
+    MONTH_ABBRS (dict): Mapping of three letter month abbreviations to month numbers.
+    FILE_NAME_PATTERN (re.Pattern): Pattern used to split a weatherfile name into its parts.
+
+"""
+
+import os
+import re
+import threading
+from typing import Optional
+
+MONTH_ABBRS = {
+    'Jan': 1, 'Feb': 2, 'Mar': 3, 'Apr': 4, 'May': 5, 'Jun': 6,
+    'Jul': 7, 'Aug': 8, 'Sep': 9, 'Oct': 10, 'Nov': 11, 'Dec': 12,
+}
+
+FILE_NAME_PATTERN = re.compile(
+    r'^(?:(?P<station>.*?)_)?(?:weather_)?(?P<year>\d{4})_(?P<month>[A-Za-z]{3})\.txt$'
+)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def parse_file_name(file_name: str) -> Optional[tuple[str, int, int]]:
+    """Parses a weatherfile name into its station, year and month.
+
+        Args:
+            file_name (str): Name of a weatherfile, without the directory.
+
+        Returns:
+            tuple: Tuple of station, year and month number, or None if the name is not
+                a weatherfile name.
+    """
+
+    match = FILE_NAME_PATTERN.match(file_name)
+    if match is None:
+        return None
+
+    month = MONTH_ABBRS.get(match.group('month').capitalize())
+    if month is None:
+        return None
+
+    return match.group('station') or '', int(match.group('year')), month
+
+
+class WeatherFileIndex:
+    """A Class to map (station, year, month) keys to weatherfile paths.
+
+    The index is refreshed lazily: every lookup compares the directory's modification time
+    with the one seen on the last scan, and only re-lists the directory when it changed. On a
+    re-list only names that were not seen before are parsed.
+
+        Attributes:
+            files_dir (str): The directory pointing to weatherfiles.
+            generation (int): Number of scans so far, so callers can tell that the indexed
+                files changed without comparing them.
+
+        Methods:
+            refresh: Re-scans the directory if it changed since the last scan.
+            get_month: Returns the path of the weatherfile for a month.
+            get_year: Returns the paths of the weatherfiles for a year in calendar order.
+            items: Returns every indexed key with its path.
+            stations: Returns the names of all indexed stations.
+    """
+
+    def __init__(self, files_dir: str) -> None:
+        """The constructor for WeatherFileIndex class.
+
+            Args:
+                files_dir (str): The directory pointing to weatherfiles.
+        """
+
+        self.files_dir = files_dir
+        self._names = {}
+        self._files = {}
+        self._years = {}
+        self._mtime = None
+        self.generation = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_dir(cls, files_dir: str) -> 'WeatherFileIndex':
+        """Returns the shared index for a directory, creating it on first use.
+
+            Args:
+                files_dir (str): The directory pointing to weatherfiles.
+
+            Returns:
+                WeatherFileIndex: The index shared by every reader of the directory.
+        """
+
+        key = os.path.abspath(files_dir)
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = _indexes[key] = cls(files_dir)
+        return index
+
+    def refresh(self) -> bool:
+        """Re-scans the directory if it changed since the last scan.
+
+            Returns:
+                bool: Whether the directory was re-scanned.
+        """
+
+        mtime = os.stat(self.files_dir).st_mtime_ns
+        if mtime == self._mtime:
+            return False
+
+        with self._lock:
+            if mtime == self._mtime:
+                return False
+
+            current = {f for f in os.listdir(self.files_dir) if f.endswith('.txt')}
+
+            removed = {file_name: self._names.pop(file_name)
+                       for file_name in self._names.keys() - current}
+            for file_name, key in removed.items():
+                if key is None or self._files.get(key) != self._path(file_name):
+                    continue
+                # Another name can map to the same month, such as one without 'weather_'
+                survivors = [name for name, other in self._names.items() if other == key]
+                if survivors:
+                    self._files[key] = self._path(max(survivors))
+                else:
+                    del self._files[key]
+
+            for file_name in sorted(current - self._names.keys()):
+                key = parse_file_name(file_name)
+                self._names[file_name] = key
+                if key is not None:
+                    self._files[key] = self._path(file_name)
+
+            years = {}
+            for station, year, month in self._files:
+                years.setdefault(year, {}).setdefault(month, set()).add(station)
+            self._years = years
+            self._mtime = mtime
+            self.generation += 1
+
+        return True
+
+    def _path(self, file_name: str) -> str:
+        """Returns the full path of a file in the indexed directory."""
+
+        return f'{self.files_dir}/{file_name}'
+
+    def _station_for(self, year: int, month: int, station: Optional[str]) -> Optional[str]:
+        """Returns the station to use for a month, defaulting to the first station by name.
+
+        Has to be called with the lock held, as a refresh changes the index in place.
+        """
+
+        stations = self._years.get(year, {}).get(month)
+        if not stations:
+            return None
+        if station is None:
+            return min(stations)
+        return station if station in stations else None
+
+    def get_month(self, year: int, month: int, station: Optional[str] = None) -> Optional[str]:
+        """Returns the path of the weatherfile for a month.
+
+            Args:
+                year (int): Year of the weatherfile.
+                month (int): Month number of the weatherfile.
+                station (str, optional): Station of the weatherfile. Defaults to the first
+                    station, by name, which has data for the month.
+
+            Returns:
+                str: Path of the weatherfile, or None if there is no such file.
+        """
+
+        self.refresh()
+        with self._lock:
+            station = self._station_for(year, month, station)
+            if station is None:
+                return None
+            return self._files.get((station, year, month))
+
+    def get_year(self, year: int, station: Optional[str] = None) -> list[str]:
+        """Returns the paths of the weatherfiles for a year in calendar order.
+
+            Args:
+                year (int): Year of the weatherfiles.
+                station (str, optional): Station of the weatherfiles. Defaults to the first
+                    station, by name, which has data for the year.
+
+            Returns:
+                list: List of weatherfile paths, one per available month.
+        """
+
+        self.refresh()
+        with self._lock:
+            months = self._years.get(year, {})
+            if station is None:
+                station = min(set().union(*months.values()), default=None)
+
+            return [self._files[(station, year, month)] for month in sorted(months)
+                    if station in months[month]]
+
+    def items(self) -> list[tuple[tuple[str, int, int], str]]:
+        """Returns every indexed (station, year, month) key with its path, sorted by key."""
+
+        self.refresh()
+        with self._lock:
+            files = dict(self._files)
+        return sorted(files.items())
+
+    def stations(self) -> list[str]:
+        """Returns the names of all indexed stations."""
+
+        self.refresh()
+        with self._lock:
+            return sorted({station for station, _, _ in self._files})
@@ -0,0 +1,147 @@
+"""Month Loader
+
+This module loads several weatherfiles concurrently. Reads fan out over a thread pool, which
+overlaps the I/O latency of slow or network-mounted storage, or over a process pool, which also
+spreads the parsing over several cores. Results always come back in the order of the files
+asked for, so month order stays deterministic.
+
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, Optional
+
+from weatherman.cache import ColumnarCache
+from weatherman.frames import MonthFrame
+from weatherman.helper import parse_columns
+from weatherman.index import parse_file_name
+
+EXECUTORS = ('thread', 'process')
+
+
+def load_frame(file_name: str, columns: Optional[Iterable[str]] = None,
+               cache: Optional[ColumnarCache] = None) -> MonthFrame:
+    """Reads a weatherfile into a MonthFrame, using the cache if there is one.
+
+    The year and month of the readings are taken from the weatherfile name when it follows the
+    indexed naming scheme, so only the day has to be parsed from each row.
+
+        Args:
+            file_name (str): The path to a weatherfile.
+            columns (iterable, optional): Headers of the columns to load. Defaults to None,
+                which loads every column.
+            cache (ColumnarCache, optional): The cache holding parsed weatherfiles.
+                Defaults to None.
+
+        Returns:
+            MonthFrame: The readings of the month held in the weatherfile.
+    """
+
+    year, month = None, None
+    key = parse_file_name(os.path.basename(file_name))
+    if key is not None:
+        _, year, month = key
+
+    if cache is None:
+        return MonthFrame.from_columns(*parse_columns(file_name, columns), year, month)
+
+    return MonthFrame.from_columns(*cache.load(file_name, columns), year, month)
+
+
+class MonthLoader:
+    """A Class to load weatherfiles concurrently while keeping their order.
+
+        Attributes:
+            workers (int): Number of concurrent loads.
+            executor (str): Kind of pool the loads run on, one of EXECUTORS.
+
+        Methods:
+            load: Loads weatherfiles into MonthFrames.
+            load_groups: Loads several lists of weatherfiles in a single fan-out.
+            close: Shuts the pool down.
+    """
+
+    def __init__(self, workers: int = 4, executor: str = 'thread') -> None:
+        """The constructor for MonthLoader class.
+
+            Args:
+                workers (int, optional): Number of concurrent loads. Defaults to 4.
+                executor (str, optional): 'thread' to load on a thread pool, or 'process'
+                    to load and parse on a process pool. Defaults to 'thread'.
+        """
+
+        if executor not in EXECUTORS:
+            raise ValueError(f'unknown executor {executor!r}, expected one of {EXECUTORS}')
+
+        self.workers = workers
+        self.executor = executor
+        self._pool = None
+
+    def _get_pool(self) -> Executor:
+        """Returns the pool, starting it on first use."""
+
+        if self._pool is None:
+            if self.executor == 'process':
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.workers,
+                                                thread_name_prefix='weatherman-loader')
+        return self._pool
+
+    def load(self, file_names: list[str], columns: Optional[Iterable[str]] = None,
+             cache: Optional[ColumnarCache] = None) -> list[MonthFrame]:
+        """Loads weatherfiles into MonthFrames.
+
+            Args:
+                file_names (list): Paths of the weatherfiles.
+                columns (iterable, optional): Headers of the columns to load. Defaults to
+                    None, which loads every column.
+                cache (ColumnarCache, optional): The cache holding parsed weatherfiles.
+                    Defaults to None.
+
+            Returns:
+                list: List of MonthFrames in the order of file_names.
+        """
+
+        if columns is not None:
+            columns = set(columns)
+
+        if len(file_names) < 2 or self.workers < 2:
+            return [load_frame(file_name, columns, cache) for file_name in file_names]
+
+        n_files = len(file_names)
+        return list(self._get_pool().map(load_frame, file_names,
+                                         [columns] * n_files, [cache] * n_files))
+
+    def load_groups(self, groups: list[list[str]], columns: Optional[Iterable[str]] = None,
+                    cache: Optional[ColumnarCache] = None) -> list[list[MonthFrame]]:
+        """Loads several lists of weatherfiles in a single fan-out.
+
+            Args:
+                groups (list): Lists of weatherfile paths, e.g. one list per year.
+                columns (iterable, optional): Headers of the columns to load. Defaults to
+                    None, which loads every column.
+                cache (ColumnarCache, optional): The cache holding parsed weatherfiles.
+                    Defaults to None.
+
+            Returns:
+                list: One list of MonthFrames per group, in the order of groups.
+        """
+
+        frames = self.load([file_name for group in groups for file_name in group],
+                           columns, cache)
+
+        loaded = []
+        start = 0
+        for group in groups:
+            loaded.append(frames[start:start + len(group)])
+            start += len(group)
+
+        return loaded
+
+    def close(self) -> None:
+        """Shuts the pool down."""
+
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,359 @@
+"""Date Range Queries
+
+This module answers queries over arbitrary date ranges, such as the highest temperature between
+2005-03-14 and 2009-11-02, without loading the weatherfiles in between.
+
+The whole history of a station is loaded once into a RangeIndex. Per column, prefix sums and
+prefix counts answer averages in O(1), and sparse tables of the positions of the highest and
+lowest readings answer extremes in O(1). Finding the ends of a range is a binary search over
+the days, so every query takes O(log n).
+
+Indexes are kept per backend and station, and a query compares the generation of the backend
+with the one its index was built at, so indexes are rebuilt when weatherfiles are stored or
+removed. Weatherfiles rewritten in place leave the generation alone, so once an index is older
+than max_age seconds a query also compares the fingerprint of the readings, and at most one
+query in max_age stats the weatherfiles of a station. refresh_range_indexes() compares the
+fingerprints of every index at once. Given a SingleFlight, concurrent queries waiting for the
+same index share one build instead of each loading the whole history of the station.
+
+Attributes:
+    RANGE_HEADERS (tuple): Headers of the columns queried when no columns are given.
+    MAX_AGE (float): Seconds an index is served before the fingerprint of its readings is
+        compared again, when no max_age is given.
+
+"""
+
+import threading
+import time
+import weakref
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from math import isnan
+from typing import Hashable, Iterable, Optional
+
+from weatherman.backends import Backend
+from weatherman.frames import MonthFrame
+from weatherman.helper import STR_HEADERS
+from weatherman.single_flight import SingleFlight
+
+RANGE_HEADERS = ('Max TemperatureC', 'Min TemperatureC', 'Max Humidity', 'Mean Humidity')
+MAX_AGE = 1.0
+
+_indexes = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+class RangeIndex:
+    """A Class to answer range queries over the readings of a station.
+
+    Indexes of the columns given to build() are built ahead of queries, indexes of other
+    columns on the first query of the column.
+
+        Attributes:
+            ordinals (array): Proleptic Gregorian ordinal of every day, in order.
+            columns (dict): Dictionary mapping headers to arrays of readings, NaN marking a
+                missing reading.
+
+        Methods:
+            build: Builds the indexes of columns ahead of queries.
+            span: Returns the positions of the days in a date range.
+            stats: Returns count, average and extremes of a column over a date range.
+    """
+
+    def __init__(self, frames: list[MonthFrame]) -> None:
+        """The constructor for RangeIndex class.
+
+            Args:
+                frames (list): The readings of a station, in chronological order.
+        """
+
+        self.ordinals = array('l')
+        self.columns = {}
+        self._prefixes = {}
+        self._tables = {}
+
+        headers = {header for frame in frames for header in frame.columns
+                   if header not in STR_HEADERS}
+        for header in headers:
+            self.columns[header] = array('d')
+
+        for frame in frames:
+            first = date(frame.year, frame.month, 1).toordinal() - 1
+            self.ordinals.extend(first + day for day in frame.days)
+            for header, values in self.columns.items():
+                if header in frame.columns:
+                    values.extend(frame.columns[header])
+                else:
+                    values.extend([float('nan')] * len(frame))
+
+    def build(self, headers: Iterable[str]) -> 'RangeIndex':
+        """Builds the prefix sums and sparse tables of columns ahead of queries.
+
+            Args:
+                headers (iterable): Headers of the columns. Columns which are not indexed are
+                    skipped.
+
+            Returns:
+                RangeIndex: The index itself.
+        """
+
+        for header in headers:
+            if header in self.columns:
+                self._prefix(header)
+                self._table(header, True)
+                self._table(header, False)
+        return self
+
+    def span(self, start: date, end: date) -> tuple[int, int]:
+        """Returns the positions of the days in a date range.
+
+            Args:
+                start (date): First day of the range.
+                end (date): Last day of the range, included in the range.
+
+            Returns:
+                tuple: Position of the first day in the range and the position after the last.
+        """
+
+        return (bisect_left(self.ordinals, start.toordinal()),
+                bisect_right(self.ordinals, end.toordinal()))
+
+    def _prefix(self, header: str) -> tuple[array, array]:
+        """Returns the prefix sums and prefix counts of a column, building them on first use."""
+
+        prefix = self._prefixes.get(header)
+        if prefix is None:
+            sums, counts = array('d', [0.0]), array('l', [0])
+            total, count = 0.0, 0
+            for value in self.columns[header]:
+                if not isnan(value):
+                    total += value
+                    count += 1
+                sums.append(total)
+                counts.append(count)
+            prefix = self._prefixes[header] = sums, counts
+        return prefix
+
+    def _table(self, header: str, highest: bool) -> list[array]:
+        """Returns the sparse table of a column, building it on first use.
+
+        Level k holds, for every position i, the position of the extreme reading among the 2**k
+        readings starting at i, the earliest one on ties. Missing readings never win.
+        """
+
+        key = header, highest
+        table = self._tables.get(key)
+        if table is not None:
+            return table
+
+        values = self.columns[header]
+        table = [array('l', range(len(values)))]
+        width = 1
+        while width * 2 <= len(values):
+            previous = table[-1]
+            level = array('l')
+            for position in range(len(values) - width * 2 + 1):
+                level.append(self._better(values, previous[position],
+                                          previous[position + width], highest))
+            table.append(level)
+            width *= 2
+
+        self._tables[key] = table
+        return table
+
+    @staticmethod
+    def _better(values: array, left: int, right: int, highest: bool) -> int:
+        """Returns whichever of two positions holds the extreme reading, the left one on ties."""
+
+        left_value, right_value = values[left], values[right]
+        if isnan(right_value):
+            return left
+        if isnan(left_value):
+            return right
+        if highest:
+            return right if right_value > left_value else left
+        return right if right_value < left_value else left
+
+    def _extreme(self, header: str, lo: int, hi: int, highest: bool) -> Optional[int]:
+        """Returns the position of the extreme reading in [lo, hi), or None if all are missing."""
+
+        table = self._table(header, highest)
+        level = (hi - lo).bit_length() - 1
+        position = self._better(self.columns[header], table[level][lo],
+                                table[level][hi - (1 << level)], highest)
+        return None if isnan(self.columns[header][position]) else position
+
+    def _date(self, position: int) -> str:
+        """Returns the ISO date of a position."""
+
+        return date.fromordinal(self.ordinals[position]).isoformat()
+
+    def stats(self, header: str, start: date, end: date) -> dict:
+        """Returns count, average and extremes of a column over a date range.
+
+            Args:
+                header (str): Header of the column.
+                start (date): First day of the range.
+                end (date): Last day of the range, included in the range.
+
+            Returns:
+                dict: Dictionary containing the number of readings, their average, and the
+                    highest and lowest readings with the earliest date they were read on. Values
+                    are None when there are no readings in the range.
+
+            Raises:
+                KeyError: If the column is not indexed.
+        """
+
+        stats = {'count': 0, 'average': None, 'max': None, 'max_date': None,
+                 'min': None, 'min_date': None}
+
+        if header not in self.columns:
+            raise KeyError(header)
+
+        lo, hi = self.span(start, end)
+        if lo >= hi:
+            return stats
+
+        sums, counts = self._prefix(header)
+        stats['count'] = counts[hi] - counts[lo]
+        if not stats['count']:
+            return stats
+
+        stats['average'] = (sums[hi] - sums[lo]) / stats['count']
+        for key, highest in (('max', True), ('min', False)):
+            position = self._extreme(header, lo, hi, highest)
+            stats[key] = self.columns[header][position]
+            stats[f'{key}_date'] = self._date(position)
+
+        return stats
+
+
+def _build_range_index(backend: Backend, station: Optional[str]) -> RangeIndex:
+    """Builds the RangeIndex of a station and keeps it along with the state of the backend."""
+
+    checked = time.monotonic()
+    fingerprint = backend.fingerprint(station=station)
+    index = RangeIndex(backend.load_history(station=station)).build(RANGE_HEADERS)
+    # Taken last, as fingerprints and loads can sync the storage or create its cache directory
+    generation = backend.generation()
+    with _indexes_lock:
+        _indexes.setdefault(backend, {})[station] = generation, fingerprint, index, checked
+    return index
+
+
+def _coalesce_build(backend: Backend, station: Optional[str], generation: Hashable,
+                    single_flight: Optional[SingleFlight]) -> RangeIndex:
+    """Builds the RangeIndex of a station, sharing the build with concurrent queries."""
+
+    if single_flight is None:
+        return _build_range_index(backend, station)
+
+    # The flight returns nothing, so waiting queries share the kept index instead of copying it
+    single_flight.do(('range_index', backend, station, generation),
+                     lambda: _build_range_index(backend, station) and None)
+    with _indexes_lock:
+        return _indexes[backend][station][2]
+
+
+def get_range_index(backend: Backend, station: Optional[str] = None,
+                    max_age: float = MAX_AGE,
+                    single_flight: Optional[SingleFlight] = None) -> RangeIndex:
+    """Returns the RangeIndex of a station, building it when its readings changed.
+
+    Indexes are kept per backend and station along with the generation of the backend they
+    were built at, and the tables of RANGE_HEADERS are built along with them. The fingerprint
+    of the readings is compared once the index was last checked more than max_age seconds ago.
+
+        Args:
+            backend (Backend): The storage backend readings are loaded from.
+            station (str, optional): Station of the readings. Defaults to the first station by
+                name.
+            max_age (float, optional): Seconds an index is served before the fingerprint of its
+                readings is compared again. Defaults to MAX_AGE.
+            single_flight (SingleFlight, optional): The single flight concurrent builds of the
+                same index are coalesced through. Defaults to None, which builds in every
+                caller.
+
+        Returns:
+            RangeIndex: The index of the readings of the station.
+    """
+
+    generation = backend.generation()
+    with _indexes_lock:
+        stored = _indexes.get(backend, {}).get(station)
+    if stored is None or stored[0] != generation:
+        return _coalesce_build(backend, station, generation, single_flight)
+
+    checked = time.monotonic()
+    if checked - stored[3] < max_age:
+        return stored[2]
+    if backend.fingerprint(station=station) != stored[1]:
+        return _coalesce_build(backend, station, generation, single_flight)
+
+    with _indexes_lock:
+        indexes = _indexes.get(backend, {})
+        if indexes.get(station) is stored:
+            indexes[station] = (*stored[:3], checked)
+    return stored[2]
+
+
+def refresh_range_indexes(backend: Backend) -> int:
+    """Rebuilds the RangeIndexes of a backend whose readings changed since they were built.
+
+    Unlike get_range_index(), this compares the fingerprints of every index regardless of its
+    age, so weatherfiles rewritten in place are picked up before the next query.
+
+        Args:
+            backend (Backend): The storage backend readings are loaded from.
+
+        Returns:
+            int: Number of rebuilt indexes.
+    """
+
+    with _indexes_lock:
+        stored = dict(_indexes.get(backend, {}))
+
+    rebuilt = 0
+    for station, (generation, fingerprint, _, _) in stored.items():
+        if (generation != backend.generation()
+                or fingerprint != backend.fingerprint(station=station)):
+            _build_range_index(backend, station)
+            rebuilt += 1
+
+    return rebuilt
+
+
+def query_range(backend: Backend, start: date, end: date,
+                headers: Optional[Iterable[str]] = None,
+                station: Optional[str] = None, max_age: float = MAX_AGE,
+                single_flight: Optional[SingleFlight] = None) -> dict[str, dict]:
+    """Returns count, average and extremes of columns over a date range.
+
+        Args:
+            backend (Backend): The storage backend readings are loaded from.
+            start (date): First day of the range.
+            end (date): Last day of the range, included in the range.
+            headers (iterable, optional): Headers of the columns to query. Defaults to
+                RANGE_HEADERS.
+            station (str, optional): Station of the readings. Defaults to the first station by
+                name.
+            max_age (float, optional): Seconds an index is served before the fingerprint of its
+                readings is compared again. Defaults to MAX_AGE.
+            single_flight (SingleFlight, optional): The single flight concurrent builds of the
+                index are coalesced through. Defaults to None.
+
+        Returns:
+            dict: Dictionary mapping headers to the stats of their column.
+
+        Raises:
+            ValueError: If the range ends before it starts.
+            KeyError: If a column is not stored.
+    """
+
+    if end < start:
+        raise ValueError(f'range ends on {end} before it starts on {start}')
+
+    index = get_range_index(backend, station, max_age, single_flight)
+    return {header: index.stats(header, start, end) for header in headers or RANGE_HEADERS}
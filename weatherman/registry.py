@@ -0,0 +1,116 @@
+"""Strategy Registry
+
+This module holds the registries of calc and report strategies. Strategies are registered once
+under a stable name, so worker processes, report caches and API parameters can refer to them by
+name instead of by function object.
+
+"""
+
+from typing import Callable, Optional, Union
+
+Strategy = Union[str, Callable, None]
+
+
+class StrategyRegistry:
+    """A Class to register strategy functions by name and look them up.
+
+        Attributes:
+            kind (str): Kind of the registered strategies, used in error messages.
+            default (str): Name of the strategy used when no strategy is given.
+
+        Methods:
+            register: Registers a strategy function under a name.
+            get: Returns the function of a strategy.
+            name: Returns the name a strategy is registered under.
+            names: Returns the names of every registered strategy.
+    """
+
+    def __init__(self, kind: str, default: str) -> None:
+        """The constructor for StrategyRegistry class.
+
+            Args:
+                kind (str): Kind of the registered strategies, e.g. calc.
+                default (str): Name of the strategy used when no strategy is given. It has to
+                    be registered before the first lookup.
+        """
+
+        self.kind = kind
+        self.default = default
+        self._functions = {}
+        self._names = {}
+
+    def register(self, name: Optional[str] = None) -> Callable[[Callable], Callable]:
+        """Registers a strategy function under a name.
+
+            Args:
+                name (str, optional): Name of the strategy. Defaults to None, which registers
+                    the function under its own name.
+
+            Returns:
+                callable: Decorator which registers a function and returns it unchanged.
+
+            Raises:
+                ValueError: If another function is registered under the name.
+        """
+
+        def decorator(func: Callable) -> Callable:
+            key = name if name is not None else func.__name__
+            registered = self._functions.get(key)
+            if registered is not None and registered is not func:
+                raise ValueError(f'{self.kind} strategy {key!r} is already registered')
+
+            self._functions[key] = func
+            self._names[func] = key
+            return func
+
+        return decorator
+
+    def get(self, strategy: Strategy) -> Callable:
+        """Returns the function of a strategy.
+
+            Args:
+                strategy (str or callable): Name of a registered strategy, or a strategy
+                    function which is returned as is. None stands for the default strategy.
+
+            Returns:
+                callable: The strategy function.
+
+            Raises:
+                ValueError: If no strategy is registered under the name.
+        """
+
+        if strategy is None:
+            strategy = self.default
+        if not isinstance(strategy, str):
+            return strategy
+
+        try:
+            return self._functions[strategy]
+        except KeyError:
+            raise ValueError(f'unknown {self.kind} strategy {strategy!r}, expected one of '
+                             f'{self.names()}') from None
+
+    def name(self, strategy: Strategy) -> Optional[str]:
+        """Returns the name a strategy is registered under.
+
+            Args:
+                strategy (str or callable): Name of a registered strategy, or a strategy
+                    function. None stands for the default strategy.
+
+            Returns:
+                str: Name of the strategy, or None if the function is not registered.
+
+            Raises:
+                ValueError: If no strategy is registered under the name.
+        """
+
+        if strategy is None or isinstance(strategy, str):
+            self.get(strategy)
+            return strategy if strategy is not None else self.default
+
+        return self._names.get(strategy)
+
+    def names(self) -> tuple[str, ...]:
+        """Returns the names of every registered strategy, in registration order."""
+
+        return tuple(self._functions)
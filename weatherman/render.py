@@ -0,0 +1,224 @@
+"""Report Rendering
+
+This module turns reports into terminal text. Bar charts of a whole month are assembled into one
+string, bars are scaled down to fit the terminal width, and colors can be left out when output
+goes to a file. Rendered text is written through a ChunkedWriter, which hands it to the output
+stream in large chunks instead of one write per line.
+
+Attributes:
+    RED (str): ANSI escape sequence for red text color.
+    BLUE (str): ANSI escape sequence for blue text color.
+    RESET (str): ANSI escape sequence for text color reset.
+    CHUNK_SIZE (int): Number of characters a ChunkedWriter buffers before writing them out.
+
+"""
+
+from typing import Optional, TextIO
+
+from weatherman.frames import MONTH_NAMES
+from weatherman.helper import parse_report_date
+
+RED = '\033[91m'
+BLUE = '\033[34m'
+RESET = '\033[0m'
+
+CHUNK_SIZE = 1 << 16
+
+
+class BarRenderer:
+    """A Class to render daily min/max temperatures as horizontal bar charts.
+
+        Attributes:
+            width (int): Highest number of characters per line, or None to never scale bars.
+            color (bool): Whether bars are colored with ANSI escape sequences.
+
+        Methods:
+            multiple: Renders two bars per day, one for each temperature.
+            single: Renders one bar per day, the min temperature followed by the max.
+    """
+
+    def __init__(self, width: Optional[int] = None, color: bool = True) -> None:
+        """The constructor for BarRenderer class.
+
+            Args:
+                width (int, optional): Highest number of characters per line. Bars of months
+                    whose lines would be wider are scaled down to fit. Defaults to None, which
+                    draws one character per degree.
+                color (bool, optional): Whether bars are colored. Defaults to True.
+        """
+
+        self.width = width
+        self.color = color
+
+    def _colors(self) -> tuple[str, str, str]:
+        """Returns the red, blue and reset escape sequences, empty without colors."""
+
+        return (RED, BLUE, RESET) if self.color else ('', '', '')
+
+    def _scale(self, longest: int, fixed: int) -> float:
+        """Returns the factor bars are scaled by so the longest line fits in the width.
+
+            Args:
+                longest (int): Length of the longest bars of a line, unscaled.
+                fixed (int): Number of characters of the widest line which are not bars.
+
+            Returns:
+                float: The scale, 1 if the bars fit.
+        """
+
+        if self.width is None or longest <= self.width - fixed:
+            return 1
+        return max(self.width - fixed, 0) / longest
+
+    @staticmethod
+    def _bar(value: int, scale: float) -> str:
+        """Returns the bar of a reading, empty for readings below one."""
+
+        return '+' * (value if scale == 1 else int(value * scale))
+
+    @staticmethod
+    def _title(report_date: str) -> str:
+        """Returns the title line of a month."""
+
+        year, month = parse_report_date(report_date)
+        return f'{MONTH_NAMES[month]} {year}\n'
+
+    def multiple(self, report_date: str, results: dict[int, dict[str, int]]) -> str:
+        """Renders two bars per day, the max temperature in red and the min in blue.
+
+            Args:
+                report_date (str): Date of the month, e.g. 2011/7.
+                results (dict): Dictionary mapping days to their max and min temperatures.
+
+            Returns:
+                str: The rendered month.
+        """
+
+        red, blue, reset = self._colors()
+        values = [value for readings in results.values()
+                  for value in (readings['max_temp'], readings['min_temp'])]
+        scale = self._scale(max(values, default=0),
+                            4 + max((len(f'{value}C') for value in values), default=0))
+
+        lines = [self._title(report_date)]
+        for day, readings in results.items():
+            lines.append(f'{day:02d} {red}{self._bar(readings["max_temp"], scale)} '
+                         f'{reset}{readings["max_temp"]}C\n')
+            lines.append(f'{day:02d} {blue}{self._bar(readings["min_temp"], scale)} '
+                         f'{reset}{readings["min_temp"]}C\n')
+
+        return ''.join(lines)
+
+    def single(self, report_date: str, results: dict[int, dict[str, int]]) -> str:
+        """Renders one bar per day, the min temperature in blue followed by the max in red.
+
+            Args:
+                report_date (str): Date of the month, e.g. 2011/7.
+                results (dict): Dictionary mapping days to their max and min temperatures.
+
+            Returns:
+                str: The rendered month.
+        """
+
+        red, blue, reset = self._colors()
+        labels = [f'{readings["min_temp"]}C - {readings["max_temp"]}C'
+                  for readings in results.values()]
+        scale = self._scale(
+            max((max(readings['min_temp'], 0) + max(readings['max_temp'], 0)
+                 for readings in results.values()), default=0),
+            4 + max(map(len, labels), default=0))
+
+        lines = [self._title(report_date)]
+        for (day, readings), label in zip(results.items(), labels):
+            lines.append(f'{day:02d} {blue}{self._bar(readings["min_temp"], scale)}{red}'
+                         f'{self._bar(readings["max_temp"], scale)} {reset}{label}\n')
+
+        return ''.join(lines)
+
+
+_default_bar_renderer = BarRenderer()
+
+
+def set_default_bar_renderer(renderer: BarRenderer) -> None:
+    """Sets the renderer bar reports are rendered with.
+
+        Args:
+            renderer (BarRenderer): The renderer.
+    """
+
+    global _default_bar_renderer
+
+    _default_bar_renderer = renderer
+
+
+def default_bar_renderer() -> BarRenderer:
+    """Returns the renderer bar reports are rendered with."""
+
+    return _default_bar_renderer
+
+
+class ChunkedWriter:
+    """A Class to buffer rendered text and write it to a stream in large chunks.
+
+    Short runs are written out with a single write when the writer is closed, while long date
+    ranges are streamed a chunk at a time instead of being held in memory until the end.
+
+        Attributes:
+            stream (file): The stream text is written to.
+            chunk_size (int): Number of characters buffered before they are written out.
+
+        Methods:
+            write: Adds text to the buffer, writing the buffer out once it is full.
+            flush: Writes the buffer out.
+            close: Writes the buffer out. The stream itself is left open.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        """The constructor for ChunkedWriter class.
+
+            Args:
+                stream (file): The stream text is written to.
+                chunk_size (int, optional): Number of characters buffered before they are
+                    written out. Defaults to CHUNK_SIZE.
+        """
+
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._parts = []
+        self._size = 0
+
+    def write(self, text: str) -> int:
+        """Adds text to the buffer, writing the buffer out once it holds a whole chunk.
+
+            Args:
+                text (str): The text.
+
+            Returns:
+                int: Number of characters added.
+        """
+
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.chunk_size:
+            self.flush()
+        return len(text)
+
+    def flush(self) -> None:
+        """Writes the buffer out to the stream and flushes the stream."""
+
+        if self._parts:
+            self.stream.write(''.join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Writes the buffer out. The stream itself is left open."""
+
+        self.flush()
+
+    def __enter__(self) -> 'ChunkedWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
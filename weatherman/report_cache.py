@@ -0,0 +1,129 @@
+"""Report Cache
+
+This module keeps generated reports in memory across calls to process_args(), so reports for
+immutable weatherfiles, such as those of past years, are generated only once.
+
+Reports are keyed by their strategies, their date and the fingerprint of the stored readings of
+that date, so a report is generated again as soon as its weatherfiles change. Reports are copied
+on the way in and on the way out, so callers changing a report never change the cached one.
+
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from weatherman.events import CACHE_LOOKUP, emit
+
+
+class ReportCache:
+    """A Class to keep reports in a bounded LRU cache.
+
+        Attributes:
+            max_size (int): Highest number of reports kept. The least recently used report is
+                evicted when a report is added to a full cache.
+            ttl (float): Seconds a report is kept for, or None to keep reports until evicted.
+
+        Methods:
+            get: Returns a cached report.
+            put: Adds a report to the cache.
+            clear: Removes every report from the cache.
+            stats: Returns the counters of the cache.
+    """
+
+    def __init__(self, max_size: int = 256, ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """The constructor for ReportCache class.
+
+            Args:
+                max_size (int, optional): Highest number of reports kept. Defaults to 256.
+                ttl (float, optional): Seconds a report is kept for. Defaults to None, which
+                    keeps reports until they are evicted.
+                clock (callable, optional): Function returning the current time in seconds.
+                    Defaults to time.monotonic.
+        """
+
+        if max_size < 1:
+            raise ValueError(f'max_size must be at least 1, got {max_size}')
+
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns a cached report.
+
+            Args:
+                key (hashable): Key of the report.
+
+            Returns:
+                A copy of the cached report, or None if it is not cached or expired.
+        """
+
+        with self._lock:
+            value = None
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is not None and expires <= self._clock():
+                    del self._entries[key]
+                    self._expirations += 1
+                    entry = value = None
+
+            if entry is None:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self._hits += 1
+
+        emit(CACHE_LOOKUP, 'report', entry is not None)
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Adds a report to the cache, evicting the least recently used report if it is full.
+
+            Args:
+                key (hashable): Key of the report.
+                value: The report. A copy of it is cached.
+        """
+
+        value = copy.deepcopy(value)
+        expires = self._clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = expires, value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """Removes every report from the cache."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters of the cache.
+
+            Returns:
+                dict: Dictionary containing the number of hits, misses, evictions and
+                    expirations, and the number of cached reports.
+        """
+
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'size': len(self._entries),
+                'max_size': self.max_size,
+            }
@@ -9,221 +9,305 @@ Example:
         $ python weatherman.py /path/to/weatherfiles -a 2011/7 -b 2011/7 2012/7 -c 2011/7 -e 2004
 
 Attributes:
-    RED (str): ANSI escape sequence for red text color.
-    BLUE (str): ANSI escape sequence for blue text color.
-    RESET (str): ANSI escape sequence for text color reset.
+    ENGINES (tuple): Names of the calculation engines a Calculator can run on.
+    COLOR_MODES (tuple): Choices of the --color option.
+    CALC_STRATEGIES (StrategyRegistry): Calc strategies by name.
+    REPORT_STRATEGIES (StrategyRegistry): Report strategies by name.
 
 """
 
 import argparse
-import os
-import types
-from datetime import datetime
-from typing import Union, Optional, Callable
-from weatherman.helper import read_csv
+import functools
+import importlib.util
+import math
+import shutil
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Union, Optional, Callable, Iterable, TextIO
+from weatherman.backends import BACKENDS, Backend, TextFileBackend, create_backend
+from weatherman.cache import ColumnarCache
+from weatherman.frames import MonthFrame
+from weatherman.fused import FUSED_STRATEGIES, compute_fused
+from weatherman.helper import STR_HEADERS, parse_report_date
+from weatherman.index import WeatherFileIndex
+from weatherman.loader import EXECUTORS, MonthLoader
+from weatherman.registry import Strategy, StrategyRegistry
+from weatherman.render import (BarRenderer, ChunkedWriter, default_bar_renderer,
+                               set_default_bar_renderer)
+from weatherman.report_cache import ReportCache
+from weatherman.single_flight import SingleFlight
+from weatherman import timing
+from weatherman.timing import stage
+
+ENGINES = ('python', 'numpy')
+COLOR_MODES = ('auto', 'always', 'never')
+
+_default_engine = 'python'
+
+CALC_STRATEGIES = StrategyRegistry('calc', 'compute')
+REPORT_STRATEGIES = StrategyRegistry('report', 'generate_report')
+
+
+def set_default_engine(engine: str) -> None:
+    """Sets the calculation engine used by Calculators which are not given one.
 
-RED = '\033[91m'
-BLUE = '\033[34m'
-RESET = '\033[0m'
+        Args:
+            engine (str): Name of the engine, one of ENGINES.
+    """
+
+    global _default_engine
+
+    if engine not in ENGINES:
+        raise ValueError(f'unknown engine {engine!r}, expected one of {ENGINES}')
+    _default_engine = engine
+
+
+def uses_columns(*columns: str) -> Callable[[Callable], Callable]:
+    """Records the weatherfile columns a calc strategy reads.
+
+    Readers only load the recorded columns (and the date column) for a strategy.
+
+        Args:
+            columns (str): Headers of the columns read by the strategy.
+
+        Returns:
+            callable: Decorator which sets the columns attribute of a strategy function.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func.columns = columns
+        return func
+
+    return decorator
+
+
+def renders_with(renderer: Callable[[object], str]) -> Callable[[Callable], Callable]:
+    """Records the function rendering the reports of a report strategy as terminal text.
+
+    Report strategies only build report data. Their renderer turns the ReportGenerator into
+    text, which is only done when reports are shown on a terminal.
+
+        Args:
+            renderer (callable): Function taking a ReportGenerator and returning its text.
+
+        Returns:
+            callable: Decorator which sets the renderer attribute of a strategy function.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        func.renderer = renderer
+        return func
+
+    return decorator
 
 
 class DataReader:
-    """A Class to parse txt files and populate the readings dictionary.
+    """A Class to load the weather readings of a report date from a storage backend.
 
         Attributes:
             files_dir (str): The directory pointing to weatherfiles.
             report_date (str): The date to be queried in the files.
             str_headers (list): List of headers which contain only strings.
+            columns (set): Headers of the columns to load, or None to load every column.
+            backend (Backend): The storage backend readings are loaded from.
+            station (str): The station readings are loaded for, or None for the first station
+                by name with readings for report_date.
 
         Methods:
             get_monthly_readings: Returns weather readings for a month.
             get_yearly_readings: Returns weather readings for a year.
+            aggregate: Returns computations done by the storage, skipping the Calculator.
     """
 
-    def __init__(self, files_dir: str, report_date: str) -> None:
+    def __init__(self, files_dir: str, report_date: str,
+                 index: Optional[WeatherFileIndex] = None,
+                 cache: Optional[ColumnarCache] = None,
+                 columns: Optional[Iterable[str]] = None,
+                 loader: Optional[MonthLoader] = None,
+                 backend: Optional[Backend] = None,
+                 station: Optional[str] = None) -> None:
         """The constructor for DataReader class.
 
             Args:
                 files_dir (str): The directory pointing to weatherfiles.
                 report_date (str): The date to be queried in the files.
+                index (WeatherFileIndex, optional): The index used to look up weatherfiles
+                    when no backend is given. Defaults to the shared index of files_dir.
+                cache (ColumnarCache, optional): The cache holding parsed weatherfiles when no
+                    backend is given. Defaults to None.
+                columns (iterable, optional): Headers of the columns to load. The date
+                    column is always loaded. Defaults to None, which loads every column.
+                loader (MonthLoader, optional): The loader reading the months of a year
+                    concurrently when no backend is given. Defaults to None.
+                backend (Backend, optional): The storage backend readings are loaded from.
+                    Defaults to a TextFileBackend reading files_dir.
+                station (str, optional): The station readings are loaded for. Defaults to
+                    None.
         """
 
-        self.str_headers = ['PKT', 'Events']
+        self.str_headers = list(STR_HEADERS)
         self.files_dir = files_dir
         self.report_date = report_date
+        self.columns = set(columns) if columns is not None else None
+        self.backend = backend if backend is not None else TextFileBackend(
+            files_dir, loader, index, cache)
+        self.station = station
 
-    def _get_files(self, query_date: str) -> list[str]:
-        """Returns names of all the text files in the directory.
-
-            Args:
-                query_date (str): A query date to look for in filenames.
+    def get_monthly_readings(self) -> MonthFrame:
+        """Returns the readings of the month in report_date.
 
             Returns:
-                list: List of all txt filenames containing the query.
+                MonthFrame: The readings of the month.
         """
 
-        files_list = [f'{self.files_dir}/{f}' for f in os.listdir(self.files_dir)
-                      if query_date in f and f.endswith('.txt')]
+        year, month = parse_report_date(self.report_date)
 
-        return files_list
+        return self.backend.load_month(year, month, self.columns, self.station)
 
-    def _get_daily_readings(self, daily_data: dict[str, str]) -> dict[str, Union[str, float]]:
-        """Fills daily values in the readings data structure from csv data.
-
-            Args:
-                daily_data (dict): Dictionary containing daily readings
-                    corresponding to header values.
+    def get_yearly_readings(self) -> list[MonthFrame]:
+        """Returns the readings of every month of the year in report_date.
 
             Returns:
-                dict: Dictionary containing daily readings with correct
-                    data-types.
+                list: List of MonthFrames in calendar order.
         """
 
-        daily_readings = {}
-
-        for header in daily_data:
-            if header not in self.str_headers and daily_data[header] != '':
-                daily_readings[header] = float(daily_data[header])
-            else:
-                daily_readings[header] = daily_data[header]
+        return self.backend.load_year(int(self.report_date), self.columns, self.station)
 
-        return daily_readings
+    def aggregate(self, func: Strategy) -> Optional[dict]:
+        """Returns the computations of a calc strategy done by the storage itself.
 
-    def get_monthly_readings(self, independent: Optional[bool] = True,
-                             monthly_data: Optional[list] = None) \
-            -> dict[int, dict[str, Union[str, float]]]:
-        """Fills monthly values in the readings data structure from csv data.
+        Backends which can compute aggregates, such as databases, answer this so process_args()
+        skips loading readings into a Calculator. Weatherfiles cannot compute anything, so
+        their backends always return None.
 
             Args:
-                independent (bool, optional): Whether the function is being
-                    called independently or from another function within
-                    this class. Defaults to True.
-                monthly_data (list): List containing daily readings
-                    corresponding to header values.
+                func (str or callable): A calc strategy or its name in CALC_STRATEGIES, or None
+                    for the default strategy.
 
             Returns:
-                dict: Dictionary containing monthly readings.
+                dict: The computations of the strategy, or None if they have to be computed
+                    from readings.
         """
 
-        monthly_readings = {}
-
-        if independent:
-            report_date = datetime.strptime(self.report_date, '%Y/%m')
-            report_year = str(report_date.year)
-            report_month = report_date.strftime('%b')
-
-            file_name = self._get_files(f'{report_year}_{report_month}')[0]
-
-            monthly_data = read_csv(file_name)
-
-        for daily_data in monthly_data:
-            day = datetime.strptime(daily_data['PKT'], '%Y-%m-%d').day
-            monthly_readings[day] = self._get_daily_readings(daily_data)
-
-        return monthly_readings
-
-    def get_yearly_readings(self) -> dict[str, dict[int, dict[str, Union[str, float]]]]:
-        """Fills monthly values in the readings data structure from csv data.
-
-            Returns:
-                dict: Dictionary containing monthly readings.
-        """
-
-        yearly_readings = {}
-
-        file_list = self._get_files(self.report_date)
-
-        for file_name in file_list:
-            monthly_data = read_csv(file_name)
-
-            month = datetime.strptime(monthly_data[0]['PKT'], '%Y-%m-%d').strftime('%B')
+        if '/' in self.report_date:
+            year, month = parse_report_date(self.report_date)
+        else:
+            year, month = int(self.report_date), None
 
-            yearly_readings[month] = self.get_monthly_readings(False, monthly_data)
+        strategy = CALC_STRATEGIES.name(func)
+        if strategy is None:
+            return None
 
-        return yearly_readings
+        return self.backend.aggregate(strategy, year, month, self.station)
 
 
 class Calculator:
     """A Class to parse txt files and populate the readings dictionary.
 
         Attributes:
-            readings (str): Dictionary containing weather readings.
-            func (callable): A function to replace the object's compute() function.
-                Defaults to None.
+            readings (MonthFrame or list): Weather readings of a month or of several months.
+            strategy (callable): The calc strategy compute() runs.
+            engine (str): The engine the computations run on, one of ENGINES.
 
         Methods:
-            compute: Computes max temperature, min temperature and max humidity for a date.
+            compute: Computes the calc strategy on the readings.
     """
 
-    def __init__(self,
-                 readings: Union[
-                     dict[str, Union[str, float]],
-                     dict[str, dict[int, dict[str, Union[str, float]]]]
-                 ],
-                 func: Callable[[], dict[str, int]] = None) -> None:
+    def __init__(self, readings: Union[MonthFrame, list[MonthFrame]],
+                 func: Strategy = None,
+                 engine: Optional[str] = None) -> None:
         """The constructor for Calculator class.
 
             Args:
-                readings (dict): Dictionary containing weather readings.
-                func (callable): A function to replace the object's compute function.
-                    Defaults to None.
+                readings (MonthFrame or list): Weather readings of a month or of several
+                    months.
+                func (str or callable, optional): The calc strategy or its name in
+                    CALC_STRATEGIES. Defaults to None, which computes max temperature, min
+                    temperature and max humidity.
+                engine (str, optional): The engine the computations run on. Strategies
+                    without a NumPy version always run on the python engine. Defaults to
+                    the engine set by set_default_engine().
         """
 
         self.readings = readings
-        if func is not None:
-            self.compute = types.MethodType(func, self)
+        self.engine = engine if engine is not None else _default_engine
+
+        if self.engine not in ENGINES:
+            raise ValueError(f'unknown engine {self.engine!r}, expected one of {ENGINES}')
+
+        self.strategy = CALC_STRATEGIES.get(func)
+        if self.engine == 'numpy':
+            self.strategy = _vectorized_strategy(self.strategy) or self.strategy
 
-    def compute(self) -> dict[str, int]:
-        """Computes max temperature, min temperature and max humidity for a date.
+    def compute(self) -> Union[dict[str, int], dict[int, dict[str, int]]]:
+        """Computes the calc strategy on the readings.
 
             Returns:
-                dict: Dictionary containing dates, max temperature, min temperature
-                    and max humidity.
+                dict: Dictionary containing the computations of the strategy.
         """
 
-        computations = {
-            'max_temp': None,
-            'max_date': None,
-            'min_temp': None,
-            'min_date': None,
-            'max_humidity': None,
-            'humidity_date': None,
-        }
+        return self.strategy(self)
+
+
+@CALC_STRATEGIES.register('compute')
+@uses_columns('Max TemperatureC', 'Min TemperatureC', 'Max Humidity')
+def compute_extremes(self) -> dict[str, int]:
+    """Computes max temperature, min temperature and max humidity for a date.
+
+    The default strategy function for the Calculator class.
+
+        Returns:
+            dict: Dictionary containing dates, max temperature, min temperature
+                and max humidity.
+    """
+
+    computations = {
+        'max_temp': None,
+        'max_date': None,
+        'min_temp': None,
+        'min_date': None,
+        'max_humidity': None,
+        'humidity_date': None,
+    }
+
+    max_temps_readings = {}
+    min_temps_readings = {}
+    max_humidity_readings = {}
 
-        max_temps_readings = {}
-        min_temps_readings = {}
-        max_humidity_readings = {}
+    frames = [self.readings] if isinstance(self.readings, MonthFrame) else self.readings
 
-        for month, monthly_readings in self.readings.items():
-            for day, daily_data in monthly_readings.items():
-                if daily_data['Max TemperatureC'] != '':
-                    max_temps_readings[f'{day} {month}'] = int(daily_data['Max TemperatureC'])
-                if daily_data['Min TemperatureC'] != '':
-                    min_temps_readings[f'{day} {month}'] = int(daily_data['Min TemperatureC'])
-                if daily_data['Max Humidity'] != '':
-                    max_humidity_readings[f'{day} {month}'] = int(daily_data['Max Humidity'])
+    for frame in frames:
+        month = frame.month_name
+        for day, value in frame.present('Max TemperatureC'):
+            max_temps_readings[f'{day} {month}'] = int(value)
+        for day, value in frame.present('Min TemperatureC'):
+            min_temps_readings[f'{day} {month}'] = int(value)
+        for day, value in frame.present('Max Humidity'):
+            max_humidity_readings[f'{day} {month}'] = int(value)
 
-        max_temp_date = max(max_temps_readings, key=lambda key: max_temps_readings[key])
-        min_temp_date = min(min_temps_readings, key=lambda key: min_temps_readings[key])
-        max_humidity_date = max(max_humidity_readings, key=lambda key: max_humidity_readings[key])
+    max_temp_date = max(max_temps_readings, key=lambda key: max_temps_readings[key])
+    min_temp_date = min(min_temps_readings, key=lambda key: min_temps_readings[key])
+    max_humidity_date = max(max_humidity_readings, key=lambda key: max_humidity_readings[key])
 
-        computations['max_temp'] = max_temps_readings[max_temp_date]
-        computations['max_date'] = max_temp_date
+    computations['max_temp'] = max_temps_readings[max_temp_date]
+    computations['max_date'] = max_temp_date
 
-        computations['min_temp'] = min_temps_readings[min_temp_date]
-        computations['min_date'] = min_temp_date
+    computations['min_temp'] = min_temps_readings[min_temp_date]
+    computations['min_date'] = min_temp_date
 
-        computations['max_humidity'] = max_humidity_readings[max_humidity_date]
-        computations['humidity_date'] = max_humidity_date
+    computations['max_humidity'] = max_humidity_readings[max_humidity_date]
+    computations['humidity_date'] = max_humidity_date
 
-        return computations
+    return computations
 
 
+@CALC_STRATEGIES.register()
+@uses_columns('Max TemperatureC', 'Min TemperatureC', 'Mean Humidity')
 def compute_monthly_average(self) -> dict[str, int]:
     """Computes averages for max temperature, min temperature and mean humidity for a month.
 
-    A strategy function for the Calculator class which replaces the compute() function in a
-    Calculator object.
+    A strategy function for the Calculator class, registered in CALC_STRATEGIES.
 
         Returns:
             dict: Dictionary containing averages for max temperature, min temperature and mean
@@ -243,16 +327,15 @@ def compute_monthly_average(self) -> dict[str, int]:
     total_mean_humidity = 0
     mean_humidity_count = 0
 
-    for day in self.readings.values():
-        if day['Max TemperatureC'] != '':
-            total_max_temp += day['Max TemperatureC']
-            max_temp_count += 1
-        if day['Min TemperatureC'] != '':
-            total_min_temp += day['Min TemperatureC']
-            min_temp_count += 1
-        if day['Mean Humidity'] != '':
-            total_mean_humidity += day['Mean Humidity']
-            mean_humidity_count += 1
+    for _, value in self.readings.present('Max TemperatureC'):
+        total_max_temp += value
+        max_temp_count += 1
+    for _, value in self.readings.present('Min TemperatureC'):
+        total_min_temp += value
+        min_temp_count += 1
+    for _, value in self.readings.present('Mean Humidity'):
+        total_mean_humidity += value
+        mean_humidity_count += 1
 
     computations['max_temp_avg'] = round(total_max_temp / max_temp_count)
     computations['min_temp_avg'] = round(total_min_temp / min_temp_count)
@@ -261,11 +344,12 @@ def compute_monthly_average(self) -> dict[str, int]:
     return computations
 
 
+@CALC_STRATEGIES.register()
+@uses_columns('Max TemperatureC', 'Min TemperatureC')
 def compute_min_max(self) -> dict[int, dict[str, int]]:
     """Computes minimum and maximum temperature values for each day in a month.
 
-    A strategy function for the Calculator class which replaces the compute() function in a
-    Calculator object.
+    A strategy function for the Calculator class, registered in CALC_STRATEGIES.
 
         Returns:
             dict: Dictionary containing dates and average values of maximum and minimum
@@ -274,11 +358,11 @@ def compute_min_max(self) -> dict[int, dict[str, int]]:
 
     computations = {}
 
-    for day, daily_reading in self.readings.items():
-        max_temp = daily_reading['Max TemperatureC']
-        min_temp = daily_reading['Min TemperatureC']
+    max_temps = self.readings.values('Max TemperatureC')
+    min_temps = self.readings.values('Min TemperatureC')
 
-        if daily_reading['Max TemperatureC'] != '' and daily_reading['Min TemperatureC'] != '':
+    for day, max_temp, min_temp in zip(self.readings.days, max_temps, min_temps):
+        if not math.isnan(max_temp) and not math.isnan(min_temp):
             computations[day] = {
                 'max_temp': int(max_temp),
                 'min_temp': int(min_temp)
@@ -287,71 +371,123 @@ def compute_min_max(self) -> dict[int, dict[str, int]]:
     return computations
 
 
+def _vectorized_strategy(func: Strategy) -> Optional[Callable]:
+    """Returns the NumPy version of a calc strategy, or None if it has none.
+
+        Args:
+            func (str or callable): A calc strategy or its name in CALC_STRATEGIES, or None for
+                the default strategy.
+
+        Returns:
+            callable: The NumPy version of the strategy.
+    """
+
+    from weatherman import vectorized
+
+    return {
+        'compute': vectorized.compute,
+        'compute_monthly_average': vectorized.compute_monthly_average,
+        'compute_min_max': vectorized.compute_min_max,
+    }.get(CALC_STRATEGIES.name(func))
+
+
 class ReportGenerator:
     """A Class to parse txt files and populate the readings dictionary.
 
         Attributes:
             results (dict): Dictionary containing computations.
             report_date (str): Date to generate the report for.
-            func (callable): A function to replace the object's generate_report() function.
-                Defaults to None.
+            strategy (callable): The report strategy generate_report() runs.
 
         Methods:
-            generate_report: Generates and prints report from computations.
+            generate_report: Generates report from computations.
+            render: Renders the report as terminal text.
     """
 
     def __init__(self, results: Union[dict[str, int], dict[str, dict[str, int]]],
-                 report_date: str, func: Callable[[], None] = None) -> None:
+                 report_date: str, func: Strategy = None) -> None:
         """The constructor for ReportGenerator class.
 
             Args:
                 results (dict): Dictionary containing computations.
                 report_date (str): Date to generate the report for.
-                func (callable): A function to replace the object's generate_report() function.
-                    Defaults to None.
+                func (str or callable, optional): The report strategy or its name in
+                    REPORT_STRATEGIES. Defaults to None, which generates the yearly report.
         """
 
         self.results = results
         self.report_date = report_date
-
-        if func is not None:
-            self.generate_report = types.MethodType(func, self)
+        self.strategy = REPORT_STRATEGIES.get(func)
 
     def generate_report(self) -> dict:
-        """Generates and prints report from yearly computations."""
-
-        print(f'Highest: {self.results["max_temp"]}C on {self.results["max_date"]}')
-        print(f'Lowest: {self.results["min_temp"]}C on {self.results["min_date"]}')
-        print(f'Humidity: {self.results["max_humidity"]}% on {self.results["humidity_date"]}')
-
-        return {
-            'date': self.report_date,
-            'highest_temp': {
-                'value': f'{self.results["max_temp"]}C',
-                'date': self.results["max_date"],
-            },
-            'lowest_temp': {
-                'value': f'{self.results["min_temp"]}C',
-                'date': self.results["min_date"],
-            },
-            'max_humidity': {
-                'value': f'{self.results["max_humidity"]}%',
-                'date': self.results["humidity_date"],
-            }
+        """Generates report from computations with the report strategy.
+
+            Returns:
+                dict: The report.
+        """
+
+        return self.strategy(self)
+
+    def render(self) -> str:
+        """Renders the report as terminal text with the renderer of the report strategy.
+
+            Returns:
+                str: The rendered report, empty if the strategy has no renderer.
+        """
+
+        renderer = getattr(self.strategy, 'renderer', None)
+        return renderer(self) if renderer is not None else ''
+
+
+def render_yearly_report(self) -> str:
+    """Renders report from yearly computations."""
+
+    return (f'Highest: {self.results["max_temp"]}C on {self.results["max_date"]}\n'
+            f'Lowest: {self.results["min_temp"]}C on {self.results["min_date"]}\n'
+            f'Humidity: {self.results["max_humidity"]}% on {self.results["humidity_date"]}\n')
+
+
+@REPORT_STRATEGIES.register('generate_report')
+@renders_with(render_yearly_report)
+def generate_yearly_report(self) -> dict:
+    """Generates report from yearly computations.
+
+    The default strategy function for the ReportGenerator class.
+    """
+
+    return {
+        'date': self.report_date,
+        'highest_temp': {
+            'value': f'{self.results["max_temp"]}C',
+            'date': self.results["max_date"],
+        },
+        'lowest_temp': {
+            'value': f'{self.results["min_temp"]}C',
+            'date': self.results["min_date"],
+        },
+        'max_humidity': {
+            'value': f'{self.results["max_humidity"]}%',
+            'date': self.results["humidity_date"],
         }
+    }
+
+
+def render_average_report(self) -> str:
+    """Renders report from monthly average computations."""
 
+    return (f'Highest Average: {self.results["max_temp_avg"]}C\n'
+            f'Lowest Average: {self.results["min_temp_avg"]}C\n'
+            f'Average Mean Humidity: {self.results["mean_humidity_avg"]}%\n')
 
+
+@REPORT_STRATEGIES.register()
+@renders_with(render_average_report)
 def generate_average_report(self) -> dict:
-    """Generates and prints report from monthly average computations.
+    """Generates report from monthly average computations.
 
-    A strategy function for the ReportGenerator class which replaces the generate_report()
-    function in a ReportGenerator object.
+    A strategy function for the ReportGenerator class, registered in REPORT_STRATEGIES.
     """
 
-    print(f'Highest Average: {self.results["max_temp_avg"]}C')
-    print(f'Lowest Average: {self.results["min_temp_avg"]}C')
-    print(f'Average Mean Humidity: {self.results["mean_humidity_avg"]}%')
-
     return {
         'date': self.report_date,
         'highest_avg_temp': f'{self.results["max_temp_avg"]}C',
@@ -360,52 +496,228 @@ def generate_average_report(self) -> dict:
     }
 
 
+def render_multiple_bar_report(self) -> str:
+    """Renders two horizontal bar charts per day with the default BarRenderer."""
+
+    return default_bar_renderer().multiple(self.report_date, self.results)
+
+
+@REPORT_STRATEGIES.register()
+@renders_with(render_multiple_bar_report)
 def generate_multiple_bar_report(self) -> dict:
-    """Generates and prints report containing two horizontal bar charts per day from computations.
+    """Generates report containing two horizontal bar charts per day from computations.
 
-    A strategy function for the ReportGenerator class which replaces the generate_report()
-    function in a ReportGenerator object.
+    A strategy function for the ReportGenerator class, registered in REPORT_STRATEGIES. The
+    charts only exist as rendered text, so the report is empty.
     """
 
-    print(datetime.strptime(self.report_date, '%Y/%m').strftime('%B %Y'))
+    return {}
 
-    for day, readings in self.results.items():
-        print(f'{"%02d" % day} {RED}{"+" * readings["max_temp"]} '
-              f'{RESET}{readings["max_temp"]}C')
 
-        print(f'{"%02d" % day} {BLUE}{"+" * readings["min_temp"]} '
-              f'{RESET}{readings["min_temp"]}C')
+def render_single_bar_report(self) -> str:
+    """Renders one horizontal bar chart per day with the default BarRenderer."""
 
-    return {}
+    return default_bar_renderer().single(self.report_date, self.results)
 
 
+@REPORT_STRATEGIES.register()
+@renders_with(render_single_bar_report)
 def generate_single_bar_report(self) -> dict:
-    """Generates and prints report containing one horizontal bar chart per day from computations.
+    """Generates report containing one horizontal bar chart per day from computations.
 
-    A strategy function for the ReportGenerator class which replaces the generate_report()
-    function in a ReportGenerator object.
+    A strategy function for the ReportGenerator class, registered in REPORT_STRATEGIES. The
+    chart only exists as rendered text, so the report is empty.
     """
 
-    print(datetime.strptime(self.report_date, '%Y/%m').strftime('%B %Y'))
+    return {}
 
-    for day, readings in self.results.items():
-        print(f'{"%02d" % day} {BLUE}{"+" * readings["min_temp"]}{RED}'
-              f'{"+" * readings["max_temp"]} {RESET}'
-              f'{readings["min_temp"]}C - {readings["max_temp"]}C')
 
-    return {}
+@REPORT_STRATEGIES.register()
+def generate_daily_report(self) -> dict:
+    """Generates report containing the max and min temperature of every day from computations.
+
+    A strategy function for the ReportGenerator class, registered in REPORT_STRATEGIES. It has
+    no renderer, as its report is meant for the API.
+    """
+
+    return {
+        'date': self.report_date,
+        'days': [{'day': day, **readings} for day, readings in self.results.items()],
+    }
+
+
+def _fused_strategy(func: Strategy) -> Optional[str]:
+    """Returns the name of a calc strategy in weatherman.fused, or None if it cannot be fused.
+
+        Args:
+            func (str or callable): A calc strategy or its name in CALC_STRATEGIES, or None for
+                the default strategy.
+
+        Returns:
+            str: Name of the strategy in FUSED_STRATEGIES.
+    """
+
+    name = CALC_STRATEGIES.name(func)
+    return name if name in FUSED_STRATEGIES else None
+
+
+def compute_fused_month(path: str, date: str,
+                        calc_strategies: Iterable[Strategy],
+                        backend: Optional[Backend] = None,
+                        station: Optional[str] = None) -> dict[Strategy, dict]:
+    """Computes several calc strategies for one month, loading and scanning its readings once.
+
+        Args:
+            path (str): Path to weatherfiles directory.
+            date (str): Date of the month, e.g. 2011/7.
+            calc_strategies (iterable): Calc strategies or their names in CALC_STRATEGIES, None
+                standing for the default strategy. Only the strategies in weatherman.fused
+                can be fused.
+            backend (Backend, optional): The storage backend readings are loaded from.
+                Defaults to a TextFileBackend reading path.
+            station (str, optional): The station readings are loaded for. Defaults to None.
+
+        Returns:
+            dict: Dictionary mapping every calc strategy to its computations.
+
+        Raises:
+            ValueError: If a strategy cannot be fused.
+    """
+
+    names = {func: _fused_strategy(func) for func in calc_strategies}
+    for func, name in names.items():
+        if name is None:
+            raise ValueError(f'strategy {func!r} cannot be fused')
+
+    columns = set()
+    for name in names.values():
+        columns.update(CALC_STRATEGIES.get(name).columns)
+
+    readings = DataReader(path, date, columns=columns, backend=backend,
+                          station=station).get_monthly_readings()
+    computations = compute_fused(readings, names.values())
+
+    return {func: computations[name] for func, name in names.items()}
+
+
+def _compute(data_reader: DataReader, yearly: bool, strategies: dict[str, Strategy],
+             engine: Optional[str],
+             readings: Optional[Union[MonthFrame, list[MonthFrame]]] = None) -> dict:
+    """Returns the computations for one date, from the storage if it can aggregate them.
+
+    Storage aggregates stand in for the python engine only. Any other engine computes from the
+    readings, so selecting it always runs it.
+    """
+
+    if engine is None:
+        engine = _default_engine
+    if readings is None and engine == 'python':
+        with stage('aggregate'):
+            computations = data_reader.aggregate(strategies['calc_strategy'])
+        if computations is not None:
+            return computations
+
+    if readings is None:
+        with stage('load'):
+            if yearly:
+                readings = data_reader.get_yearly_readings()
+            else:
+                readings = data_reader.get_monthly_readings()
+
+    with stage('compute'):
+        calculator = Calculator(readings, strategies['calc_strategy'], engine)
+        return calculator.compute()
+
+
+def _generate(computations: dict, date: str, strategies: dict[str, Strategy]) -> dict:
+    """Generates the report for the computations of one date."""
+
+    report_generator = ReportGenerator(computations, date, strategies['report_strategy'])
+    return report_generator.generate_report()
+
+
+def _render(computations: dict, date: str, strategies: dict[str, Strategy]) -> str:
+    """Renders the report for the computations of one date as terminal text."""
+
+    report_generator = ReportGenerator(computations, date, strategies['report_strategy'])
+    return report_generator.render()
+
+
+def _report_key(backend: Backend, date: str, yearly: bool,
+                strategies: dict[str, Strategy]) -> tuple:
+    """Returns the key of the report for one date in a ReportCache."""
+
+    if yearly:
+        year, month = int(date), None
+    else:
+        year, month = parse_report_date(date)
+
+    # Registered strategies are keyed by name, so reports outlive reloads of their module
+    calc_strategy, report_strategy = strategies['calc_strategy'], strategies['report_strategy']
+    return (CALC_STRATEGIES.name(calc_strategy) or calc_strategy,
+            REPORT_STRATEGIES.name(report_strategy) or report_strategy, yearly, date,
+            backend.fingerprint(year, month))
+
+
+def _run_date(data_reader: DataReader, date: str, yearly: bool,
+              strategies: dict[str, Strategy], engine: Optional[str],
+              readings: Optional[Union[MonthFrame, list[MonthFrame]]] = None,
+              report_cache: Optional[ReportCache] = None,
+              key: Optional[tuple] = None,
+              computations: Optional[dict] = None) -> tuple[dict, dict]:
+    """Generates the report for one date, returning its computations along with it.
+
+    The computations are kept so the report can be rendered later, or never, without computing
+    it again. The result is added to the report cache, if there is one, before it is returned,
+    so callers coalesced on it and callers arriving right after it find it cached. Given
+    computations are reported without loading any readings.
+    """
+
+    if computations is None:
+        computations = _compute(data_reader, yearly, strategies, engine, readings)
+
+    with stage('generate'):
+        result = computations, _generate(computations, date, strategies)
+    if report_cache is not None:
+        report_cache.put(key, result)
+
+    return result
+
+
+def _process_date(date: str, path: str, backend: Backend,
+                  strategy_names: dict[str, Optional[str]], yearly: bool,
+                  engine: str) -> tuple[dict, dict]:
+    """Generates the report for one date in a worker process.
+
+        Args:
+            date (str): Date entered by user.
+            path (str): Path to weatherfiles directory.
+            backend (Backend): The storage backend readings are loaded from.
+            strategy_names (dict): Dictionary containing names of strategies in
+                CALC_STRATEGIES and REPORT_STRATEGIES for computations and report.
+            yearly (bool): Flag to specify whether the report is for monthly or yearly data.
+            engine (str): The engine computations run on.
+
+        Returns:
+            tuple: The computations and the report.
+    """
+
+    columns = getattr(CALC_STRATEGIES.get(strategy_names['calc_strategy']), 'columns', None)
+    data_reader = DataReader(path, date, columns=columns, backend=backend)
+
+    return _run_date(data_reader, date, yearly, strategy_names, engine)
 
 
 def process_args(dates: list[str], report_num: int, path: str,
-                 strategies: Union[
-                     dict[str, None],
-                     dict[str, Union[
-                         Callable[[], dict[str, int]],
-                         Callable[[], dict[int, dict[str, int]]],
-                         Callable[[], None]]
-                     ]
-                 ],
-                 yearly: bool = False) -> list:
+                 strategies: dict[str, Strategy],
+                 yearly: bool = False, cache_dir: Optional[str] = None,
+                 engine: Optional[str] = None, loader: Optional[MonthLoader] = None,
+                 pool: Optional[Executor] = None,
+                 backend: Optional[Backend] = None,
+                 report_cache: Optional[ReportCache] = None,
+                 single_flight: Optional[SingleFlight] = None,
+                 computations: Optional[dict[str, dict]] = None,
+                 quiet: bool = False, out: Optional[TextIO] = None) -> list:
     """Calls methods and creates objects corresponding to arguments passed by user
 
         Args:
@@ -413,33 +725,157 @@ def process_args(dates: list[str], report_num: int, path: str,
             report_num (int): Current report number being generated.
             path (str): Path to weatherfiles directory.
             strategies (dict): Dictionary containing strategy functions for computations
-                and report.
+                and report, or their names in CALC_STRATEGIES and REPORT_STRATEGIES.
             yearly (bool): Flag to specify whether the report is for monthly or yearly data.
+            cache_dir (str, optional): Directory of the columnar cache for parsed weatherfiles,
+                used when no backend is given. Defaults to None, which parses every
+                weatherfile on each read.
+            engine (str, optional): The engine computations run on, one of ENGINES. Only the
+                python engine answers from storage aggregates, such as monthly summaries,
+                other engines compute from the readings. Defaults to the engine set by
+                set_default_engine().
+            loader (MonthLoader, optional): The loader reading weatherfiles concurrently when
+                no backend is given. For yearly reports the files of all dates are loaded in a
+                single fan-out. Defaults to None, which reads files one after another.
+            pool (Executor, optional): A worker pool the dates are distributed over. Strategies
+                are shipped to the workers by their registered name, and reports are
+                returned in the order of dates. Defaults to None, which processes dates one
+                after another.
+            backend (Backend, optional): The storage backend readings are loaded from.
+                Defaults to the files backend, or the columnar backend if cache_dir is given.
+            report_cache (ReportCache, optional): The cache reports are kept in across calls.
+                Reports are keyed by their strategy names, their date and the fingerprint of the
+                stored readings of the date. Defaults to None, which generates every report.
+            single_flight (SingleFlight, optional): The single flight identical reports
+                generated concurrently by several callers are coalesced in, keyed like the
+                report cache. Dates distributed over a pool are not coalesced. Defaults to
+                None.
+            computations (dict, optional): Computations of the calc strategy by date, such as
+                those of compute_fused_month(). Dates found in it are reported without loading
+                their readings. Defaults to None.
+            quiet (bool, optional): Whether to only generate the reports, without rendering
+                them. Defaults to False.
+            out (file, optional): The stream rendered reports are written to. Defaults to
+                None, which writes to sys.stdout.
 
         Returns:
             list: List of reports.
     """
 
-    reports = []
-    for date in dates:
-        print(f'\nReport # {report_num}')
-        data_reader = DataReader(path, date)
-        if yearly:
-            readings = data_reader.get_yearly_readings()
-        else:
-            readings = data_reader.get_monthly_readings()
-
-        calculator = Calculator(readings, strategies['calc_strategy'])
-        computations = calculator.compute()
+    if backend is None:
+        backend = create_backend('columnar' if cache_dir is not None else 'files', path,
+                                 cache_dir=cache_dir, loader=loader)
+
+    keys = [None] * len(dates)
+    results = {}
+    if report_cache is not None or single_flight is not None:
+        for position, date in enumerate(dates):
+            with stage('fingerprint'):
+                keys[position] = _report_key(backend, date, yearly, strategies)
+            cached = report_cache.get(keys[position]) if report_cache is not None else None
+            if cached is not None:
+                results[position] = cached
+
+    if computations is not None:
+        for position, date in enumerate(dates):
+            if position not in results and date in computations:
+                results[position] = _run_date(None, date, yearly, strategies, engine,
+                                              report_cache=report_cache, key=keys[position],
+                                              computations=computations[date])
+
+    pending = [position for position in range(len(dates)) if position not in results]
+
+    if pool is not None and len(pending) > 1:
+        strategy_names = {
+            'calc_strategy': CALC_STRATEGIES.name(strategies['calc_strategy']),
+            'report_strategy': REPORT_STRATEGIES.name(strategies['report_strategy']),
+        }
+        if None in strategy_names.values():
+            raise ValueError('strategies distributed over a pool have to be registered')
+        # Stages run in worker processes are not timed one by one
+        with stage('pool'):
+            results.update(zip(pending, pool.map(
+                _process_date, [dates[position] for position in pending], repeat(path),
+                repeat(backend), repeat(strategy_names), repeat(yearly),
+                repeat(engine if engine is not None else _default_engine))))
+
+        if report_cache is not None:
+            for position in pending:
+                report_cache.put(keys[position], results[position])
+    else:
+        columns = getattr(CALC_STRATEGIES.get(strategies['calc_strategy']), 'columns', None)
+        data_readers = {position: DataReader(path, dates[position], columns=columns,
+                                             backend=backend)
+                        for position in pending}
+
+        calc_name = CALC_STRATEGIES.name(strategies['calc_strategy'])
+
+        # Coalesced dates load their own readings, so a waiting date loads nothing
+        prefetched = None
+        if yearly and pending and calc_name not in backend.aggregates and single_flight is None:
+            with stage('load'):
+                prefetched = dict(zip(pending, backend.load_years(
+                    [int(dates[position]) for position in pending], columns)))
+
+        for position in pending:
+            readings = prefetched[position] if prefetched is not None else None
+            generate = functools.partial(_run_date, data_readers[position], dates[position],
+                                         yearly, strategies, engine, readings, report_cache,
+                                         keys[position])
+
+            if single_flight is not None:
+                results[position] = single_flight.do(keys[position], generate)
+            else:
+                results[position] = generate()
 
-        report_generator = ReportGenerator(computations, date, strategies['report_strategy'])
-        reports.append(report_generator.generate_report())
+    reports = [results[position][1] for position in range(len(dates))]
+    if quiet:
+        return reports
 
-        report_num += 1
+    if out is None:
+        out = sys.stdout
+    with stage('render'):
+        for position, date in enumerate(dates):
+            out.write(f'\nReport # {report_num + position}\n')
+            out.write(_render(results[position][0], date, strategies))
 
     return reports
 
 
+def _fuse_months(path: str,
+                 monthly_flags: Iterable[tuple[Optional[list[str]], Callable, Callable]],
+                 backend: Backend) -> dict[str, dict[Callable, dict]]:
+    """Computes the calc strategies of months requested by several flags in one pass each.
+
+    Months whose readings cannot be loaded are left out, so process_args() reports the error
+    when it reaches them.
+
+        Args:
+            path (str): Path to weatherfiles directory.
+            monthly_flags (iterable): Dates of every monthly flag with its calc and report
+                strategies.
+            backend (Backend): The storage backend readings are loaded from.
+
+        Returns:
+            dict: Dictionary mapping dates to the computations of their calc strategies.
+    """
+
+    requested = {}
+    for dates, calc_strategy, _ in monthly_flags:
+        for date in dict.fromkeys(dates or ()):
+            requested.setdefault(date, []).append(calc_strategy)
+
+    fused = {}
+    for date, calc_strategies in requested.items():
+        if len(calc_strategies) > 1:
+            try:
+                fused[date] = compute_fused_month(path, date, calc_strategies, backend)
+            except (FileNotFoundError, ValueError, ZeroDivisionError):
+                continue
+
+    return fused
+
+
 def main():
     """Main function.
 
@@ -453,46 +889,93 @@ def main():
     parser.add_argument('-c', help='monthly multiple bar chart report', nargs="+")
     parser.add_argument('-b', help='monthly single bar chart report', nargs="+")
     parser.add_argument('path', help='weatherfiles directory')
+    parser.add_argument('--backend', help='storage backend readings are loaded from',
+                        choices=BACKENDS)
+    parser.add_argument('--cache-dir', help='directory for the parsed weatherfiles cache')
+    parser.add_argument('--sqlite-path', help='database file of the sqlite backend')
+    parser.add_argument('--engine', help='calculation engine, only python answers from '
+                        'stored summaries', choices=ENGINES,
+                        default='python')
+    parser.add_argument('--workers', help='number of weatherfiles loaded concurrently',
+                        type=int, default=1)
+    parser.add_argument('--executor', help='pool used to load weatherfiles', choices=EXECUTORS,
+                        default='thread')
+    parser.add_argument('--processes', help='number of worker processes reports are spread over',
+                        type=int, default=1)
+    parser.add_argument('--report-cache-size', help='number of reports kept for repeated dates',
+                        type=int, default=128)
+    parser.add_argument('--width', help='highest number of characters per bar chart line, '
+                        'defaults to the terminal width', type=int)
+    parser.add_argument('--color', help='when to color bar charts', choices=COLOR_MODES,
+                        default='auto')
+    parser.add_argument('--timings', help='write the time spent in every stage to stderr',
+                        action='store_true')
 
     args = parser.parse_args()
+    if args.engine == 'numpy' and importlib.util.find_spec('numpy') is None:
+        parser.error('the numpy engine needs numpy, install it with: pip install numpy')
+
+    set_default_engine(args.engine)
+    timing.set_enabled(args.timings)
+    loader = MonthLoader(args.workers, args.executor) if args.workers > 1 else None
+    pool = ProcessPoolExecutor(args.processes) if args.processes > 1 else None
+    backend = create_backend(args.backend or ('columnar' if args.cache_dir else 'files'),
+                             args.path, args.cache_dir, args.sqlite_path, loader)
+    report_cache = ReportCache(args.report_cache_size) if args.report_cache_size > 0 else None
+
+    terminal = sys.stdout.isatty()
+    width = args.width
+    if width is None and terminal:
+        width = shutil.get_terminal_size().columns
+    set_default_bar_renderer(BarRenderer(
+        width, args.color == 'always' or (args.color == 'auto' and terminal)))
 
     report_num = 1
 
-    if args.e:
-        strategy = {
-            'calc_strategy': None,
-            'report_strategy': None
-        }
-        report_num = process_args(
-            args.e, report_num, args.path,
-            strategy, yearly=True)
-
-    if args.a:
-        strategy = {
-            'calc_strategy': compute_monthly_average,
-            'report_strategy': generate_average_report
-        }
-        report_num = process_args(
-            args.a, report_num, args.path,
-            strategy)
-
-    if args.c:
-        strategy = {
-            'calc_strategy': compute_min_max,
-            'report_strategy': generate_multiple_bar_report
-        }
-        report_num = process_args(
-            args.c, report_num, args.path,
-            strategy)
-
-    if args.b:
-        strategy = {
-            'calc_strategy': compute_min_max,
-            'report_strategy': generate_single_bar_report
-        }
-        report_num = process_args(
-            args.b, report_num, args.path,
-            strategy)
+    # Reports are rendered into one buffer, which is written out in large chunks
+    out = ChunkedWriter(sys.stdout)
+    try:
+        if args.e:
+            strategy = {
+                'calc_strategy': None,
+                'report_strategy': None
+            }
+            report_num += len(process_args(
+                args.e, report_num, args.path,
+                strategy, yearly=True, pool=pool, backend=backend,
+                report_cache=report_cache, out=out))
+
+        monthly_flags = ((args.a, compute_monthly_average, generate_average_report),
+                         (args.c, compute_min_max, generate_multiple_bar_report),
+                         (args.b, compute_min_max, generate_single_bar_report))
+        fused = _fuse_months(args.path, monthly_flags, backend)
+
+        for dates, calc_strategy, report_strategy in monthly_flags:
+            if not dates:
+                continue
+            strategy = {
+                'calc_strategy': calc_strategy,
+                'report_strategy': report_strategy
+            }
+            report_num += len(process_args(
+                dates, report_num, args.path,
+                strategy, pool=pool, backend=backend, report_cache=report_cache,
+                computations={date: fused[date][calc_strategy]
+                              for date in dates if date in fused},
+                out=out))
+    finally:
+        out.close()
+
+    if args.timings:
+        for name, histogram in timing.histograms().items():
+            sys.stderr.write(f'{name}: {histogram["sum"] * 1000:.3f} ms '
+                             f'in {histogram["count"]} calls\n')
+
+    backend.close()
+    if loader is not None:
+        loader.close()
+    if pool is not None:
+        pool.shutdown()
 
 
 if __name__ == '__main__':
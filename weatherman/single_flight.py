@@ -0,0 +1,99 @@
+"""Single Flight
+
+This module coalesces identical concurrent computations. The first caller of a key runs the
+computation, and every caller arriving while it is in flight waits for it and gets a copy of its
+result, instead of reading and parsing the same weatherfiles again. Like ReportCache, callers
+never share the result itself, so none can change what another one gets.
+
+"""
+
+import copy
+import threading
+from typing import Any, Callable, Hashable
+
+
+class _Call:
+    """A computation in flight and its outcome."""
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """A Class to share the result of a computation among concurrent callers of the same key.
+
+        Methods:
+            do: Runs a computation, or waits for the identical one in flight.
+            stats: Returns the counters of the single flight.
+    """
+
+    def __init__(self) -> None:
+        """The constructor for SingleFlight class."""
+
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """Runs a computation, or waits for the identical one in flight and copies its result.
+
+            Args:
+                key (hashable): Key identifying the computation.
+                func (callable): Function running the computation.
+
+            Returns:
+                The result of the computation, or a copy of it for callers which waited.
+
+            Raises:
+                Exception: Whatever the computation raised, re-raised in every caller.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._executions += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            result = func()
+            # Kept apart from the leader's result, which the leader may change while callers copy
+            call.result = copy.deepcopy(result)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return result
+
+    def stats(self) -> dict[str, int]:
+        """Returns the counters of the single flight.
+
+            Returns:
+                dict: Dictionary containing the number of computations run, the number of
+                    callers which shared an in-flight computation, and the number of
+                    computations in flight.
+        """
+
+        with self._lock:
+            return {
+                'executions': self._executions,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls),
+            }
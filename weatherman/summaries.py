@@ -0,0 +1,212 @@
+"""Monthly Summaries
+
+This module holds per-month summaries of weather readings. A summary keeps, for every numeric
+column of a month, the number of readings, their total and the extreme readings with their days.
+Summaries are materialized when a weatherfile is ingested, so yearly extremes and monthly
+averages are answered by combining at most 12 summaries instead of scanning every daily reading.
+
+Extremes are compared on the readings and ties go to the earliest day, so combined results
+match the Calculator for whole number readings, which is what weatherfiles hold.
+
+Attributes:
+    SUMMARY_HEADERS (tuple): Headers of the columns yearly_extremes() and monthly_averages()
+        combine.
+
+"""
+
+from typing import Optional
+
+from weatherman.frames import MONTH_NAMES, MonthFrame
+from weatherman.helper import STR_HEADERS, Column
+
+SUMMARY_HEADERS = ('Max TemperatureC', 'Min TemperatureC', 'Max Humidity', 'Mean Humidity')
+
+
+class ColumnSummary:
+    """A Class to hold the summary of one column of a month.
+
+        Attributes:
+            count (int): Number of readings which are not missing.
+            total (float): Sum of the readings.
+            max (float): Highest reading, or None if every reading is missing.
+            max_day (int): Earliest day of the highest reading, or None.
+            min (float): Lowest reading, or None if every reading is missing.
+            min_day (int): Earliest day of the lowest reading, or None.
+    """
+
+    __slots__ = ('count', 'total', 'max', 'max_day', 'min', 'min_day')
+
+    def __init__(self, count: int = 0, total: float = 0, max: Optional[float] = None,
+                 max_day: Optional[int] = None, min: Optional[float] = None,
+                 min_day: Optional[int] = None) -> None:
+        self.count = count
+        self.total = total
+        self.max = max
+        self.max_day = max_day
+        self.min = min
+        self.min_day = min_day
+
+    def add(self, day: int, value: float) -> None:
+        """Adds a reading to the summary. Readings have to be added in day order."""
+
+        self.count += 1
+        self.total += value
+        if self.max is None or value > self.max:
+            self.max, self.max_day = value, day
+        if self.min is None or value < self.min:
+            self.min, self.min_day = value, day
+
+    def as_list(self) -> list:
+        """Returns the summary as a list, in the order of its attributes."""
+
+        return [self.count, self.total, self.max, self.max_day, self.min, self.min_day]
+
+
+class MonthSummary:
+    """A Class to hold the summaries of every numeric column of a month.
+
+        Attributes:
+            year (int): Year of the readings.
+            month (int): Month number of the readings.
+            columns (dict): Dictionary mapping headers to ColumnSummaries.
+
+        Methods:
+            from_frame: Summarizes the readings of a MonthFrame.
+            from_dict: Builds a MonthSummary from the output of as_dict().
+            as_dict: Returns the summary as a JSON serializable dictionary.
+    """
+
+    __slots__ = ('year', 'month', 'columns')
+
+    def __init__(self, year: int, month: int, columns: dict[str, ColumnSummary]) -> None:
+        self.year = year
+        self.month = month
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, frame: MonthFrame) -> 'MonthSummary':
+        """Summarizes the readings of a MonthFrame.
+
+            Args:
+                frame (MonthFrame): The readings of a month.
+
+            Returns:
+                MonthSummary: The summaries of every numeric column of the frame.
+        """
+
+        columns = {}
+        for header in frame.columns:
+            if header in STR_HEADERS:
+                continue
+            summary = columns[header] = ColumnSummary()
+            for day, value in frame.present(header):
+                summary.add(day, value)
+
+        return cls(frame.year, frame.month, columns)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'MonthSummary':
+        """Builds a MonthSummary from the output of as_dict().
+
+            Args:
+                data (dict): A summary as returned by as_dict().
+
+            Returns:
+                MonthSummary: The summary.
+        """
+
+        columns = {header: ColumnSummary(*values) for header, values in data['columns'].items()}
+        return cls(data['year'], data['month'], columns)
+
+    def as_dict(self) -> dict:
+        """Returns the summary as a JSON serializable dictionary."""
+
+        return {
+            'year': self.year,
+            'month': self.month,
+            'columns': {header: summary.as_list() for header, summary in self.columns.items()},
+        }
+
+
+def summarize_columns(n_rows: int, columns: dict[str, Column]) -> MonthSummary:
+    """Summarizes parsed weatherfile columns.
+
+        Args:
+            n_rows (int): Number of readings.
+            columns (dict): Dictionary mapping headers to column values, as returned by
+                parse_columns(). Must contain the PKT column.
+
+        Returns:
+            MonthSummary: The summaries of every numeric column.
+    """
+
+    return MonthSummary.from_frame(MonthFrame.from_columns(n_rows, columns))
+
+
+def _extreme(summaries: list[MonthSummary], header: str, highest: bool) -> tuple[int, str]:
+    """Returns the truncated extreme of a column over several months and its earliest date."""
+
+    best = None
+    for summary in summaries:
+        column = summary.columns.get(header)
+        if column is None or column.count == 0:
+            continue
+        value, day = (column.max, column.max_day) if highest else (column.min, column.min_day)
+        if best is None or (int(value) > best[0] if highest else int(value) < best[0]):
+            best = int(value), f'{day} {MONTH_NAMES[summary.month]}'
+
+    if best is None:
+        raise ValueError(f'no {header} readings to compute an extreme from')
+
+    return best
+
+
+def yearly_extremes(summaries: list[MonthSummary]) -> dict[str, int]:
+    """Computes max temperature, min temperature and max humidity from monthly summaries.
+
+    Returns the same computations as Calculator.compute() on the readings of the months.
+
+        Args:
+            summaries (list): Summaries of the months, in calendar order.
+
+        Returns:
+            dict: Dictionary containing dates, max temperature, min temperature
+                and max humidity.
+    """
+
+    max_temp, max_date = _extreme(summaries, 'Max TemperatureC', True)
+    min_temp, min_date = _extreme(summaries, 'Min TemperatureC', False)
+    max_humidity, humidity_date = _extreme(summaries, 'Max Humidity', True)
+
+    return {
+        'max_temp': max_temp,
+        'max_date': max_date,
+        'min_temp': min_temp,
+        'min_date': min_date,
+        'max_humidity': max_humidity,
+        'humidity_date': humidity_date,
+    }
+
+
+def monthly_averages(summaries: list[MonthSummary]) -> dict[str, int]:
+    """Computes averages for max temperature, min temperature and mean humidity from summaries.
+
+    Returns the same computations as compute_monthly_average() for a single month.
+
+        Args:
+            summaries (list): Summaries of the months to average over.
+
+        Returns:
+            dict: Dictionary containing averages for max temperature, min temperature and mean
+                humidity.
+    """
+
+    averages = {}
+    for key, header in (('max_temp_avg', 'Max TemperatureC'),
+                        ('min_temp_avg', 'Min TemperatureC'),
+                        ('mean_humidity_avg', 'Mean Humidity')):
+        columns = [summary.columns[header] for summary in summaries]
+        averages[key] = round(sum(column.total for column in columns)
+                              / sum(column.count for column in columns))
+
+    return averages
@@ -0,0 +1,224 @@
+"""Synthetic Weatherfiles
+
+This module writes realistic weatherfiles for benchmarks and load tests, in the exact layout
+read_csv() and the other readers expect: one ``<Station>_weather_<YYYY>_<Mon>.txt`` file per
+station and month, a header whose first column is named after the timezone of the month and
+whose other columns keep their stray leading spaces, one row per day, blank values for missing
+readings and an Events column.
+
+Every station gets its own climate, and readings follow the seasons with day to day noise.
+Generation is deterministic: the same seed, station, year and month always give the same
+file, so a dataset can be generated in parts, or again on another machine.
+
+Usage:
+    python -m weatherman.synth weatherfiles --stations 500 --start 1925 --end 2024
+
+Attributes:
+    HEADERS (tuple): Headers of the columns following the date, as they appear in weatherfiles.
+    EVENTS (tuple): Values of the Events column on days with rain, fog or thunderstorms.
+
+"""
+
+import argparse
+import calendar
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Iterable, Iterator
+
+HEADERS = (
+    'Max TemperatureC', 'Mean TemperatureC', 'Min TemperatureC', 'Dew PointC', 'MeanDew PointC',
+    'Min DewpointC', 'Max Humidity', ' Mean Humidity', ' Min Humidity',
+    ' Max Sea Level PressurehPa', ' Mean Sea Level PressurehPa', ' Min Sea Level PressurehPa',
+    ' Max VisibilityKm', ' Mean VisibilityKm', ' Min VisibilitykM', ' Max Wind SpeedKm/h',
+    ' Mean Wind SpeedKm/h', ' Max Gust SpeedKm/h', 'Precipitationmm', ' CloudCover', ' Events',
+    'WindDirDegrees',
+)
+
+EVENTS = ('Rain', 'Fog', 'Thunderstorm', 'Rain-Thunderstorm', 'Fog-Rain', 'Snow')
+
+
+def station_names(count: int) -> list[str]:
+    """Returns the names of generated stations, e.g. Station0001.
+
+        Args:
+            count (int): Number of stations.
+
+        Returns:
+            list: Names of the stations.
+    """
+
+    return [f'Station{number:04d}' for number in range(1, count + 1)]
+
+
+def file_name(station: str, year: int, month: int) -> str:
+    """Returns the name of the weatherfile of a station and month."""
+
+    return f'{station}_weather_{year}_{calendar.month_abbr[month]}.txt'
+
+
+def month_rows(station: str, year: int, month: int, missing: float = 0.0,
+               seed: int = 0) -> Iterator[str]:
+    """Generates the lines of the weatherfile of a station and month, header first.
+
+        Args:
+            station (str): Name of the station, which picks its climate.
+            year (int): The year.
+            month (int): The month number.
+            missing (float, optional): Ratio of readings left blank. Defaults to 0.
+            seed (int, optional): Seed of the dataset. Defaults to 0.
+
+        Yields:
+            str: Lines of the weatherfile, without line breaks.
+    """
+
+    climate = random.Random(f'{seed}:{station}')
+    mean_temp = climate.uniform(5, 30)
+    amplitude = climate.uniform(4, 15)
+    humidity = climate.uniform(25, 80)
+    pressure = climate.uniform(1002, 1018)
+    wetness = climate.uniform(0.02, 0.3)
+
+    rng = random.Random(f'{seed}:{station}:{year}:{month}')
+    uniform, gauss = rng.uniform, rng.gauss
+
+    # The date column is named after the timezone in effect, PKST in summer
+    yield ','.join(('PKST' if 4 <= month <= 10 else 'PKT',) + HEADERS)
+
+    first_day = date(year, month, 1).timetuple().tm_yday
+    for day in range(1, calendar.monthrange(year, month)[1] + 1):
+        season = -math.cos(2 * math.pi * (first_day + day - 16) / 365)
+
+        mean_t = mean_temp + amplitude * season + gauss(0, 3)
+        spread = uniform(4, 12)
+        mean_h = min(max(humidity - 10 * season + gauss(0, 12), 5), 100)
+        dew = mean_t - (100 - mean_h) / 5
+        mean_p = pressure - 4 * season + gauss(0, 3)
+        mean_w = uniform(0, 20)
+        rain = rng.random() < wetness * mean_h / 50
+        fog = mean_h > 85 and rng.random() < 0.5
+        min_visibility = uniform(0.1, 2) if fog else uniform(2, 8)
+
+        if rain and fog:
+            events = 'Fog-Rain'
+        elif rain:
+            events = ('Snow' if mean_t < 0 else
+                      'Rain-Thunderstorm' if rng.random() < 0.2 else 'Rain')
+        elif fog:
+            events = 'Fog'
+        else:
+            events = 'Thunderstorm' if rng.random() < 0.01 else ''
+
+        values = (
+            round(mean_t + spread / 2), round(mean_t), round(mean_t - spread / 2),
+            round(dew + uniform(0, 3)), round(dew), round(dew - uniform(0, 3)),
+            round(min(mean_h + uniform(5, 20), 100)), round(mean_h),
+            round(max(mean_h - uniform(5, 25), 1)),
+            round(mean_p + uniform(1, 5)), round(mean_p), round(mean_p - uniform(1, 5)),
+            10, round(uniform(min_visibility, 10)), round(min_visibility),
+            round(mean_w + uniform(3, 15)), round(mean_w), round(mean_w + uniform(15, 35)),
+            f'{uniform(0.1, 40):.2f}' if rain else '0.00', rng.randint(0, 8), events,
+            rng.randint(0, 359),
+        )
+
+        fields = [f'{year}-{month}-{day}']
+        for value in values:
+            fields.append('' if missing and rng.random() < missing else str(value))
+        yield ','.join(fields)
+
+
+def write_month(files_dir: str, station: str, year: int, month: int, missing: float = 0.0,
+                seed: int = 0) -> str:
+    """Writes the weatherfile of a station and month.
+
+        Args:
+            files_dir (str): The directory the weatherfile is written to.
+            station (str): Name of the station.
+            year (int): The year.
+            month (int): The month number.
+            missing (float, optional): Ratio of readings left blank. Defaults to 0.
+            seed (int, optional): Seed of the dataset. Defaults to 0.
+
+        Returns:
+            str: The path of the weatherfile.
+    """
+
+    path = os.path.join(files_dir, file_name(station, year, month))
+    with open(path, 'w') as weather_file:
+        weather_file.write('\n'.join(month_rows(station, year, month, missing, seed)) + '\n')
+    return path
+
+
+def _write_year(task: tuple[str, str, int, float, int]) -> int:
+    """Writes the twelve weatherfiles of a station and year, returning how many it wrote."""
+
+    files_dir, station, year, missing, seed = task
+    for month in range(1, 13):
+        write_month(files_dir, station, year, month, missing, seed)
+    return 12
+
+
+def generate(files_dir: str, stations: Iterable[str], years: Iterable[int],
+             missing: float = 0.0, seed: int = 0, processes: int = 1) -> int:
+    """Writes the weatherfiles of every month of some stations and years.
+
+        Args:
+            files_dir (str): The directory weatherfiles are written to. It is created if it
+                does not exist.
+            stations (iterable): Names of the stations.
+            years (iterable): The years.
+            missing (float, optional): Ratio of readings left blank. Defaults to 0.
+            seed (int, optional): Seed of the dataset. Defaults to 0.
+            processes (int, optional): Number of processes writing weatherfiles. Defaults to
+                1, which writes them in this process.
+
+        Returns:
+            int: Number of weatherfiles written.
+
+        Raises:
+            ValueError: If the missing ratio is not between 0 and 1.
+    """
+
+    if not 0 <= missing <= 1:
+        raise ValueError(f'missing must be between 0 and 1, got {missing}')
+
+    os.makedirs(files_dir, exist_ok=True)
+    tasks = [(files_dir, station, year, missing, seed) for station in stations for year in years]
+
+    if processes <= 1:
+        return sum(map(_write_year, tasks))
+
+    with ProcessPoolExecutor(processes) as executor:
+        return sum(executor.map(_write_year, tasks, chunksize=16))
+
+
+def main() -> None:
+    """Main function.
+
+    Parses arguments from commandline and writes the weatherfiles they describe.
+    """
+    parser = argparse.ArgumentParser(description='write synthetic weatherfiles')
+    parser.add_argument('path', help='directory weatherfiles are written to')
+    parser.add_argument('--stations', help='number of generated stations', type=int, default=1)
+    parser.add_argument('--names', help='names of the stations, instead of generated ones',
+                        nargs='+')
+    parser.add_argument('--start', help='first year', type=int, default=2000)
+    parser.add_argument('--end', help='last year, defaults to the first year', type=int)
+    parser.add_argument('--missing', help='ratio of readings left blank', type=float,
+                        default=0.02)
+    parser.add_argument('--seed', help='seed of the dataset', type=int, default=0)
+    parser.add_argument('--processes', help='number of processes writing weatherfiles',
+                        type=int, default=1)
+
+    args = parser.parse_args()
+
+    stations = args.names or station_names(args.stations)
+    years = range(args.start, (args.end if args.end is not None else args.start) + 1)
+    written = generate(args.path, stations, years, args.missing, args.seed, args.processes)
+    print(f'wrote {written} weatherfiles to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
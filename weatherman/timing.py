@@ -0,0 +1,182 @@
+"""Stage Timing
+
+This module times the stages a report goes through, such as looking up weatherfiles, parsing
+them, computing and rendering, to tell where the time of a slow request went.
+
+Every timed stage is added to a latency histogram of its name. Within collect(), stages are also
+added up per name for the caller, for example to send them in a Server-Timing header. Stages
+nest, so a stage's time includes the time of the stages timed within it. Every finished stage is
+also emitted as a STAGE_TIMED event, for applications exporting latencies elsewhere.
+
+Timing is off by default. While it is off, stage() returns a shared no-op context manager, so
+timed code pays for one function call per stage.
+
+Attributes:
+    BUCKETS (tuple): Upper bounds in seconds of the histogram buckets.
+
+"""
+
+import contextlib
+import threading
+import time
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+from weatherman.events import STAGE_TIMED, emit
+
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+           10.0, float('inf'))
+
+_enabled = False
+_NULL_STAGE = contextlib.nullcontext()
+
+_timings: ContextVar[Optional[dict[str, float]]] = ContextVar('stage_timings', default=None)
+
+
+class StageHistogram:
+    """A Class to aggregate the latencies of a stage into buckets.
+
+        Attributes:
+            counts (list): Number of latencies in every bucket of BUCKETS, not cumulative.
+            count (int): Number of latencies observed.
+            total (float): Sum of the latencies observed, in seconds.
+
+        Methods:
+            observe: Adds a latency to the histogram.
+            as_dict: Returns the histogram as a JSON serializable dictionary.
+    """
+
+    __slots__ = ('counts', 'count', 'total')
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Adds a latency to the histogram."""
+
+        for position, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[position] += 1
+                break
+        self.count += 1
+        self.total += seconds
+
+    def as_dict(self) -> dict:
+        """Returns the histogram with cumulative bucket counts, in the order of BUCKETS."""
+
+        buckets, cumulative = [], 0
+        for bound, count in zip(BUCKETS, self.counts):
+            cumulative += count
+            buckets.append({'le': '+Inf' if bound == float('inf') else str(bound),
+                            'count': cumulative})
+
+        return {'count': self.count, 'sum': self.total, 'buckets': buckets}
+
+
+_histograms: dict[str, StageHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def set_enabled(enabled: bool) -> None:
+    """Turns stage timing on or off.
+
+        Args:
+            enabled (bool): Whether stages are timed.
+    """
+
+    global _enabled
+
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    """Returns whether stages are timed."""
+
+    return _enabled
+
+
+@contextlib.contextmanager
+def _timed(name: str) -> Iterator[None]:
+    """Times the block it wraps as a stage."""
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        timings = _timings.get()
+        if timings is not None:
+            timings[name] = timings.get(name, 0.0) + elapsed
+
+        with _histograms_lock:
+            histogram = _histograms.get(name)
+            if histogram is None:
+                histogram = _histograms[name] = StageHistogram()
+            histogram.observe(elapsed)
+        emit(STAGE_TIMED, name, elapsed)
+
+
+def stage(name: str) -> contextlib.AbstractContextManager:
+    """Returns a context manager timing the block it wraps as a stage.
+
+        Args:
+            name (str): Name of the stage.
+
+        Returns:
+            context manager: The timer, or a no-op context manager if timing is off.
+    """
+
+    if not _enabled:
+        return _NULL_STAGE
+    return _timed(name)
+
+
+@contextlib.contextmanager
+def collect() -> Iterator[dict[str, float]]:
+    """Collects the time of every stage timed within the block, in the current context.
+
+        Yields:
+            dict: Dictionary mapping stage names to their total time in seconds, filled in as
+                stages finish.
+    """
+
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def server_timing(timings: dict[str, float]) -> str:
+    """Returns the value of a Server-Timing header for stage timings.
+
+        Args:
+            timings (dict): Dictionary mapping stage names to their time in seconds.
+
+        Returns:
+            str: The header value, with durations in milliseconds.
+    """
+
+    return ', '.join(f'{name};dur={seconds * 1000:.3f}' for name, seconds in timings.items())
+
+
+def histograms() -> dict[str, dict]:
+    """Returns the latency histograms of every stage timed so far.
+
+        Returns:
+            dict: Dictionary mapping stage names to their histograms, as StageHistogram.as_dict()
+                returns them.
+    """
+
+    with _histograms_lock:
+        return {name: histogram.as_dict() for name, histogram in sorted(_histograms.items())}
+
+
+def reset() -> None:
+    """Removes every latency histogram."""
+
+    with _histograms_lock:
+        _histograms.clear()
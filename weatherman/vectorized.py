@@ -0,0 +1,124 @@
+"""Vectorized Strategies
+
+This module holds NumPy versions of the Calculator strategies. They read the column arrays of
+MonthFrames through zero-copy NumPy views and return the same computations as the pure Python
+strategies in weatherman.runner, down to tie-breaking and float rounding.
+
+Ties are broken by the first reading in day order, as numpy.argmax/argmin return the first
+extreme. Sums are taken with numpy.cumsum, which adds left to right like the Python strategies,
+so averages round identically.
+
+"""
+
+import numpy as np
+
+from weatherman.frames import MONTH_NAMES
+
+
+def _column(frames: list, header: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Returns the present readings of a column across frames with their days and months.
+
+        Args:
+            frames (list): List of MonthFrames.
+            header (str): Header of the column.
+
+        Returns:
+            tuple: Arrays of readings, days and month numbers, without missing readings.
+    """
+
+    values = np.concatenate([np.frombuffer(frame.values(header), dtype=np.float64)
+                             for frame in frames])
+    days = np.concatenate([np.frombuffer(frame.days, dtype=np.uint8) for frame in frames])
+    months = np.concatenate([np.full(len(frame), frame.month, dtype=np.uint8)
+                             for frame in frames])
+
+    present = ~np.isnan(values)
+    return values[present], days[present], months[present]
+
+
+def _extreme(frames: list, header: str, pick) -> tuple[int, str]:
+    """Returns the truncated extreme of a column and the date it was first reached."""
+
+    values, days, months = _column(frames, header)
+    values = np.trunc(values)
+    position = pick(values)
+
+    return int(values[position]), f'{days[position]} {MONTH_NAMES[months[position]]}'
+
+
+def _total(values: np.ndarray) -> float:
+    """Returns the left-to-right sum of readings, matching a Python accumulation loop."""
+
+    return float(np.cumsum(values)[-1]) if len(values) else 0
+
+
+def compute(self) -> dict[str, int]:
+    """Computes max temperature, min temperature and max humidity for a date.
+
+    NumPy version of Calculator.compute().
+
+        Returns:
+            dict: Dictionary containing dates, max temperature, min temperature
+                and max humidity.
+    """
+
+    frames = self.readings if isinstance(self.readings, list) else [self.readings]
+
+    max_temp, max_date = _extreme(frames, 'Max TemperatureC', np.argmax)
+    min_temp, min_date = _extreme(frames, 'Min TemperatureC', np.argmin)
+    max_humidity, humidity_date = _extreme(frames, 'Max Humidity', np.argmax)
+
+    return {
+        'max_temp': max_temp,
+        'max_date': max_date,
+        'min_temp': min_temp,
+        'min_date': min_date,
+        'max_humidity': max_humidity,
+        'humidity_date': humidity_date,
+    }
+
+
+def compute_monthly_average(self) -> dict[str, int]:
+    """Computes averages for max temperature, min temperature and mean humidity for a month.
+
+    NumPy version of weatherman.runner.compute_monthly_average().
+
+        Returns:
+            dict: Dictionary containing averages for max temperature, min temperature and mean
+                humidity for a month.
+    """
+
+    computations = {}
+
+    for key, header in (('max_temp_avg', 'Max TemperatureC'),
+                        ('min_temp_avg', 'Min TemperatureC'),
+                        ('mean_humidity_avg', 'Mean Humidity')):
+        values = np.frombuffer(self.readings.values(header), dtype=np.float64)
+        values = values[~np.isnan(values)]
+        computations[key] = round(_total(values) / len(values))
+
+    return computations
+
+
+def compute_min_max(self) -> dict[int, dict[str, int]]:
+    """Computes minimum and maximum temperature values for each day in a month.
+
+    NumPy version of weatherman.runner.compute_min_max().
+
+        Returns:
+            dict: Dictionary containing dates and average values of maximum and minimum
+                temperatures.
+    """
+
+    max_temps = np.frombuffer(self.readings.values('Max TemperatureC'), dtype=np.float64)
+    min_temps = np.frombuffer(self.readings.values('Min TemperatureC'), dtype=np.float64)
+    days = np.frombuffer(self.readings.days, dtype=np.uint8)
+
+    present = ~(np.isnan(max_temps) | np.isnan(min_temps))
+
+    return {
+        day: {'max_temp': max_temp, 'min_temp': min_temp}
+        for day, max_temp, min_temp in zip(days[present].tolist(),
+                                           np.trunc(max_temps[present]).astype(int).tolist(),
+                                           np.trunc(min_temps[present]).astype(int).tolist())
+    }